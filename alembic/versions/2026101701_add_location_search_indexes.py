@@ -0,0 +1,110 @@
+"""add normalized search document and trigram/full-text indexes to localidades"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101701"
+down_revision = "2025101101"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = 1000
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+# Frozen copies of the search-document helpers as of this revision: the backfill must
+# not change when app.infrastructure.search.location_search does.
+def _normalize_text(value: str | None) -> str:
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", stripped.lower()).split())
+
+
+def _build_search_document(nombre_oficial: str, codigo: str, aliases: Iterable[str]) -> str:
+    parts = [_normalize_text(nombre_oficial), _normalize_text(codigo)]
+    parts.extend(_normalize_text(alias) for alias in aliases)
+    return " ".join(part for part in parts if part)
+
+
+def _backfill_search_text() -> None:
+    """Fill ``search_text`` in id order, ``_BATCH_SIZE`` locations at a time."""
+    bind = op.get_bind()
+    locations = sa.text(
+        "SELECT id, nombre_oficial, codigo FROM localidades "
+        "WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    location_aliases = sa.text(
+        "SELECT localidad_id, alias FROM localidad_alias "
+        "WHERE localidad_id IN :ids ORDER BY id"
+    ).bindparams(sa.bindparam("ids", expanding=True))
+    update = sa.text("UPDATE localidades SET search_text = :search_text WHERE id = :id")
+    after = 0
+    while True:
+        rows = bind.execute(locations, {"after": after, "limit": _BATCH_SIZE}).all()
+        if not rows:
+            return
+        aliases: dict[int, list[str]] = defaultdict(list)
+        for localidad_id, alias in bind.execute(
+            location_aliases, {"ids": [row[0] for row in rows]}
+        ):
+            aliases[localidad_id].append(alias)
+        bind.execute(
+            update,
+            [
+                {
+                    "id": location_id,
+                    "search_text": _build_search_document(
+                        nombre, codigo, aliases.get(location_id, [])
+                    ),
+                }
+                for location_id, nombre, codigo in rows
+            ],
+        )
+        after = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "localidades",
+        sa.Column("search_text", sa.Text(), nullable=False, server_default=sa.text("''")),
+    )
+    _backfill_search_text()
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    op.execute(
+        sa.text(
+            "ALTER TABLE localidades ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED"
+        )
+    )
+    op.execute(
+        sa.text(
+            "CREATE INDEX ix_localidades_search_text_trgm "
+            "ON localidades USING gin (search_text gin_trgm_ops)"
+        )
+    )
+    op.execute(
+        sa.text("CREATE INDEX ix_localidades_search_vector ON localidades USING gin (search_vector)")
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.text("DROP INDEX IF EXISTS ix_localidades_search_vector"))
+        op.execute(sa.text("DROP INDEX IF EXISTS ix_localidades_search_text_trgm"))
+        op.execute(sa.text("ALTER TABLE localidades DROP COLUMN IF EXISTS search_vector"))
+    op.drop_column("localidades", "search_text")
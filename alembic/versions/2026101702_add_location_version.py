@@ -0,0 +1,24 @@
+"""add a version counter to localidades for conditional requests"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101702"
+down_revision = "2026101701"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "localidades",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("localidades", "version")
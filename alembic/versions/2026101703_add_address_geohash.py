@@ -0,0 +1,84 @@
+"""add geohash column and prefix index to direcciones"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101703"
+down_revision = "2026101702"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = 1000
+_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _encode(lat: float, lng: float) -> str:
+    """Frozen copy of ``app.infrastructure.geo.geohash.encode`` as of this revision."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars: list[str] = []
+    value = bits = 0
+    even = True
+    while len(chars) < _PRECISION:
+        target, bounds = (lng, lng_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value *= 2
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            value = bits = 0
+    return "".join(chars)
+
+
+def _backfill_geohash() -> None:
+    """Geohash the geocoded addresses in key order, ``_BATCH_SIZE`` rows at a time."""
+    bind = op.get_bind()
+    select_batch = sa.text(
+        "SELECT localidad_id, lat, lng FROM direcciones "
+        "WHERE localidad_id > :after AND lat IS NOT NULL AND lng IS NOT NULL "
+        "ORDER BY localidad_id LIMIT :limit"
+    )
+    update = sa.text(
+        "UPDATE direcciones SET geohash = :geohash WHERE localidad_id = :localidad_id"
+    )
+    after = 0
+    while True:
+        rows = bind.execute(select_batch, {"after": after, "limit": _BATCH_SIZE}).all()
+        if not rows:
+            return
+        bind.execute(
+            update,
+            [
+                {"localidad_id": localidad_id, "geohash": _encode(lat, lng)}
+                for localidad_id, lat, lng in rows
+            ],
+        )
+        after = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.add_column("direcciones", sa.Column("geohash", sa.String(length=12), nullable=True))
+    _backfill_geohash()
+
+    op.create_index(
+        "ix_direcciones_geohash",
+        "direcciones",
+        ["geohash"],
+        postgresql_ops={"geohash": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_direcciones_geohash", table_name="direcciones")
+    op.drop_column("direcciones", "geohash")
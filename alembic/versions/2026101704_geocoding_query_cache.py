@@ -0,0 +1,49 @@
+"""turn geocoding_cache into a query-keyed lookup cache with expiry"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101704"
+down_revision = "2026101703"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("geocoding_cache", sa.Column("query_key", sa.String(length=64), nullable=True))
+    op.add_column("geocoding_cache", sa.Column("lat", sa.Float(), nullable=True))
+    op.add_column("geocoding_cache", sa.Column("lng", sa.Float(), nullable=True))
+    op.add_column(
+        "geocoding_cache", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.alter_column("geocoding_cache", "localidad_id", existing_type=sa.Integer(), nullable=True)
+    op.alter_column(
+        "geocoding_cache", "external_id", existing_type=sa.String(length=100), nullable=True
+    )
+    op.create_index(
+        "uq_geocoding_cache_query",
+        "geocoding_cache",
+        ["provider", "query_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_geocoding_cache_query", table_name="geocoding_cache")
+    op.execute(
+        sa.text(
+            "DELETE FROM geocoding_cache WHERE localidad_id IS NULL OR external_id IS NULL"
+        )
+    )
+    op.alter_column(
+        "geocoding_cache", "external_id", existing_type=sa.String(length=100), nullable=False
+    )
+    op.alter_column("geocoding_cache", "localidad_id", existing_type=sa.Integer(), nullable=False)
+    op.drop_column("geocoding_cache", "expires_at")
+    op.drop_column("geocoding_cache", "lng")
+    op.drop_column("geocoding_cache", "lat")
+    op.drop_column("geocoding_cache", "query_key")
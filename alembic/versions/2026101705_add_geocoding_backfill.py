@@ -0,0 +1,43 @@
+"""add geocoding_backfill checkpoint table"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101705"
+down_revision = "2026101704"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geocoding_backfill",
+        sa.Column("name", sa.String(length=50), primary_key=True, nullable=False),
+        sa.Column("last_localidad_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("scanned", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("geocoded", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("not_found", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+    # Lets the backfill scan only the rows that still need coordinates.
+    op.create_index(
+        "ix_direcciones_missing_coords",
+        "direcciones",
+        ["localidad_id"],
+        postgresql_where=sa.text("lat IS NULL OR lng IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_direcciones_missing_coords", table_name="direcciones")
+    op.drop_table("geocoding_backfill")
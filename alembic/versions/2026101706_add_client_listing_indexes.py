@@ -0,0 +1,32 @@
+"""add covering client index and partial es_global index for client listings"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101706"
+down_revision = "2026101705"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_localidad_clientes_cliente",
+        "localidad_clientes",
+        ["cliente_source", "cliente_external_id", "localidad_id"],
+    )
+    op.create_index(
+        "ix_localidades_global",
+        "localidades",
+        ["id"],
+        postgresql_where=sa.text("es_global"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_localidades_global", table_name="localidades")
+    op.drop_index("ix_localidad_clientes_cliente", table_name="localidad_clientes")
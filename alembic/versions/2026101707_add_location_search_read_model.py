@@ -0,0 +1,84 @@
+"""add location_search listing read model"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101707"
+down_revision = "2026101706"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "location_search",
+        sa.Column(
+            "localidad_id",
+            sa.Integer(),
+            sa.ForeignKey("localidades.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("address", sa.JSON(), nullable=True),
+        sa.Column("aliases", sa.JSON(), nullable=False),
+        sa.Column("clients", sa.JSON(), nullable=False),
+    )
+    if op.get_bind().dialect.name != "postgresql":
+        # The backfill uses PostgreSQL JSON functions; elsewhere the table starts empty
+        # and listings fall back to the entity path until refresh_location_search runs.
+        return
+    # Children aggregate in the order of the LocationModel relationships.
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO location_search (localidad_id, version, address, aliases, clients)
+            SELECT
+                l.id,
+                l.version,
+                (
+                    SELECT json_build_object(
+                        'calle', d.calle, 'colonia', d.colonia, 'ciudad_text', d.ciudad_text,
+                        'estado_text', d.estado_text, 'cp', d.cp, 'lat', d.lat, 'lng', d.lng,
+                        'referencia', d.referencia, 'created_at', d.created_at,
+                        'updated_at', d.updated_at
+                    )
+                    FROM direcciones d WHERE d.localidad_id = l.id
+                ),
+                (
+                    SELECT coalesce(
+                        json_agg(
+                            json_build_object('id', a.id, 'alias', a.alias, 'created_at', a.created_at)
+                            ORDER BY a.id
+                        ),
+                        '[]'::json
+                    )
+                    FROM localidad_alias a WHERE a.localidad_id = l.id
+                ),
+                (
+                    SELECT coalesce(
+                        json_agg(
+                            json_build_object(
+                                'cliente_source', c.cliente_source,
+                                'cliente_external_id', c.cliente_external_id,
+                                'rol', c.rol,
+                                'created_at', c.created_at
+                            )
+                            ORDER BY c.cliente_source, c.cliente_external_id, c.rol
+                        ),
+                        '[]'::json
+                    )
+                    FROM localidad_clientes c WHERE c.localidad_id = l.id
+                )
+            FROM localidades l
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("location_search")
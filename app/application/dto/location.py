@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from enum import StrEnum
 from typing import Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.domain.models.location import LocationType
 
@@ -73,6 +74,10 @@ class LocationCreate(LocationBase):
     clients: list[ClientRef] = Field(default_factory=list)
 
 
+class BulkLocationUpsert(BaseModel):
+    items: list[LocationCreate] = Field(..., min_length=1, max_length=5000)
+
+
 class LocationUpdate(BaseModel):
     nombre_oficial: str | None = Field(None, min_length=1, max_length=255)
     codigo: str | None = Field(None, min_length=1, max_length=50)
@@ -121,6 +126,7 @@ class LocationRead(BaseModel):
     es_global: bool
     created_at: datetime
     updated_at: datetime
+    version: int
     address: AddressRead | None = None
     aliases: list[AliasRead] = Field(default_factory=list)
     clients: list[ClientRead] = Field(default_factory=list)
@@ -136,6 +142,7 @@ class LocationRead(BaseModel):
                 "es_global": False,
                 "created_at": "2024-01-01T00:00:00Z",
                 "updated_at": "2024-01-01T00:00:00Z",
+                "version": 1,
                 "address": {
                     "calle": "Av. Central",
                     "colonia": "Centro",
@@ -166,7 +173,116 @@ class LocationRead(BaseModel):
 
 class LocationListResponse(BaseModel):
     items: list[LocationRead]
-    total: int
+    total: int | None
+    total_estimated: bool = False
+    next_cursor: str | None = None
+
+
+class NearbyLocationRead(BaseModel):
+    distance_m: float
+    location: LocationRead
+
+
+class NearbyLocationsResponse(BaseModel):
+    items: list[NearbyLocationRead]
+
+
+class BoundingBoxResponse(NearbyLocationsResponse):
+    # True when more locations matched than were returned; narrow the box to see them.
+    truncated: bool
+
+
+class NearestPoint(BaseModel):
+    lat: float = Field(..., ge=-90.0, le=90.0)
+    lng: float = Field(..., ge=-180.0, le=180.0)
+    radius_m: float | None = Field(None, gt=0, le=500_000)
+    tipo: LocationType | None = None
+
+
+class NearestBatchRequest(BaseModel):
+    points: list[NearestPoint] = Field(..., min_length=1, max_length=10_000)
+    activo: bool | None = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "points": [
+                    {"lat": 19.4326, "lng": -99.1332},
+                    {"lat": 20.6597, "lng": -103.3496, "radius_m": 2000, "tipo": "Destino"},
+                ],
+                "activo": True,
+            }
+        }
+    }
+
+
+class NearestMatch(BaseModel):
+    index: int
+    location_id: int | None = None
+    distance_m: float | None = None
+
+
+class NearestBatchResponse(BaseModel):
+    matched: int
+    items: list[NearestMatch]
+
+
+class BatchGetRequest(BaseModel):
+    ids: list[int] = Field(default_factory=list, max_length=500)
+    codigos: list[str] = Field(default_factory=list, max_length=500)
+    use_cache: bool = True
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {"ids": [123, 456], "codigos": ["TN-001"], "use_cache": True}
+        }
+    }
+
+    @model_validator(mode="after")
+    def _require_keys(self) -> BatchGetRequest:
+        if not self.ids and not self.codigos:
+            raise ValueError("Indica al menos un id o un codigo")
+        return self
+
+
+class BatchGetItem(BaseModel):
+    index: int
+    id: int | None = None
+    codigo: str | None = None
+    found: bool
+    location: LocationRead | None = None
+
+
+class BatchGetResponse(BaseModel):
+    found: int
+    not_found: int
+    items: list[BatchGetItem]
+
+
+class BulkItemStatus(StrEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    ERROR = "error"
+
+
+class BulkUpsertItemResult(BaseModel):
+    index: int
+    codigo: str
+    status: BulkItemStatus
+    id: int | None = None
+    error: str | None = None
+
+
+class BulkUpsertResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    items: list[BulkUpsertItemResult]
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
 
 
 class ClientDeleteRequest(BaseModel):
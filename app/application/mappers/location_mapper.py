@@ -1,67 +1,105 @@
 """Conversion utilities between domain entities and DTOs."""
 from __future__ import annotations
 
-from app.application.dto.location import (
-    AddressRead,
-    AliasRead,
-    ClientRead,
-    LocationRead,
-)
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from app.application.dto.location import AddressRead, AliasRead, ClientRead, LocationRead
 from app.domain.models.location import Location
+from app.domain.repositories.location_repository import (
+    ADDRESS_FIELDS,
+    FULL_PROJECTION,
+    LOCATION_FIELDS,
+    LocationInclude,
+    LocationProjection,
+)
+
 
+def to_location_read(
+    location: Location, projection: LocationProjection = FULL_PROJECTION
+) -> LocationRead:
+    """Validate the aggregate straight from its attributes.
 
-def to_location_read(location: Location) -> LocationRead:
+    A single ``from_attributes`` call walks the address, aliases and clients inside
+    pydantic-core, without building intermediate dicts or one model per child. Partial
+    entities (``projection``) are constructed instead, since the attributes they did not
+    load are ``None``; serialize them with :func:`projection_exclude`.
+    """
+    if projection.is_full:
+        return LocationRead.model_validate(location, from_attributes=True)
     address = None
     if location.address is not None:
-        address = AddressRead.model_validate(
-            {
-                "calle": location.address.calle,
-                "colonia": location.address.colonia,
-                "ciudad_text": location.address.ciudad_text,
-                "estado_text": location.address.estado_text,
-                "cp": location.address.cp,
-                "lat": location.address.lat,
-                "lng": location.address.lng,
-                "referencia": location.address.referencia,
-                "created_at": location.address.created_at,
-                "updated_at": location.address.updated_at,
-            }
+        address = AddressRead.model_construct(
+            **{name: getattr(location.address, name) for name in ADDRESS_FIELDS}
         )
+    return LocationRead.model_construct(
+        **{name: getattr(location, name) for name in LOCATION_FIELDS},
+        address=address,
+        aliases=[
+            AliasRead.model_validate(alias, from_attributes=True) for alias in location.aliases
+        ],
+        clients=[
+            ClientRead.model_validate(client, from_attributes=True) for client in location.clients
+        ],
+    )
 
-    aliases = [
-        AliasRead.model_validate(
-            {
-                "id": alias.id,
-                "alias": alias.alias,
-                "created_at": alias.created_at,
-            }
-        )
-        for alias in location.aliases
-    ]
-
-    clients = [
-        ClientRead.model_validate(
-            {
-                "cliente_source": client.cliente_source,
-                "cliente_external_id": client.cliente_external_id,
-                "rol": client.rol,
-                "created_at": client.created_at,
-            }
+
+def projection_exclude(projection: LocationProjection) -> dict[str, Any] | None:
+    """``exclude`` argument that trims serialized list items to ``projection``."""
+    if projection.is_full:
+        return None
+    item: dict[str, Any] = {}
+    if projection.fields is not None:
+        item.update(
+            (name, True)
+            for name in LOCATION_FIELDS
+            if name != "id" and name not in projection.fields
         )
-        for client in location.clients
-    ]
-
-    payload = {
-        "id": location.id,
-        "nombre_oficial": location.nombre_oficial,
-        "codigo": location.codigo,
-        "tipo": location.tipo,
-        "activo": location.activo,
-        "es_global": location.es_global,
-        "created_at": location.created_at,
-        "updated_at": location.updated_at,
-        "address": address,
-        "aliases": aliases,
-        "clients": clients,
-    }
-    return LocationRead.model_validate(payload)
+    for relation in LocationInclude:
+        if relation not in projection.include:
+            item[relation.value] = True
+    if LocationInclude.ADDRESS in projection.include and projection.address_fields is not None:
+        item["address"] = {
+            name: True for name in ADDRESS_FIELDS if name not in projection.address_fields
+        }
+    return {"items": {"__all__": item}}
+
+
+@dataclass(slots=True, frozen=True)
+class SerializedLocation:
+    """A location already encoded as its JSON response body, with its version stamp."""
+
+    id: int
+    version: int
+    updated_at: datetime
+    body: bytes
+
+
+def serialize_location(read: LocationRead) -> SerializedLocation:
+    return SerializedLocation(
+        id=read.id,
+        version=read.version,
+        updated_at=read.updated_at,
+        body=read.model_dump_json().encode(),
+    )
+
+
+def pack_cached_location(location: SerializedLocation) -> bytes:
+    """Cache entry: a ``id version updated_at`` header line, then the response body.
+
+    The header lets cache hits be served (and tagged) without parsing the body.
+    """
+    header = f"{location.id} {location.version} {location.updated_at.isoformat()}\n"
+    return header.encode() + location.body
+
+
+def unpack_cached_location(entry: bytes) -> SerializedLocation:
+    header, _, body = entry.partition(b"\n")
+    location_id, version, updated_at = header.decode().split(" ")
+    return SerializedLocation(
+        id=int(location_id),
+        version=int(version),
+        updated_at=datetime.fromisoformat(updated_at),
+        body=body,
+    )
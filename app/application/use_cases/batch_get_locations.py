@@ -0,0 +1,93 @@
+"""Use case resolving many locations by id and/or codigo in one round trip."""
+from __future__ import annotations
+
+import asyncio
+
+from app.application.dto.location import (
+    BatchGetItem,
+    BatchGetRequest,
+    BatchGetResponse,
+    LocationRead,
+)
+from app.application.mappers.location_mapper import (
+    pack_cached_location,
+    serialize_location,
+    to_location_read,
+    unpack_cached_location,
+)
+from app.domain.repositories.location_cache import LocationCache
+from app.domain.repositories.location_repository import LocationRepository
+
+
+class BatchGetLocations:
+    def __init__(self, repository: LocationRepository, cache: LocationCache | None = None) -> None:
+        self._repository = repository
+        self._cache = cache
+
+    async def execute(self, payload: BatchGetRequest) -> BatchGetResponse:
+        ids = list(dict.fromkeys(payload.ids))
+        codigos = list(dict.fromkeys(payload.codigos))
+        by_id: dict[int, LocationRead] = {}
+        by_codigo: dict[str, LocationRead] = {}
+
+        cache = self._cache if payload.use_cache else None
+        if cache is not None:
+            cached = await asyncio.gather(
+                *(cache.get(location_id) for location_id in ids),
+                *(cache.get_by_codigo(codigo) for codigo in codigos),
+            )
+            for entry in cached:
+                if entry is not None:
+                    read = LocationRead.model_validate_json(unpack_cached_location(entry).body)
+                    self._remember(read, by_id, by_codigo)
+
+        missing_ids = [location_id for location_id in ids if location_id not in by_id]
+        missing_codigos = [codigo for codigo in codigos if codigo not in by_codigo]
+        if missing_ids or missing_codigos:
+            token = await cache.read_token() if cache is not None else None
+            locations = await self._repository.get_locations(
+                ids=missing_ids, codigos=missing_codigos
+            )
+            loaded = [to_location_read(location) for location in locations]
+            for read in loaded:
+                self._remember(read, by_id, by_codigo)
+            if cache is not None:
+                await asyncio.gather(
+                    *(
+                        cache.set(
+                            read.id,
+                            read.codigo,
+                            pack_cached_location(serialize_location(read)),
+                            token,
+                        )
+                        for read in loaded
+                    )
+                )
+
+        items = [
+            BatchGetItem(
+                index=index,
+                id=location_id,
+                found=location_id in by_id,
+                location=by_id.get(location_id),
+            )
+            for index, location_id in enumerate(payload.ids)
+        ]
+        items.extend(
+            BatchGetItem(
+                index=index,
+                codigo=codigo,
+                found=codigo in by_codigo,
+                location=by_codigo.get(codigo),
+            )
+            for index, codigo in enumerate(payload.codigos, start=len(payload.ids))
+        )
+        found = sum(item.found for item in items)
+        return BatchGetResponse(found=found, not_found=len(items) - found, items=items)
+
+    @staticmethod
+    def _remember(
+        read: LocationRead, by_id: dict[int, LocationRead], by_codigo: dict[str, LocationRead]
+    ) -> None:
+        by_id[read.id] = read
+        by_codigo[read.codigo] = read
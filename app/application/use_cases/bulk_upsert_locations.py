@@ -0,0 +1,54 @@
+"""Use case for creating or updating many location aggregates at once."""
+from __future__ import annotations
+
+from app.application.dto.location import (
+    BulkItemStatus,
+    BulkLocationUpsert,
+    BulkUpsertItemResult,
+    BulkUpsertResponse,
+)
+from app.domain.repositories.location_repository import BulkUpsertResult, LocationRepository
+
+
+def _status(result: BulkUpsertResult) -> BulkItemStatus:
+    if result.error is not None:
+        return BulkItemStatus.ERROR
+    return BulkItemStatus.CREATED if result.created else BulkItemStatus.UPDATED
+
+
+class BulkUpsertLocations:
+    def __init__(self, repository: LocationRepository) -> None:
+        self._repository = repository
+
+    async def execute(self, payload: BulkLocationUpsert) -> BulkUpsertResponse:
+        results = await self._repository.bulk_upsert_locations(
+            [
+                {
+                    "nombre_oficial": item.nombre_oficial,
+                    "codigo": item.codigo,
+                    "tipo": item.tipo,
+                    "activo": item.activo,
+                    "es_global": item.es_global,
+                    "address": item.address.model_dump() if item.address else None,
+                    "aliases": [alias.alias for alias in item.aliases],
+                    "clients": [] if item.es_global else [client.model_dump() for client in item.clients],
+                }
+                for item in payload.items
+            ]
+        )
+        items = [
+            BulkUpsertItemResult(
+                index=result.index,
+                codigo=result.codigo,
+                status=_status(result),
+                id=result.location_id,
+                error=result.error,
+            )
+            for result in results
+        ]
+        return BulkUpsertResponse(
+            created=sum(item.status is BulkItemStatus.CREATED for item in items),
+            updated=sum(item.status is BulkItemStatus.UPDATED for item in items),
+            failed=sum(item.status is BulkItemStatus.ERROR for item in items),
+            items=items,
+        )
@@ -3,14 +3,21 @@ from __future__ import annotations
 
 from app.application.dto.location import LocationCreate, LocationRead
 from app.application.mappers.location_mapper import to_location_read
+from app.application.use_cases.geocode_address import GeocodeAddress
 from app.domain.repositories.location_repository import LocationRepository
 
 
 class CreateOrUpdateLocation:
-    def __init__(self, repository: LocationRepository) -> None:
+    def __init__(
+        self, repository: LocationRepository, geocoder: GeocodeAddress | None = None
+    ) -> None:
         self._repository = repository
+        self._geocoder = geocoder
 
     async def execute(self, payload: LocationCreate) -> LocationRead:
+        address = payload.address.model_dump() if payload.address else None
+        if address is not None and self._geocoder is not None:
+            address = await self._geocoder.execute(address)
         clients_payload = [] if payload.es_global else [client.model_dump() for client in payload.clients]
         location = await self._repository.upsert_location(
             nombre_oficial=payload.nombre_oficial,
@@ -18,7 +25,7 @@ class CreateOrUpdateLocation:
             tipo=payload.tipo,
             activo=payload.activo,
             es_global=payload.es_global,
-            address=payload.address.model_dump() if payload.address else None,
+            address=address,
             aliases=[alias.alias for alias in payload.aliases],
             clients=clients_payload,
         )
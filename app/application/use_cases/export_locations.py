@@ -0,0 +1,98 @@
+"""Use case for streaming the location catalog as NDJSON or CSV."""
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
+
+from app.application.dto.location import ExportFormat
+from app.domain.repositories.location_repository import LocationFilters, LocationRepository
+
+CSV_COLUMNS = (
+    "id",
+    "nombre_oficial",
+    "codigo",
+    "tipo",
+    "activo",
+    "es_global",
+    "created_at",
+    "updated_at",
+    "calle",
+    "colonia",
+    "ciudad_text",
+    "estado_text",
+    "cp",
+    "lat",
+    "lng",
+    "referencia",
+    "aliases",
+    "clients",
+)
+
+
+class ExportLocations:
+    def __init__(self, repository: LocationRepository, *, chunk_rows: int = 500) -> None:
+        self._repository = repository
+        self._chunk_rows = chunk_rows
+
+    async def execute(
+        self, filters: LocationFilters, export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        rows = self._repository.stream_locations(filters)
+        if export_format is ExportFormat.CSV:
+            chunks = self._csv_chunks(rows)
+        else:
+            chunks = self._ndjson_chunks(rows)
+        async for chunk in chunks:
+            yield chunk
+
+    async def _ndjson_chunks(self, rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+        # orjson encodes datetimes and enums natively and writes UTF-8 bytes directly.
+        buffer = bytearray()
+        pending = 0
+        async for row in rows:
+            buffer += orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+            pending += 1
+            if pending >= self._chunk_rows:
+                yield bytes(buffer)
+                buffer.clear()
+                pending = 0
+        if pending:
+            yield bytes(buffer)
+
+    async def _csv_chunks(self, rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        yield self._drain(output)
+
+        pending = 0
+        async for row in rows:
+            writer.writerow(
+                {
+                    **row,
+                    "created_at": row["created_at"].isoformat(),
+                    "updated_at": row["updated_at"].isoformat(),
+                    "aliases": "|".join(row["aliases"]),
+                    "clients": "|".join(
+                        f"{client['cliente_source']}:{client['cliente_external_id']}:{client['rol']}"
+                        for client in row["clients"]
+                    ),
+                }
+            )
+            pending += 1
+            if pending >= self._chunk_rows:
+                yield self._drain(output)
+                pending = 0
+        if pending:
+            yield self._drain(output)
+
+    @staticmethod
+    def _drain(output: io.StringIO) -> bytes:
+        data = output.getvalue().encode()
+        output.seek(0)
+        output.truncate()
+        return data
@@ -0,0 +1,59 @@
+"""Use case for proximity and bounding box lookups."""
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+
+from app.application.dto.location import (
+    BoundingBoxResponse,
+    NearbyLocationRead,
+    NearbyLocationsResponse,
+)
+from app.application.mappers.location_mapper import to_location_read
+from app.domain.models.location import BoundingBox
+from app.domain.repositories.location_repository import (
+    LocationFilters,
+    LocationRepository,
+    NearbyLocation,
+)
+
+
+class FindNearbyLocations:
+    def __init__(self, repository: LocationRepository) -> None:
+        self._repository = repository
+
+    async def execute(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        radius_m: float,
+        limit: int,
+        filters: LocationFilters,
+    ) -> NearbyLocationsResponse:
+        found = await self._repository.find_nearby(
+            lat, lng, radius_m=radius_m, limit=limit, filters=filters
+        )
+        return self._to_response(found)
+
+    async def execute_in_bounding_box(
+        self, box: BoundingBox, *, limit: int, filters: LocationFilters
+    ) -> BoundingBoxResponse:
+        # Boxes crossing the antimeridian (min_lng > max_lng) are rejected, not wrapped;
+        # callers split them into two boxes.
+        if box.min_lat > box.max_lat or box.min_lng > box.max_lng:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Rectángulo de búsqueda inválido")
+        found = await self._repository.find_in_bounding_box(box, limit=limit, filters=filters)
+        return BoundingBoxResponse(items=self._to_items(found.items), truncated=found.truncated)
+
+    @classmethod
+    def _to_response(cls, found: list[NearbyLocation]) -> NearbyLocationsResponse:
+        return NearbyLocationsResponse(items=cls._to_items(found))
+
+    @staticmethod
+    def _to_items(found: list[NearbyLocation]) -> list[NearbyLocationRead]:
+        return [
+            NearbyLocationRead(
+                distance_m=round(item.distance_m, 2), location=to_location_read(item.location)
+            )
+            for item in found
+        ]
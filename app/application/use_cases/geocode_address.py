@@ -0,0 +1,65 @@
+"""Use case for filling in the coordinates of an address from its text."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from app.domain.models.location import Address
+from app.domain.repositories.geocoding import GeocodingProvider, GeocodingProviderError
+
+logger = logging.getLogger(__name__)
+
+_QUERY_FIELDS = ("calle", "colonia", "cp", "ciudad_text", "estado_text")
+
+
+def address_query(address: dict[str, Any]) -> str | None:
+    """Free-form query for an address, or ``None`` when it lacks a street to locate."""
+    if not address.get("calle"):
+        return None
+    return ", ".join(str(address[field]) for field in _QUERY_FIELDS if address.get(field))
+
+
+def needs_geocoding(changes: dict[str, Any]) -> bool:
+    """Whether a partial address update changes the text without giving coordinates."""
+    if changes.get("lat") is not None or changes.get("lng") is not None:
+        return False
+    return any(field in changes for field in _QUERY_FIELDS)
+
+
+class GeocodeAddress:
+    def __init__(self, geocoder: GeocodingProvider) -> None:
+        self._geocoder = geocoder
+
+    async def execute(self, address: dict[str, Any]) -> dict[str, Any]:
+        """Return ``address`` with ``lat``/``lng`` resolved when it was sent without them.
+
+        Provider outages never block the save: the address is stored without coordinates
+        and can be backfilled later.
+        """
+        if address.get("lat") is not None or address.get("lng") is not None:
+            return address
+        query = address_query(address)
+        if query is None:
+            return address
+        try:
+            result = await self._geocoder.geocode(query)
+        except GeocodingProviderError as exc:
+            logger.warning("Geocoding failed for an address: %s", exc)
+            return address
+        if result is None:
+            return address
+        return {**address, "lat": result.lat, "lng": result.lng}
+
+    async def execute_update(
+        self, stored: Address | None, changes: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Return ``changes`` with ``lat``/``lng`` resolved for the address they produce.
+
+        The query is built from the stored address with ``changes`` applied, so updating
+        only the street still geocodes it within its city, state and postal code.
+        """
+        base = {field: getattr(stored, field) for field in _QUERY_FIELDS} if stored else {}
+        resolved = await self.execute({**base, **changes})
+        if resolved.get("lat") is None or resolved.get("lng") is None:
+            return changes
+        return {**changes, "lat": resolved["lat"], "lng": resolved["lng"]}
@@ -3,17 +3,83 @@ from __future__ import annotations
 
 from fastapi import HTTPException, status
 
-from app.application.dto.location import LocationRead
-from app.application.mappers.location_mapper import to_location_read
+from app.application.mappers.location_mapper import (
+    SerializedLocation,
+    pack_cached_location,
+    serialize_location,
+    to_location_read,
+    unpack_cached_location,
+)
+from app.domain.models.location import Location, LocationVersion
+from app.domain.repositories.location_cache import LocationCache
 from app.domain.repositories.location_repository import LocationRepository
 
 
 class GetLocation:
-    def __init__(self, repository: LocationRepository) -> None:
+    """Serve a location as its JSON body; cache hits are returned as stored, unparsed.
+
+    Callers that already hold the current ``LocationVersion`` pass it as ``expected``:
+    a cached entry with another version is stale and is replaced by a fresh load.
+    """
+
+    def __init__(self, repository: LocationRepository, cache: LocationCache | None = None) -> None:
         self._repository = repository
+        self._cache = cache
 
-    async def execute(self, location_id: int) -> LocationRead:
+    async def execute(
+        self, location_id: int, expected: LocationVersion | None = None
+    ) -> SerializedLocation:
+        token = None
+        if self._cache is not None:
+            cached = self._fresh(await self._cache.get(location_id), expected)
+            if cached is not None:
+                return cached
+            token = await self._cache.read_token()
         location = await self._repository.get_location(location_id)
+        return await self._store(location, token)
+
+    async def execute_by_codigo(
+        self, codigo: str, expected: LocationVersion | None = None
+    ) -> SerializedLocation:
+        token = None
+        if self._cache is not None:
+            cached = self._fresh(await self._cache.get_by_codigo(codigo), expected)
+            if cached is not None:
+                return cached
+            token = await self._cache.read_token()
+        location = await self._repository.get_location_by_codigo(codigo)
+        return await self._store(location, token)
+
+    async def version(self, location_id: int) -> LocationVersion:
+        return self._require(await self._repository.get_location_version(location_id))
+
+    async def version_by_codigo(self, codigo: str) -> LocationVersion:
+        return self._require(await self._repository.get_location_version_by_codigo(codigo))
+
+    @staticmethod
+    def _fresh(
+        entry: bytes | None, expected: LocationVersion | None
+    ) -> SerializedLocation | None:
+        if entry is None:
+            return None
+        cached = unpack_cached_location(entry)
+        if expected is not None and cached.version != expected.version:
+            return None
+        return cached
+
+    @staticmethod
+    def _require(version: LocationVersion | None) -> LocationVersion:
+        if version is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Localidad no encontrada")
+        return version
+
+    async def _store(self, location: Location | None, token: object | None) -> SerializedLocation:
+        """Serialize ``location`` and cache it unless it was invalidated since ``token``."""
         if location is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Localidad no encontrada")
-        return to_location_read(location)
+        serialized = serialize_location(to_location_read(location))
+        if self._cache is not None:
+            await self._cache.set(
+                location.id, location.codigo, pack_cached_location(serialized), token
+            )
+        return serialized
@@ -1,15 +1,77 @@
 """Use case for retrieving paginated locations with filters."""
 from __future__ import annotations
 
+from fastapi import HTTPException, status
+
 from app.application.dto.location import LocationListResponse, LocationRead
 from app.application.mappers.location_mapper import to_location_read
 from app.domain.repositories.location_repository import (
+    ADDRESS_FIELDS,
+    FULL_PROJECTION,
+    LOCATION_FIELDS,
     LocationFilters,
+    LocationInclude,
+    LocationProjection,
     LocationRepository,
     Pagination,
 )
 
 
+# Loads only what identifies each row (id, version and updated_at are always loaded).
+_STAMPS = LocationProjection(fields=frozenset(), include=frozenset())
+
+
+def _split(value: str) -> set[str]:
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+def parse_projection(fields: str | None, include: str | None) -> LocationProjection:
+    """Build the projection of the ``fields`` and ``include`` query parameters.
+
+    ``fields`` lists location attributes and ``address.<attr>`` entries (``id`` is always
+    returned); ``include`` lists the child collections. Omitted parameters keep
+    everything, an empty one keeps nothing.
+    """
+    relations = frozenset(LocationInclude)
+    if include is not None:
+        names = _split(include)
+        unknown = names - {relation.value for relation in LocationInclude}
+        if unknown:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                f"Valores de include no válidos: {', '.join(sorted(unknown))}",
+            )
+        relations = frozenset(LocationInclude(name) for name in names)
+    if fields is None:
+        return LocationProjection(include=relations)
+
+    location_fields: set[str] = set()
+    address_fields: set[str] = set()
+    unknown = set()
+    for name in _split(fields):
+        prefix, _, attribute = name.partition(".")
+        if attribute and prefix == LocationInclude.ADDRESS and attribute in ADDRESS_FIELDS:
+            address_fields.add(attribute)
+        elif not attribute and name in LOCATION_FIELDS:
+            location_fields.add(name)
+        else:
+            unknown.add(name)
+    if unknown:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            f"Campos no válidos: {', '.join(sorted(unknown))}",
+        )
+    if address_fields and LocationInclude.ADDRESS not in relations:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, "Los campos address.* requieren include=address"
+        )
+    return LocationProjection(
+        fields=frozenset(location_fields),
+        address_fields=frozenset(address_fields) or None,
+        include=relations,
+    )
+
+
 class ListLocations:
     def __init__(self, repository: LocationRepository) -> None:
         self._repository = repository
@@ -18,9 +80,21 @@ class ListLocations:
         self,
         filters: LocationFilters,
         pagination: Pagination,
+        projection: LocationProjection = FULL_PROJECTION,
     ) -> LocationListResponse:
-        items, total = await self._repository.list_locations(filters, pagination)
+        try:
+            page = await self._repository.list_locations(filters, pagination, projection)
+        except ValueError as exc:  # malformed or foreign cursor
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, str(exc)) from exc
         return LocationListResponse(
-            items=[to_location_read(item) for item in items],
-            total=total,
+            items=[to_location_read(item, projection) for item in page.items],
+            total=page.total,
+            total_estimated=page.total_estimated,
+            next_cursor=page.next_cursor,
         )
+
+    async def versions(
+        self, filters: LocationFilters, pagination: Pagination
+    ) -> LocationListResponse:
+        """The page with only the version stamps of its items: enough for its ETag."""
+        return await self.execute(filters, pagination, _STAMPS)
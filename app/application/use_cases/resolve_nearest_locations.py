@@ -0,0 +1,39 @@
+"""Use case resolving many GPS points to their closest known location."""
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+
+from app.application.dto.location import NearestBatchRequest, NearestBatchResponse, NearestMatch
+from app.domain.repositories.location_index import PointQuery, SpatialIndexUnavailableError
+from app.domain.repositories.location_repository import LocationRepository
+
+
+class ResolveNearestLocations:
+    def __init__(self, repository: LocationRepository) -> None:
+        self._repository = repository
+
+    async def execute(self, payload: NearestBatchRequest) -> NearestBatchResponse:
+        try:
+            matches = await self._repository.find_nearest_many(
+                [
+                    PointQuery(
+                        lat=point.lat, lng=point.lng, radius_m=point.radius_m, tipo=point.tipo
+                    )
+                    for point in payload.points
+                ],
+                activo=payload.activo,
+            )
+        except SpatialIndexUnavailableError:
+            raise HTTPException(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "El índice espacial aún no está disponible para lotes de este tamaño",
+            ) from None
+        items = [
+            NearestMatch(index=index)
+            if match is None
+            else NearestMatch(index=index, location_id=match[0], distance_m=round(match[1], 2))
+            for index, match in enumerate(matches)
+        ]
+        return NearestBatchResponse(
+            matched=sum(match is not None for match in matches), items=items
+        )
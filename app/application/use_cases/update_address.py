@@ -5,18 +5,28 @@ from fastapi import HTTPException, status
 
 from app.application.dto.location import AddressUpdate, LocationRead
 from app.application.mappers.location_mapper import to_location_read
+from app.application.use_cases.geocode_address import GeocodeAddress, needs_geocoding
+from app.domain.models.location import Location
 from app.domain.repositories.location_repository import LocationRepository
 
 
 class UpdateLocationAddress:
-    def __init__(self, repository: LocationRepository) -> None:
+    def __init__(
+        self, repository: LocationRepository, geocoder: GeocodeAddress | None = None
+    ) -> None:
         self._repository = repository
+        self._geocoder = geocoder
 
     async def execute(self, location_id: int, payload: AddressUpdate) -> LocationRead:
-        updated = await self._repository.update_address(
-            location_id,
-            payload.model_dump(exclude_none=True),
-        )
-        if updated is None:
+        data = payload.model_dump(exclude_none=True)
+        if self._geocoder is not None and needs_geocoding(data):
+            current = self._require(await self._repository.get_location(location_id))
+            data = await self._geocoder.execute_update(current.address, data)
+        updated = await self._repository.update_address(location_id, data)
+        return to_location_read(self._require(updated))
+
+    @staticmethod
+    def _require(location: Location | None) -> Location:
+        if location is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Localidad no encontrada")
-        return to_location_read(updated)
+        return location
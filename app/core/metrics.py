@@ -0,0 +1,329 @@
+"""Request metrics: per-request counters and process-wide Prometheus histograms.
+
+Besides timings, finished requests are checked for SQL smells: statements slower than
+``slow_query_threshold_ms`` are logged and, with the query detector on, requests that
+exceed the query budget or repeat one statement shape (the N+1 pattern) are logged and
+collected per route for ``/diagnostics/queries``.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+import time
+from bisect import bisect_left
+from collections import Counter as StatementCounter
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+# Distinct statement shapes kept per route in the detector report.
+MAX_REPORTED_STATEMENTS = 10
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s")
+_PLACEHOLDER_LIST = re.compile(r"\(\?(?:, ?\?)*\)")
+_ROW_LIST = re.compile(r"\(\?\)(?:, ?\(\?\))+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with bind parameters and ``IN``/``VALUES`` lists collapsed."""
+    shape = _PLACEHOLDER.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _ROW_LIST.sub("(?)", _PLACEHOLDER_LIST.sub("(?)", shape))
+
+
+@dataclass(slots=True)
+class RequestMetrics:
+    """What one request spent; filled by the engine hooks and the response classes."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    # Executions per statement shape; only tracked while the query detector is on.
+    statements: StatementCounter[str] | None = None
+    slow_queries: list[tuple[float, str]] = field(default_factory=list)
+
+    def record_query(self, elapsed: float, statement: str) -> None:
+        self.queries += 1
+        self.db_seconds += elapsed
+        if self.statements is not None:
+            self.statements[statement_shape(statement)] += 1
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialization_seconds * 1000:.2f}, "
+            f"total;dur={total_ms:.2f}"
+        )
+
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current_request_metrics() -> RequestMetrics | None:
+    """Metrics of the request being served by this task, if it is being measured."""
+    return _current.get()
+
+
+@contextmanager
+def measure_request(*, detect_queries: bool = False) -> Iterator[RequestMetrics]:
+    metrics = RequestMetrics(statements=StatementCounter() if detect_queries else None)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.serialization_seconds += time.perf_counter() - started
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # One counter per bucket plus +Inf; the second list holds [sum].
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, labels)]
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                bucket_labels = ",".join([*pairs, f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {_number(total[0])}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            pairs = ",".join(
+                f'{name}="{_escape(label)}"' for name, label in zip(self.labels, labels)
+            )
+            lines.append(f"{self.name}{{{pairs}}} {_number(value)}")
+        return lines
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+@dataclass(slots=True)
+class QueryFindings:
+    """Requests of one route flagged by the query detector."""
+
+    flagged: int = 0
+    over_budget: int = 0
+    repeated: int = 0
+    max_queries: int = 0
+    # Highest number of executions seen in one request, per repeated statement shape.
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def record(self, queries: int, over_budget: bool, repeated: dict[str, int]) -> None:
+        self.flagged += 1
+        self.over_budget += over_budget
+        self.repeated += bool(repeated)
+        self.max_queries = max(self.max_queries, queries)
+        for shape, count in repeated.items():
+            self.statements[shape] = max(self.statements.get(shape, 0), count)
+        if len(self.statements) > MAX_REPORTED_STATEMENTS:
+            kept = sorted(self.statements.items(), key=lambda item: item[1], reverse=True)
+            self.statements = dict(kept[:MAX_REPORTED_STATEMENTS])
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "flagged": self.flagged,
+            "over_budget": self.over_budget,
+            "repeated_statements": self.repeated,
+            "max_queries": self.max_queries,
+            "statements": [
+                {"statement": shape, "max_executions": count}
+                for shape, count in sorted(
+                    self.statements.items(), key=lambda item: item[1], reverse=True
+                )
+            ],
+        }
+
+
+class RequestMetricsRegistry:
+    """Aggregates finished requests by method and route template."""
+
+    def __init__(self, *, query_budget: int = 20, repeat_threshold: int = 5) -> None:
+        self.query_budget = query_budget
+        self.repeat_threshold = repeat_threshold
+        self._findings: dict[tuple[str, str], QueryFindings] = {}
+        route = ("method", "route")
+        self.requests = Counter(
+            "http_requests_total", "Requests served.", ("method", "route", "status")
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Request latency.", route, LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            "http_request_db_queries", "SQL statements per request.", route, QUERY_COUNT_BUCKETS
+        )
+        self.db_time = Histogram(
+            "http_request_db_duration_seconds",
+            "Time spent executing SQL per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.serialization_time = Histogram(
+            "http_request_serialization_duration_seconds",
+            "Time spent serializing the response body per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.slow_queries = Counter(
+            "http_request_slow_queries_total", "SQL statements over the slow threshold.", route
+        )
+        self.flagged = Counter(
+            "http_request_query_smells_total",
+            "Requests over the query budget or repeating a statement shape.",
+            ("method", "route", "reason"),
+        )
+
+    def observe(
+        self, method: str, route: str, status: int, elapsed: float, metrics: RequestMetrics
+    ) -> None:
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.latency.observe(labels, elapsed)
+        self.queries.observe(labels, metrics.queries)
+        self.db_time.observe(labels, metrics.db_seconds)
+        self.serialization_time.observe(labels, metrics.serialization_seconds)
+        for elapsed, statement in metrics.slow_queries:
+            self.slow_queries.inc(labels)
+            logger.warning(
+                "Slow query on %s %s (%.1f ms): %s", method, route, elapsed * 1000, statement
+            )
+        if metrics.statements is not None:
+            self._detect(method, route, metrics)
+
+    def findings(self) -> dict[str, dict[str, Any]]:
+        return {
+            f"{method} {route}": findings.as_dict()
+            for (method, route), findings in sorted(self._findings.items())
+        }
+
+    def _detect(self, method: str, route: str, metrics: RequestMetrics) -> None:
+        assert metrics.statements is not None
+        repeated = {
+            shape: count
+            for shape, count in metrics.statements.items()
+            if count >= self.repeat_threshold
+        }
+        over_budget = metrics.queries > self.query_budget
+        if not repeated and not over_budget:
+            return
+        self._findings.setdefault((method, route), QueryFindings()).record(
+            metrics.queries, over_budget, repeated
+        )
+        if over_budget:
+            self.flagged.inc((method, route, "over_budget"))
+            logger.warning(
+                "%s %s ran %d queries (budget %d)",
+                method,
+                route,
+                metrics.queries,
+                self.query_budget,
+            )
+        for shape, count in repeated.items():
+            self.flagged.inc((method, route, "repeated_statement"))
+            logger.warning(
+                "%s %s ran the same statement %d times (possible N+1): %s",
+                method,
+                route,
+                count,
+                shape,
+            )
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics():
+            metric.clear()
+        self._findings.clear()
+
+    def _metrics(self) -> tuple[Counter | Histogram, ...]:
+        return (
+            self.requests,
+            self.latency,
+            self.queries,
+            self.db_time,
+            self.serialization_time,
+            self.slow_queries,
+            self.flagged,
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+@lru_cache
+def get_request_metrics_registry() -> RequestMetricsRegistry:
+    settings = get_settings()
+    return RequestMetricsRegistry(
+        query_budget=settings.query_budget_per_request,
+        repeat_threshold=settings.query_repeat_threshold,
+    )
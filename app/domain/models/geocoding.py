@@ -0,0 +1,36 @@
+"""Domain entities for address geocoding."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+
+@dataclass(slots=True, frozen=True)
+class GeocodeResult:
+    lat: float
+    lng: float
+    provider: str
+    external_id: str
+    relevance: float | None = None
+    raw: dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+
+@dataclass(slots=True, frozen=True)
+class CachedGeocode:
+    """Stored answer for a normalized query; ``result`` is ``None`` for negative entries."""
+
+    result: GeocodeResult | None
+    expires_at: datetime
+
+
+@dataclass(slots=True)
+class BackfillCheckpoint:
+    """Progress of a named backfill run; addresses up to ``last_localidad_id`` are done."""
+
+    name: str
+    last_localidad_id: int = 0
+    scanned: int = 0
+    geocoded: int = 0
+    not_found: int = 0
+    failed: int = 0
@@ -42,6 +42,27 @@ class ClientLink:
     created_at: datetime
 
 
+@dataclass(slots=True, frozen=True)
+class BoundingBox:
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    @property
+    def center(self) -> tuple[float, float]:
+        return (self.min_lat + self.max_lat) / 2, (self.min_lng + self.max_lng) / 2
+
+
+@dataclass(slots=True, frozen=True)
+class LocationVersion:
+    """Version stamp of an aggregate; ``version`` grows with every write to it or its children."""
+
+    id: int
+    version: int
+    updated_at: datetime
+
+
 @dataclass(slots=True)
 class Location:
     id: int
@@ -52,6 +73,7 @@ class Location:
     es_global: bool = False
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    version: int = 1
     address: Address | None = None
     aliases: list[Alias] = field(default_factory=list)
     clients: list[ClientLink] = field(default_factory=list)
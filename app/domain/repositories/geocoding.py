@@ -0,0 +1,61 @@
+"""Contracts for geocoding providers and their result cache."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from app.domain.models.geocoding import BackfillCheckpoint, CachedGeocode, GeocodeResult
+
+
+class GeocodingProviderError(Exception):
+    """Raised when the provider could not answer (network, quota, server errors).
+
+    Unlike an empty answer, a failure says nothing about the address and is never cached.
+    """
+
+
+class GeocodingProvider(ABC):
+    name: str
+
+    @abstractmethod
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        """Resolve a free-form address; ``None`` when the provider found no match."""
+
+    async def close(self) -> None:
+        """Release connections held by the provider. No-op by default."""
+
+
+class GeocodingCacheRepository(ABC):
+    @abstractmethod
+    async def get(self, provider: str, query_key: str, now: datetime) -> CachedGeocode | None:
+        """Return the unexpired entry stored for the query, if any."""
+
+    @abstractmethod
+    async def put(
+        self,
+        provider: str,
+        query_key: str,
+        result: GeocodeResult | None,
+        expires_at: datetime,
+        *,
+        localidad_id: int | None = None,
+    ) -> None:
+        """Store (or replace) the answer for the query until ``expires_at``."""
+
+
+class BackfillCheckpointRepository(ABC):
+    @abstractmethod
+    async def load(self, name: str) -> BackfillCheckpoint:
+        """Return the stored progress of the run, or a fresh checkpoint."""
+
+    @abstractmethod
+    async def save(self, checkpoint: BackfillCheckpoint) -> None:
+        """Persist the progress of the run."""
+
+    @abstractmethod
+    async def stage(self, checkpoint: BackfillCheckpoint) -> None:
+        """Write the progress into the open transaction, leaving the commit to the caller."""
+
+    @abstractmethod
+    async def reset(self, name: str) -> None:
+        """Forget the progress so the next run starts from the beginning."""
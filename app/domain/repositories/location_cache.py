@@ -0,0 +1,49 @@
+"""Cache contract for serialized location aggregates."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+
+class LocationCache(ABC):
+    """Store serialized ``LocationRead`` payloads addressable by id and by codigo."""
+
+    @abstractmethod
+    async def get(self, location_id: int) -> bytes | None:
+        """Return the cached payload for the identifier, if any."""
+
+    @abstractmethod
+    async def get_by_codigo(self, codigo: str) -> bytes | None:
+        """Return the cached payload for the unique code, if any."""
+
+    async def read_token(self) -> object | None:
+        """Take a token before reading a location from the database.
+
+        Passing it to ``set`` makes the write a no-op when the location was invalidated
+        after the token was taken, so a read racing a commit cannot cache the
+        pre-commit payload. ``None`` (the default) leaves ``set`` unguarded.
+        """
+        return None
+
+    @abstractmethod
+    async def set(
+        self, location_id: int, codigo: str, payload: bytes, token: object | None = None
+    ) -> None:
+        """Store the payload under both keys, unless ``token`` shows it is stale."""
+
+    @abstractmethod
+    async def invalidate(self, location_id: int) -> None:
+        """Drop the entry of a location after it was modified or deleted."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drop every entry."""
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and the current size."""
+
+    async def start(self) -> None:
+        """Start background work (e.g. invalidation listeners). No-op by default."""
+
+    async def close(self) -> None:
+        """Stop background work and release resources. No-op by default."""
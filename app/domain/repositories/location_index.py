@@ -0,0 +1,88 @@
+"""Contract for the in-process spatial index over location coordinates."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from app.domain.models.location import LocationType
+
+
+class SpatialIndexUnavailableError(Exception):
+    """Raised when a request is too large to answer without the spatial index, and the
+    index is disabled or has not finished its first load."""
+
+
+@dataclass(slots=True, frozen=True)
+class IndexedPoint:
+    location_id: int
+    lat: float
+    lng: float
+    tipo: LocationType
+    activo: bool
+
+
+@dataclass(slots=True, frozen=True)
+class PointQuery:
+    lat: float
+    lng: float
+    radius_m: float | None = None
+    tipo: LocationType | None = None
+
+
+class LocationSpatialIndex(ABC):
+    """Nearest-neighbour lookups over the coordinates of every located address."""
+
+    @property
+    @abstractmethod
+    def ready(self) -> bool:
+        """Whether the index holds a full snapshot and can answer queries."""
+
+    @abstractmethod
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        k: int = 1,
+        radius_m: float | None = None,
+        tipo: LocationType | None = None,
+        activo: bool | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return up to ``k`` ``(location_id, distance_m)`` pairs, closest first."""
+
+    @abstractmethod
+    def nearest_many(
+        self, queries: Sequence[PointQuery], *, activo: bool | None = None
+    ) -> list[tuple[int, float] | None]:
+        """Resolve the closest location of every query point, in input order."""
+
+    @abstractmethod
+    def get(self, location_id: int) -> IndexedPoint | None:
+        """Return the indexed entry of a location, if any."""
+
+    @abstractmethod
+    def upsert(self, point: IndexedPoint) -> None:
+        """Insert or move the entry of a location."""
+
+    @abstractmethod
+    def remove(self, location_id: int) -> None:
+        """Drop the entry of a location (deleted, or its address lost coordinates)."""
+
+    @abstractmethod
+    def replace_all(self, points: Iterable[IndexedPoint]) -> None:
+        """Replace the whole content with a fresh snapshot and mark the index ready."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry and mark the index as not loaded."""
+
+    @abstractmethod
+    def stats(self) -> dict[str, float]:
+        """Return size and load counters."""
+
+    async def start(self) -> None:
+        """Load the initial snapshot and start background refreshes. No-op by default."""
+
+    async def close(self) -> None:
+        """Stop background work. No-op by default."""
@@ -2,9 +2,21 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
 from dataclasses import dataclass
-from app.domain.models.location import Address, Alias, ClientLink, Location, LocationType
+from enum import StrEnum
+from typing import Any
+
+from app.domain.models.location import (
+    Address,
+    Alias,
+    BoundingBox,
+    ClientLink,
+    Location,
+    LocationType,
+    LocationVersion,
+)
+from app.domain.repositories.location_index import IndexedPoint, PointQuery
 
 
 @dataclass(slots=True)
@@ -18,10 +30,103 @@ class LocationFilters:
     activo: bool | None = None
 
 
+class CountMode(StrEnum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
 @dataclass(slots=True)
 class Pagination:
     limit: int = 50
     offset: int = 0
+    cursor: str | None = None
+    count: CountMode = CountMode.EXACT
+
+
+class LocationInclude(StrEnum):
+    ADDRESS = "address"
+    ALIASES = "aliases"
+    CLIENTS = "clients"
+
+
+# Scalar attributes of ``Location`` and ``Address`` that a projection can select.
+LOCATION_FIELDS = (
+    "id",
+    "nombre_oficial",
+    "codigo",
+    "tipo",
+    "activo",
+    "es_global",
+    "created_at",
+    "updated_at",
+    "version",
+)
+ADDRESS_FIELDS = (
+    "calle",
+    "colonia",
+    "ciudad_text",
+    "estado_text",
+    "cp",
+    "lat",
+    "lng",
+    "referencia",
+    "created_at",
+    "updated_at",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class LocationProjection:
+    """Part of each location a listing loads and returns.
+
+    ``fields`` and ``address_fields`` select scalar attributes (``None`` keeps all of
+    them) and ``include`` the child collections. Attributes left out are ``None`` on the
+    returned entities, except ``id``, ``version`` and ``updated_at``, which are always
+    loaded because they identify the representation.
+    """
+
+    fields: frozenset[str] | None = None
+    address_fields: frozenset[str] | None = None
+    include: frozenset[LocationInclude] = frozenset(LocationInclude)
+
+    @property
+    def is_full(self) -> bool:
+        return self == FULL_PROJECTION
+
+
+FULL_PROJECTION = LocationProjection()
+
+
+@dataclass(slots=True)
+class LocationPage:
+    items: list[Location]
+    total: int | None
+    next_cursor: str | None = None
+    total_estimated: bool = False
+
+
+@dataclass(slots=True)
+class NearbyLocation:
+    location: Location
+    distance_m: float
+
+
+@dataclass(slots=True)
+class BoundingBoxResult:
+    """The ``limit`` matches closest to the box center; ``truncated`` if more matched."""
+
+    items: list[NearbyLocation]
+    truncated: bool = False
+
+
+@dataclass(slots=True)
+class BulkUpsertResult:
+    index: int
+    codigo: str
+    location_id: int | None = None
+    created: bool = False
+    error: str | None = None
 
 
 class LocationRepository(ABC):
@@ -40,16 +145,113 @@ class LocationRepository(ABC):
     ) -> Location:
         """Create a new location or update the aggregate when the unique code already exists."""
 
+    @abstractmethod
+    async def bulk_upsert_locations(self, items: Sequence[dict]) -> list[BulkUpsertResult]:
+        """Upsert many aggregates set-wise, returning one result per item in input order.
+
+        Each item carries the same keys as :meth:`upsert_location`. Items that cannot be
+        applied are reported with ``error`` instead of aborting the whole request.
+        """
+
     @abstractmethod
     async def list_locations(
-        self, filters: LocationFilters, pagination: Pagination
-    ) -> tuple[list[Location], int]:
-        """Return the list of locations and the total count matching the filters."""
+        self,
+        filters: LocationFilters,
+        pagination: Pagination,
+        projection: LocationProjection = FULL_PROJECTION,
+    ) -> LocationPage:
+        """Return a page of locations, the total count and the cursor of the next page.
+
+        Only the columns and child collections selected by ``projection`` are loaded.
+
+        When ``pagination.cursor`` is set the page starts right after the cursor position
+        (keyset seek) and ``pagination.offset`` is ignored. ``pagination.count`` decides
+        whether the total is counted exactly, estimated or skipped (``None``). Raises ``ValueError`` when the
+        cursor is malformed or belongs to a different sort order.
+        """
+
+    @abstractmethod
+    async def find_nearby(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        radius_m: float,
+        limit: int,
+        filters: LocationFilters,
+    ) -> list[NearbyLocation]:
+        """Return up to ``limit`` locations within ``radius_m`` of the point, closest first."""
+
+    @abstractmethod
+    async def find_in_bounding_box(
+        self, box: BoundingBox, *, limit: int, filters: LocationFilters
+    ) -> BoundingBoxResult:
+        """Return up to ``limit`` locations inside ``box``, closest to its center first."""
+
+    @abstractmethod
+    async def find_nearest_many(
+        self, queries: Sequence[PointQuery], *, activo: bool | None = None
+    ) -> list[tuple[int, float] | None]:
+        """Resolve the closest ``(location_id, distance_m)`` of every point, in input order.
+
+        Without a loaded spatial index, points are resolved one by one within 500 km and
+        batches over 500 points raise ``SpatialIndexUnavailableError``.
+        """
+
+    @abstractmethod
+    async def list_indexed_points(self) -> list[IndexedPoint]:
+        """Return the coordinates of every location whose address has lat/lng."""
+
+    @abstractmethod
+    async def list_ungeocoded_addresses(self, *, after_id: int, limit: int) -> list[Address]:
+        """Return addresses that have a street but no coordinates, ordered by ``localidad_id``."""
+
+    @abstractmethod
+    async def set_address_coordinates(
+        self,
+        coordinates: Mapping[int, tuple[float, float]],
+        *,
+        before_commit: Callable[[int], Awaitable[None]] | None = None,
+    ) -> int:
+        """Store ``(lat, lng)`` for addresses still missing them; return how many were filled.
+
+        ``before_commit`` is awaited with that count inside the same transaction, so
+        writes it makes commit (or roll back) together with the coordinates.
+        """
+
+    @abstractmethod
+    def stream_locations(self, filters: LocationFilters) -> AsyncIterator[dict[str, Any]]:
+        """Yield flat location rows (base fields, address, alias and client lists) by id.
+
+        Rows are produced from a server-side cursor so memory stays constant no matter
+        how many locations match the filters.
+        """
 
     @abstractmethod
     async def get_location(self, location_id: int) -> Location | None:
         """Return a location aggregate by identifier."""
 
+    @abstractmethod
+    async def get_location_by_codigo(self, codigo: str) -> Location | None:
+        """Return a location aggregate by its unique code."""
+
+    @abstractmethod
+    async def get_locations(
+        self, *, ids: Sequence[int] = (), codigos: Sequence[str] = ()
+    ) -> list[Location]:
+        """Return the aggregates matching any of ``ids`` or ``codigos`` in one round trip.
+
+        The result is unordered and holds each location once; unknown keys are skipped.
+        """
+
+    @abstractmethod
+    async def get_location_version(self, location_id: int) -> LocationVersion | None:
+        """Return the version stamp of a location without loading the aggregate."""
+
+    @abstractmethod
+    async def get_location_version_by_codigo(self, codigo: str) -> LocationVersion | None:
+        """Return the version stamp of a location looked up by its unique code."""
+
     @abstractmethod
     async def update_location(
         self,
@@ -0,0 +1,60 @@
+"""Entity tags and ``If-None-Match`` handling for location resources."""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from fastapi import Response, status
+
+from app.application.dto.location import LocationListResponse
+from app.domain.repositories.location_repository import FULL_PROJECTION, LocationProjection
+
+
+def _timestamp(value: datetime) -> str:
+    # SQLite hands back naive UTC values and PostgreSQL aware ones; normalise both so
+    # the tag does not depend on where the representation came from (DB or cache).
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _tag(parts: Iterable[object]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()}"'
+
+
+def location_etag(location_id: int, version: int, updated_at: datetime) -> str:
+    """Strong ETag of a single location representation."""
+    return _tag(("location", location_id, version, _timestamp(updated_at)))
+
+
+def location_list_etag(
+    page: LocationListResponse, projection: LocationProjection = FULL_PROJECTION
+) -> str:
+    """Strong ETag of a page: its items' versions, the paging metadata and the projection."""
+    parts: list[object] = ["page", page.total, page.total_estimated, page.next_cursor]
+    if not projection.is_full:
+        for names in (projection.fields, projection.address_fields, projection.include):
+            parts.append("*" if names is None else ",".join(sorted(names)))
+    for item in page.items:
+        parts.extend((item.id, item.version, _timestamp(item.updated_at)))
+    return _tag(parts)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag`` (RFC 9110, section 13.1.2)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
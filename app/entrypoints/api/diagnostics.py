@@ -0,0 +1,41 @@
+"""Operational endpoints exposing runtime metrics."""
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.metrics import get_request_metrics_registry
+from app.infrastructure.cache.location_cache import get_location_cache
+from app.infrastructure.db import session as db_session
+from app.infrastructure.db.pool import pool_status
+from app.infrastructure.geo.spatial_index import get_spatial_index
+from app.infrastructure.geocoding.service import get_geocoder
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/cache")
+async def cache_stats() -> dict[str, int]:
+    return get_location_cache().stats()
+
+
+@router.get("/pool")
+async def pool_stats() -> dict[str, Any]:
+    return pool_status(db_session.engine.sync_engine.pool)
+
+
+@router.get("/spatial-index")
+async def spatial_index_stats() -> dict[str, float]:
+    return get_spatial_index().stats()
+
+
+@router.get("/queries")
+async def query_findings() -> dict[str, dict[str, Any]]:
+    return get_request_metrics_registry().findings()
+
+
+@router.get("/geocoding")
+async def geocoding_stats() -> dict[str, Any]:
+    geocoder = get_geocoder()
+    return geocoder.stats() if geocoder is not None else {"provider": "none"}
@@ -3,39 +3,114 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.application.dto.location import (
     AddressUpdate,
     AliasDTO,
     AliasRead,
+    BatchGetRequest,
+    BatchGetResponse,
+    BoundingBoxResponse,
+    BulkLocationUpsert,
+    BulkUpsertResponse,
     ClientDeleteRequest,
     ClientRead,
     ClientRef,
+    ExportFormat,
     LocationCreate,
     LocationListResponse,
     LocationRead,
     LocationUpdate,
+    NearbyLocationsResponse,
+    NearestBatchRequest,
+    NearestBatchResponse,
 )
+from app.application.mappers.location_mapper import projection_exclude
+from app.application.use_cases.batch_get_locations import BatchGetLocations
+from app.application.use_cases.bulk_upsert_locations import BulkUpsertLocations
 from app.application.use_cases.create_or_update_location import CreateOrUpdateLocation
 from app.application.use_cases.get_location import GetLocation
-from app.application.use_cases.list_locations import ListLocations
+from app.application.use_cases.list_locations import ListLocations, parse_projection
 from app.application.use_cases.manage_aliases import AddLocationAlias, RemoveLocationAlias
 from app.application.use_cases.manage_clients import AddClientLink, RemoveClientLink
+from app.application.use_cases.resolve_nearest_locations import ResolveNearestLocations
 from app.application.use_cases.delete_location import DeleteLocation
+from app.application.use_cases.export_locations import ExportLocations
+from app.application.use_cases.find_nearby_locations import FindNearbyLocations
+from app.application.use_cases.geocode_address import GeocodeAddress
 from app.application.use_cases.update_address import UpdateLocationAddress
 from app.application.use_cases.update_location import UpdateLocation
-from app.domain.models.location import LocationType
-from app.domain.repositories.location_repository import LocationFilters, Pagination
-from app.infrastructure.db.session import get_session
+from app.domain.models.location import BoundingBox, LocationType
+from app.domain.repositories.location_repository import (
+    CountMode,
+    LocationFilters,
+    LocationProjection,
+    Pagination,
+)
+from app.entrypoints.api.conditional import (
+    etag_matches,
+    location_etag,
+    location_list_etag,
+    not_modified,
+)
+from app.entrypoints.api.responses import PydanticJSONResponse
+from app.infrastructure.cache.location_cache import get_location_cache
+from app.infrastructure.db.session import get_session, session_scope
+from app.infrastructure.geo.spatial_index import get_spatial_index
+from app.infrastructure.geocoding.service import get_geocoder
 from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
 
 router = APIRouter(prefix="/locations", tags=["localidades"])
 
+_NOT_MODIFIED = {304: {"description": "La representación no cambió desde el ETag enviado"}}
+
+_EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
 
 def _get_repository(session: AsyncSession) -> SQLAlchemyLocationRepository:
-    return SQLAlchemyLocationRepository(session)
+    return SQLAlchemyLocationRepository(
+        session, cache=get_location_cache(), spatial_index=get_spatial_index()
+    )
+
+
+def _get_address_geocoder() -> GeocodeAddress | None:
+    geocoder = get_geocoder()
+    return GeocodeAddress(geocoder) if geocoder is not None else None
+
+
+_FIELDS_DESCRIPTION = (
+    "Campos de cada localidad separados por comas; `address.<campo>` elige los de la "
+    "dirección (requiere `include=address`). `id` siempre se devuelve."
+)
+_INCLUDE_DESCRIPTION = (
+    "Relaciones a incluir separadas por comas (`address`, `aliases`, `clients`); "
+    "vacío para ninguna. Por defecto se incluyen todas."
+)
+
+
+async def _conditional_page(
+    use_case: ListLocations,
+    filters: LocationFilters,
+    pagination: Pagination,
+    projection: LocationProjection,
+    if_none_match: str | None,
+) -> Response:
+    # Revalidation only needs the page's version stamps, not its columns and children.
+    if if_none_match:
+        etag = location_list_etag(await use_case.versions(filters, pagination), projection)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = await use_case.execute(filters, pagination, projection)
+    etag = location_list_etag(page, projection)
+    return PydanticJSONResponse(
+        page, exclude=projection_exclude(projection), headers={"ETag": etag}
+    )
 
 
 @router.post("", response_model=LocationRead, status_code=status.HTTP_201_CREATED)
@@ -44,11 +119,39 @@ async def create_or_update_location(
     session: AsyncSession = Depends(get_session),
 ) -> LocationRead:
     repository = _get_repository(session)
-    use_case = CreateOrUpdateLocation(repository)
+    use_case = CreateOrUpdateLocation(repository, _get_address_geocoder())
+    return await use_case.execute(payload)
+
+
+@router.post("/bulk", response_model=BulkUpsertResponse)
+async def bulk_upsert_locations(
+    payload: BulkLocationUpsert,
+    session: AsyncSession = Depends(get_session),
+) -> BulkUpsertResponse:
+    repository = _get_repository(session)
+    use_case = BulkUpsertLocations(repository)
+    return await use_case.execute(payload)
+
+
+@router.post("/nearest/batch", response_model=NearestBatchResponse)
+async def resolve_nearest_locations(
+    payload: NearestBatchRequest,
+    session: AsyncSession = Depends(get_session),
+) -> NearestBatchResponse:
+    use_case = ResolveNearestLocations(_get_repository(session))
     return await use_case.execute(payload)
 
 
-@router.get("", response_model=LocationListResponse)
+@router.post("/batch-get", response_model=BatchGetResponse)
+async def batch_get_locations(
+    payload: BatchGetRequest,
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    use_case = BatchGetLocations(_get_repository(session), cache=get_location_cache())
+    return PydanticJSONResponse(await use_case.execute(payload))
+
+
+@router.get("", response_model=LocationListResponse, responses=_NOT_MODIFIED)
 async def list_locations(
     q: Annotated[str | None, Query(max_length=255)] = None,
     cliente_source: Annotated[str | None, Query(max_length=50)] = None,
@@ -59,8 +162,13 @@ async def list_locations(
     activo: bool | None = Query(None),
     limit: Annotated[int, Query(ge=1, le=200)] = 50,
     offset: Annotated[int, Query(ge=0)] = 0,
+    cursor: Annotated[str | None, Query(max_length=1024)] = None,
+    count: CountMode = Query(CountMode.EXACT),
+    fields: Annotated[str | None, Query(max_length=500, description=_FIELDS_DESCRIPTION)] = None,
+    include: Annotated[str | None, Query(max_length=100, description=_INCLUDE_DESCRIPTION)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(get_session),
-) -> LocationListResponse:
+) -> Response:
     filters = LocationFilters(
         query=q,
         cliente_source=cliente_source,
@@ -70,20 +178,159 @@ async def list_locations(
         tipo=tipo,
         activo=activo,
     )
-    pagination = Pagination(limit=limit, offset=offset)
+    pagination = Pagination(limit=limit, offset=offset, cursor=cursor, count=count)
+    projection = parse_projection(fields, include)
     repository = _get_repository(session)
     use_case = ListLocations(repository)
-    return await use_case.execute(filters, pagination)
+    return await _conditional_page(use_case, filters, pagination, projection, if_none_match)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media: {} for media in _EXPORT_MEDIA_TYPES.values()}}},
+)
+async def export_locations(
+    q: Annotated[str | None, Query(max_length=255)] = None,
+    cliente_source: Annotated[str | None, Query(max_length=50)] = None,
+    cliente_external_id: Annotated[str | None, Query(max_length=100)] = None,
+    estado: Annotated[str | None, Query(max_length=255)] = None,
+    ciudad: Annotated[str | None, Query(max_length=255)] = None,
+    tipo: LocationType | None = Query(None),
+    activo: bool | None = Query(None),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+) -> StreamingResponse:
+    filters = LocationFilters(
+        query=q,
+        cliente_source=cliente_source,
+        cliente_external_id=cliente_external_id,
+        estado=estado,
+        ciudad=ciudad,
+        tipo=tipo,
+        activo=activo,
+    )
+
+    # The request-scoped session is closed before the body is streamed, so the export
+    # owns its session for the lifetime of the response.
+    async def _stream():
+        async with session_scope() as session:
+            use_case = ExportLocations(_get_repository(session))
+            async for chunk in use_case.execute(filters, export_format):
+                yield chunk
 
+    return StreamingResponse(
+        _stream(),
+        media_type=_EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="locations.{export_format.value}"'
+        },
+    )
 
-@router.get("/{location_id}", response_model=LocationRead)
+
+@router.get("/nearby", response_model=NearbyLocationsResponse)
+async def find_nearby_locations(
+    lat: Annotated[float, Query(ge=-90.0, le=90.0)],
+    lng: Annotated[float, Query(ge=-180.0, le=180.0)],
+    radius_m: Annotated[float, Query(gt=0, le=500_000)] = 5_000,
+    k: Annotated[int, Query(ge=1, le=200)] = 10,
+    q: Annotated[str | None, Query(max_length=255)] = None,
+    cliente_source: Annotated[str | None, Query(max_length=50)] = None,
+    cliente_external_id: Annotated[str | None, Query(max_length=100)] = None,
+    estado: Annotated[str | None, Query(max_length=255)] = None,
+    ciudad: Annotated[str | None, Query(max_length=255)] = None,
+    tipo: LocationType | None = Query(None),
+    activo: bool | None = Query(None),
+    session: AsyncSession = Depends(get_session),
+) -> NearbyLocationsResponse:
+    filters = LocationFilters(
+        query=q,
+        cliente_source=cliente_source,
+        cliente_external_id=cliente_external_id,
+        estado=estado,
+        ciudad=ciudad,
+        tipo=tipo,
+        activo=activo,
+    )
+    use_case = FindNearbyLocations(_get_repository(session))
+    return await use_case.execute(lat, lng, radius_m=radius_m, limit=k, filters=filters)
+
+
+@router.get("/bbox", response_model=BoundingBoxResponse)
+async def find_locations_in_bounding_box(
+    min_lat: Annotated[float, Query(ge=-90.0, le=90.0)],
+    min_lng: Annotated[float, Query(ge=-180.0, le=180.0)],
+    max_lat: Annotated[float, Query(ge=-90.0, le=90.0)],
+    max_lng: Annotated[float, Query(ge=-180.0, le=180.0)],
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    q: Annotated[str | None, Query(max_length=255)] = None,
+    cliente_source: Annotated[str | None, Query(max_length=50)] = None,
+    cliente_external_id: Annotated[str | None, Query(max_length=100)] = None,
+    estado: Annotated[str | None, Query(max_length=255)] = None,
+    ciudad: Annotated[str | None, Query(max_length=255)] = None,
+    tipo: LocationType | None = Query(None),
+    activo: bool | None = Query(None),
+    session: AsyncSession = Depends(get_session),
+) -> BoundingBoxResponse:
+    filters = LocationFilters(
+        query=q,
+        cliente_source=cliente_source,
+        cliente_external_id=cliente_external_id,
+        estado=estado,
+        ciudad=ciudad,
+        tipo=tipo,
+        activo=activo,
+    )
+    use_case = FindNearbyLocations(_get_repository(session))
+    return await use_case.execute_in_bounding_box(
+        BoundingBox(min_lat=min_lat, min_lng=min_lng, max_lat=max_lat, max_lng=max_lng),
+        limit=limit,
+        filters=filters,
+    )
+
+
+@router.get("/by-codigo/{codigo}", response_model=LocationRead, responses=_NOT_MODIFIED)
+async def get_location_by_codigo(
+    codigo: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    repository = _get_repository(session)
+    use_case = GetLocation(repository, cache=get_location_cache())
+    version = None
+    if if_none_match:
+        version = await use_case.version_by_codigo(codigo)
+        etag = location_etag(version.id, version.version, version.updated_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    # A cached body older than the stamp just read is skipped, so the ETag never lags it.
+    location = await use_case.execute_by_codigo(codigo, expected=version)
+    return PydanticJSONResponse(
+        location.body,
+        headers={"ETag": location_etag(location.id, location.version, location.updated_at)},
+    )
+
+
+@router.get("/{location_id}", response_model=LocationRead, responses=_NOT_MODIFIED)
 async def get_location(
     location_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(get_session),
-) -> LocationRead:
+) -> Response:
     repository = _get_repository(session)
-    use_case = GetLocation(repository)
-    return await use_case.execute(location_id)
+    use_case = GetLocation(repository, cache=get_location_cache())
+    # Revalidation only needs the version stamp, not the aggregate and its children.
+    version = None
+    if if_none_match:
+        version = await use_case.version(location_id)
+        etag = location_etag(version.id, version.version, version.updated_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    # A cached body older than the stamp just read is skipped, so the ETag never lags it.
+    location = await use_case.execute(location_id, expected=version)
+    return PydanticJSONResponse(
+        location.body,
+        headers={"ETag": location_etag(location.id, location.version, location.updated_at)},
+    )
 
 
 @router.put("/{location_id}", response_model=LocationRead)
@@ -106,7 +353,7 @@ async def update_location_address(
     session: AsyncSession = Depends(get_session),
 ) -> LocationRead:
     repository = _get_repository(session)
-    use_case = UpdateLocationAddress(repository)
+    use_case = UpdateLocationAddress(repository, _get_address_geocoder())
     return await use_case.execute(location_id, payload)
 
 
@@ -187,6 +434,7 @@ async def delete_client(
 @router.get(
     "/by-client/{cliente_source}/{cliente_external_id}",
     response_model=LocationListResponse,
+    responses=_NOT_MODIFIED,
 )
 async def list_locations_by_client(
     cliente_source: str,
@@ -198,8 +446,13 @@ async def list_locations_by_client(
     activo: bool | None = Query(None),
     limit: Annotated[int, Query(ge=1, le=200)] = 50,
     offset: Annotated[int, Query(ge=0)] = 0,
+    cursor: Annotated[str | None, Query(max_length=1024)] = None,
+    count: CountMode = Query(CountMode.EXACT),
+    fields: Annotated[str | None, Query(max_length=500, description=_FIELDS_DESCRIPTION)] = None,
+    include: Annotated[str | None, Query(max_length=100, description=_INCLUDE_DESCRIPTION)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(get_session),
-) -> LocationListResponse:
+) -> Response:
     filters = LocationFilters(
         query=q,
         cliente_source=cliente_source,
@@ -209,7 +462,8 @@ async def list_locations_by_client(
         tipo=tipo,
         activo=activo,
     )
-    pagination = Pagination(limit=limit, offset=offset)
+    pagination = Pagination(limit=limit, offset=offset, cursor=cursor, count=count)
+    projection = parse_projection(fields, include)
     repository = _get_repository(session)
     use_case = ListLocations(repository)
-    return await use_case.execute(filters, pagination)
+    return await _conditional_page(use_case, filters, pagination, projection, if_none_match)
@@ -0,0 +1,80 @@
+"""Request instrumentation middleware and the Prometheus scrape endpoint."""
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    RequestMetricsRegistry,
+    get_request_metrics_registry,
+    measure_request,
+)
+
+router = APIRouter(tags=["diagnostics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetricsMiddleware:
+    """Measure every HTTP request: latency, SQL statements and serialization time.
+
+    Requests are labelled with their route template (``/locations/{location_id}``) so
+    the series stay bounded. With ``server_timing`` the totals gathered until the
+    response starts are also sent back in a ``Server-Timing`` header. Statement shapes
+    are tracked for the query detector when ``debug`` or ``query_detector_enabled`` is on.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        server_timing: bool = True,
+        registry: RequestMetricsRegistry | None = None,
+    ) -> None:
+        self.app = app
+        self._server_timing = server_timing
+        self._registry = registry or get_request_metrics_registry()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        detect_queries = settings.debug or settings.query_detector_enabled
+        status_code = 500
+        with measure_request(detect_queries=detect_queries) as metrics:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if self._server_timing:
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing", metrics.server_timing()
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                self._registry.observe(
+                    scope["method"],
+                    route,
+                    status_code,
+                    time.perf_counter() - metrics.started,
+                    metrics,
+                )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        get_request_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -0,0 +1,31 @@
+"""Response classes that serialize DTOs once, without FastAPI's response validation."""
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.metrics import measure_serialization
+
+
+class PydanticJSONResponse(JSONResponse):
+    """Encode a DTO straight to JSON bytes with pydantic-core.
+
+    Returning a ``Response`` from a route skips ``response_model`` processing, which
+    would otherwise dump the DTO to dicts, validate them again and re-encode them. Keep
+    ``response_model`` on the route for the OpenAPI schema. ``exclude`` is passed on to
+    ``model_dump_json``.
+    """
+
+    def __init__(self, content: Any, *, exclude: Any = None, **kwargs: Any) -> None:
+        self._exclude = exclude
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            with measure_serialization():
+                return content.model_dump_json(exclude=self._exclude).encode()
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
@@ -0,0 +1,237 @@
+"""Key/value backends shared by every worker process.
+
+``RedisCacheBackend`` speaks the Redis serialization protocol (RESP2) directly over
+asyncio streams, so any Redis-compatible server (Redis, Valkey, KeyDB, test fakes) can
+back the cache without an extra client dependency.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+
+class CacheBackendError(Exception):
+    """Raised when the backend rejects a command or the connection fails."""
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return the value stored under ``key``."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Atomically increment the integer under ``key`` (from 0) and return it."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Remove the keys, ignoring the ones that do not exist."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None:
+        """Broadcast ``message`` to every subscriber of ``channel``."""
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        """Subscribe to ``channel`` and return an iterator over its messages.
+
+        The subscription is active once the coroutine returns, so nothing published
+        afterwards is missed.
+        """
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local backend, useful for single-worker deployments and tests."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[float, bytes]] = {}
+        self._subscribers: dict[str, set[asyncio.Queue[bytes]]] = defaultdict(set)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._data[key] = (float("inf"), str(value).encode())
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._subscribers[channel]:
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self._subscribers[channel].add(queue)
+
+        async def _messages() -> AsyncIterator[bytes]:
+            try:
+                while True:
+                    yield await queue.get()
+            finally:
+                self._subscribers[channel].discard(queue)
+
+        return _messages()
+
+
+class _RedisConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def open(
+        cls, host: str, port: int, password: str | None, db: int, timeout: float
+    ) -> _RedisConnection:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        connection = cls(reader, writer)
+        if password:
+            await connection.execute("AUTH", password)
+        if db:
+            await connection.execute("SELECT", str(db))
+        return connection
+
+    async def execute(self, *args: str | bytes) -> Any:
+        await self.send(*args)
+        return await self.read_reply()
+
+    async def send(self, *args: str | bytes) -> None:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode() if isinstance(arg, str) else arg
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+
+    async def read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise CacheBackendError("Connection closed by the cache server")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body
+        if prefix == b"-":
+            raise CacheBackendError(body.decode(errors="replace"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply from cache server: {line!r}")
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend for servers that speak the Redis protocol, with a small connection pool."""
+
+    def __init__(self, url: str, *, max_connections: int = 10, timeout: float = 1.0) -> None:
+        parsed = urlparse(url)
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._password = unquote(parsed.password) if parsed.password else None
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._timeout = timeout
+        self._idle: list[_RedisConnection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _open(self) -> _RedisConnection:
+        return await _RedisConnection.open(
+            self._host, self._port, self._password, self._db, self._timeout
+        )
+
+    async def _execute(self, *args: str | bytes) -> Any:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = await self._open()
+                reply = await asyncio.wait_for(connection.execute(*args), self._timeout)
+            except CacheBackendError:
+                if connection is not None:
+                    await connection.close()
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+                if connection is not None:
+                    await connection.close()
+                raise CacheBackendError(str(exc) or type(exc).__name__) from exc
+            self._idle.append(connection)
+            return reply
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._execute("SET", key, value, "PX", str(max(1, int(ttl * 1000))))
+
+    async def incr(self, key: str) -> int:
+        return await self._execute("INCR", key)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._execute("DEL", *keys)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._execute("PUBLISH", channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        try:
+            connection = await self._open()
+            await connection.send("SUBSCRIBE", channel)
+            await asyncio.wait_for(connection.read_reply(), self._timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            raise CacheBackendError(str(exc) or type(exc).__name__) from exc
+
+        async def _messages() -> AsyncIterator[bytes]:
+            try:
+                while True:
+                    try:
+                        reply = await connection.read_reply()
+                    except (OSError, asyncio.IncompleteReadError) as exc:
+                        raise CacheBackendError(str(exc) or type(exc).__name__) from exc
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        yield reply[2]
+            finally:
+                await connection.close()
+
+        return _messages()
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
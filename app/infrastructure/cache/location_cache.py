@@ -0,0 +1,347 @@
+"""Caches for serialized location aggregates.
+
+``InMemoryLocationCache`` lives inside one worker. ``SharedLocationCache`` keeps a short
+lived in-process tier in front of a :class:`CacheBackend` shared by every worker and
+broadcasts invalidations so the other workers drop their local copies too.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.domain.repositories.location_cache import LocationCache
+from app.infrastructure.cache.backends import (
+    CacheBackend,
+    CacheBackendError,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+)
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "locations:invalidate"
+# Shared counter of invalidations; a read token is its value when the read started.
+INVALIDATION_COUNTER = "locations:invalidations"
+
+
+class InMemoryLocationCache(LocationCache):
+    """Per-process cache. Read tokens are the invalidation count when the read started;
+    a ``set`` is dropped when its location was invalidated after that."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._entries: TTLCache[int, tuple[str, bytes]] = TTLCache(maxsize, ttl)
+        self._codigos: TTLCache[str, int] = TTLCache(maxsize, ttl)
+        self._invalidations = 0
+        # Invalidation count at the last invalidation of each recent id. Older records
+        # are forgotten past ``maxsize``; ``_forgotten`` keeps their highest count so
+        # tokens older than that are refused instead of trusted.
+        self._invalidated: OrderedDict[int, int] = OrderedDict()
+        self._invalidated_maxsize = maxsize
+        self._forgotten = 0
+        self._stale_writes = 0
+
+    async def get(self, location_id: int) -> bytes | None:
+        entry = self._entries.get(location_id)
+        return entry[1] if entry is not None else None
+
+    async def get_by_codigo(self, codigo: str) -> bytes | None:
+        location_id = self._codigos.get(codigo)
+        if location_id is None:
+            return None
+        entry = self._entries.get(location_id)
+        # The code may have been reassigned since the index entry was written.
+        if entry is None or entry[0] != codigo:
+            self._codigos.pop(codigo)
+            return None
+        return entry[1]
+
+    async def read_token(self) -> int:
+        return self._invalidations
+
+    async def set(
+        self, location_id: int, codigo: str, payload: bytes, token: object | None = None
+    ) -> None:
+        if isinstance(token, int) and self._is_stale(location_id, token):
+            self._stale_writes += 1
+            return
+        self._entries.set(location_id, (codigo, payload))
+        self._codigos.set(codigo, location_id)
+
+    def _is_stale(self, location_id: int, token: int) -> bool:
+        return token < self._forgotten or self._invalidated.get(location_id, 0) > token
+
+    async def invalidate(self, location_id: int) -> None:
+        entry = self._entries.pop(location_id)
+        if entry is not None:
+            self._codigos.pop(entry[0])
+        self._invalidations += 1
+        self._invalidated[location_id] = self._invalidations
+        self._invalidated.move_to_end(location_id)
+        if len(self._invalidated) > self._invalidated_maxsize:
+            _, count = self._invalidated.popitem(last=False)
+            self._forgotten = max(self._forgotten, count)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._codigos.clear()
+
+    def stats(self) -> dict[str, int]:
+        by_id = self._entries.stats
+        by_codigo = self._codigos.stats
+        return {
+            "hits": by_id.hits,
+            "misses": by_id.misses + by_codigo.misses,
+            "evictions": by_id.evictions,
+            "invalidations": self._invalidations,
+            "stale_writes": self._stale_writes,
+            "size": by_id.size,
+        }
+
+
+class SharedLocationCache(LocationCache):
+    """Two-tier cache: per-process LRU in front of a backend shared across workers.
+
+    Writers delete the shared entry and publish the id on ``INVALIDATION_CHANNEL``;
+    every worker listens on the channel and evicts its local tier. Backend failures
+    degrade to cache misses so the database stays the source of truth.
+
+    Each invalidation also bumps ``INVALIDATION_COUNTER`` and records the new value for
+    the id. A read token holds the counter from before the database read, and a
+    guarded ``set`` is skipped, or undone, when the id was invalidated after it.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        ttl: float,
+        local_maxsize: int,
+        local_ttl: float,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self._backend = backend
+        self._ttl = ttl
+        self._local = InMemoryLocationCache(local_maxsize, local_ttl)
+        self._reconnect_delay = reconnect_delay
+        self._listener: asyncio.Task[None] | None = None
+        self._subscribed = asyncio.Event()
+        self._shared_hits = 0
+        self._shared_misses = 0
+        self._shared_stale_writes = 0
+        self._errors = 0
+
+    @staticmethod
+    def _id_key(location_id: int) -> str:
+        return f"locations:id:{location_id}"
+
+    @staticmethod
+    def _codigo_key(codigo: str) -> str:
+        return f"locations:codigo:{codigo}"
+
+    @staticmethod
+    def _invalidated_key(location_id: int) -> str:
+        return f"locations:invalidated:{location_id}"
+
+    async def get(self, location_id: int) -> bytes | None:
+        payload = await self._local.get(location_id)
+        if payload is not None:
+            return payload
+        # Taken before the shared read so a copy invalidated meanwhile is not kept locally.
+        local_token = await self._local.read_token()
+        entry = await self._backend_call(self._backend.get(self._id_key(location_id)))
+        return await self._accept(location_id, entry, local_token)
+
+    async def get_by_codigo(self, codigo: str) -> bytes | None:
+        payload = await self._local.get_by_codigo(codigo)
+        if payload is not None:
+            return payload
+        local_token = await self._local.read_token()
+        raw_id = await self._backend_call(self._backend.get(self._codigo_key(codigo)))
+        if raw_id is None:
+            self._shared_misses += 1
+            return None
+        location_id = int(raw_id)
+        entry = await self._backend_call(self._backend.get(self._id_key(location_id)))
+        return await self._accept(location_id, entry, local_token, expected_codigo=codigo)
+
+    async def _accept(
+        self,
+        location_id: int,
+        entry: bytes | None,
+        local_token: int,
+        expected_codigo: str | None = None,
+    ) -> bytes | None:
+        if entry is None:
+            self._shared_misses += 1
+            return None
+        raw_codigo, _, payload = entry.partition(b"\x00")
+        codigo = raw_codigo.decode()
+        if expected_codigo is not None and codigo != expected_codigo:
+            self._shared_misses += 1
+            return None
+        self._shared_hits += 1
+        await self._local.set(location_id, codigo, payload, local_token)
+        return payload
+
+    async def read_token(self) -> tuple[int, int | None]:
+        local_token = await self._local.read_token()
+        try:
+            counter = await self._backend.get(INVALIDATION_COUNTER)
+        except CacheBackendError as exc:
+            # Without a shared token the shared write is skipped.
+            self._errors += 1
+            logger.warning("Location cache backend unavailable: %s", exc)
+            return local_token, None
+        return local_token, int(counter or 0)
+
+    async def set(
+        self, location_id: int, codigo: str, payload: bytes, token: object | None = None
+    ) -> None:
+        guarded = isinstance(token, tuple)
+        local_token, shared_token = token if guarded else (None, None)
+        if shared_token is not None and await self._invalidated_after(location_id, shared_token):
+            return
+        await self._local.set(location_id, codigo, payload, local_token)
+        if guarded and shared_token is None:
+            return
+        await self._backend_call(
+            self._backend.set(
+                self._id_key(location_id), codigo.encode() + b"\x00" + payload, self._ttl
+            )
+        )
+        await self._backend_call(
+            self._backend.set(self._codigo_key(codigo), str(location_id).encode(), self._ttl)
+        )
+        # An invalidation may have landed between the check and the write. Writers record
+        # it before deleting the entry, so it is either seen here or deletes the entry.
+        if guarded and await self._invalidated_after(location_id, shared_token):
+            await self._local.invalidate(location_id)
+            await self._backend_call(self._backend.delete(self._id_key(location_id)))
+
+    async def _invalidated_after(self, location_id: int, shared_token: int) -> bool:
+        raw = await self._backend_call(self._backend.get(self._invalidated_key(location_id)))
+        if raw is not None and int(raw) > shared_token:
+            self._shared_stale_writes += 1
+            return True
+        return False
+
+    async def invalidate(self, location_id: int) -> None:
+        await self._local.invalidate(location_id)
+        count = await self._backend_call(self._backend.incr(INVALIDATION_COUNTER))
+        if count is not None:
+            await self._backend_call(
+                self._backend.set(
+                    self._invalidated_key(location_id), str(count).encode(), self._ttl
+                )
+            )
+        await self._backend_call(self._backend.delete(self._id_key(location_id)))
+        await self._backend_call(
+            self._backend.publish(INVALIDATION_CHANNEL, str(location_id).encode())
+        )
+
+    async def clear(self) -> None:
+        await self._local.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self._local.stats(),
+            "shared_hits": self._shared_hits,
+            "shared_misses": self._shared_misses,
+            "shared_stale_writes": self._shared_stale_writes,
+            "backend_errors": self._errors,
+        }
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            await self._subscribed.wait()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        await self._backend.close()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                messages = await self._backend.subscribe(INVALIDATION_CHANNEL)
+                self._subscribed.set()
+                try:
+                    async for message in messages:
+                        await self._local.invalidate(int(message))
+                finally:
+                    await messages.aclose()
+            except (CacheBackendError, ValueError) as exc:
+                self._errors += 1
+                logger.warning("Location cache invalidation listener failed: %s", exc)
+                self._subscribed.set()
+                # Messages may have been missed while disconnected.
+                await self._local.clear()
+                await asyncio.sleep(self._reconnect_delay)
+
+    async def _backend_call(self, operation):  # noqa: ANN001, ANN202
+        try:
+            return await operation
+        except CacheBackendError as exc:
+            self._errors += 1
+            logger.warning("Location cache backend unavailable: %s", exc)
+            return None
+
+
+class NullLocationCache(LocationCache):
+    """Cache used when caching is disabled: never stores anything."""
+
+    async def get(self, location_id: int) -> bytes | None:
+        return None
+
+    async def get_by_codigo(self, codigo: str) -> bytes | None:
+        return None
+
+    async def set(
+        self, location_id: int, codigo: str, payload: bytes, token: object | None = None
+    ) -> None:
+        return None
+
+    async def invalidate(self, location_id: int) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "size": 0}
+
+
+def build_location_cache(backend: str) -> LocationCache:
+    settings = get_settings()
+    if not settings.location_cache_enabled or backend == "none":
+        return NullLocationCache()
+    if backend == "local":
+        return InMemoryLocationCache(
+            settings.location_cache_max_entries, settings.location_cache_ttl_seconds
+        )
+    if backend == "memory":
+        shared: CacheBackend = InMemoryCacheBackend()
+    elif backend == "redis":
+        shared = RedisCacheBackend(settings.location_cache_redis_url)
+    else:
+        raise ValueError(f"Unknown location cache backend: {backend}")
+    return SharedLocationCache(
+        shared,
+        ttl=settings.location_cache_ttl_seconds,
+        local_maxsize=settings.location_cache_max_entries,
+        local_ttl=settings.location_cache_local_ttl_seconds,
+    )
+
+
+@lru_cache
+def get_location_cache() -> LocationCache:
+    return build_location_cache(get_settings().location_cache_backend)
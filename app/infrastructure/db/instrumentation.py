@@ -0,0 +1,54 @@
+"""Engine hooks that attribute SQL statements and their duration to the current request."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import get_settings
+from app.core.metrics import current_request_metrics
+
+logger = logging.getLogger(__name__)
+
+_STARTED = "query_started"
+
+
+def install_query_timing(engine: Engine) -> None:
+    """Time every cursor execution on ``engine`` (once per engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn: Connection, *_: Any) -> None:
+    conn.info.setdefault(_STARTED, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection, _cursor: Any, statement: str, *_: Any
+) -> None:
+    _record(time.perf_counter() - conn.info[_STARTED].pop(), statement)
+
+
+def _handle_error(context: Any) -> None:
+    started = context.connection.info.get(_STARTED) if context.connection is not None else None
+    if started:
+        _record(time.perf_counter() - started.pop(), context.statement or "")
+
+
+def _record(elapsed: float, statement: str) -> None:
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics.record_query(elapsed, statement)
+    threshold_ms = get_settings().slow_query_threshold_ms
+    if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+        if metrics is not None:
+            # Logged once the request finishes, when its route is known.
+            metrics.slow_queries.append((elapsed, statement))
+        else:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
@@ -4,15 +4,20 @@ from __future__ import annotations
 from datetime import datetime
 
 from sqlalchemy import (
+    DDL,
     JSON,
     Boolean,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    Text,
     UniqueConstraint,
+    event,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -23,6 +28,7 @@ from app.infrastructure.db.base import Base
 
 class LocationModel(Base):
     __tablename__ = "localidades"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     nombre_oficial: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
@@ -35,6 +41,9 @@ class LocationModel(Base):
     )
     activo: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true")
     es_global: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    search_text: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
+    # Bumped on every write to the aggregate (including its child rows); feeds the ETag.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -45,19 +54,57 @@ class LocationModel(Base):
     address: Mapped["AddressModel | None"] = relationship(
         back_populates="location", cascade="all, delete-orphan", uselist=False
     )
+    # Collections load in a fixed order; the location_search read model aggregates the same.
     aliases: Mapped[list["LocationAliasModel"]] = relationship(
-        back_populates="location", cascade="all, delete-orphan"
+        back_populates="location",
+        cascade="all, delete-orphan",
+        order_by="LocationAliasModel.id",
     )
     clients: Mapped[list["LocationClientModel"]] = relationship(
-        back_populates="location", cascade="all, delete-orphan"
+        back_populates="location",
+        cascade="all, delete-orphan",
+        order_by=lambda: (
+            LocationClientModel.cliente_source,
+            LocationClientModel.cliente_external_id,
+            LocationClientModel.rol,
+        ),
     )
     geocoding_cache: Mapped[list["GeocodingCacheModel"]] = relationship(
         back_populates="location", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Global locations are a small slice of the table; client listings always add them.
+        Index(
+            "ix_localidades_global",
+            "id",
+            postgresql_where=text("es_global"),
+            sqlite_where=text("es_global = 1"),
+        ),
+    )
+
+
+# PostgreSQL-only search structures: the generated tsvector column and the GIN indexes
+# are not part of the ORM mapping so SQLite keeps working with plain ``create_all``.
+for _statement in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE localidades ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_localidades_search_text_trgm "
+    "ON localidades USING gin (search_text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_localidades_search_vector "
+    "ON localidades USING gin (search_vector)",
+):
+    event.listen(
+        LocationModel.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+
 
 class AddressModel(Base):
     __tablename__ = "direcciones"
+    __mapper_args__ = {"eager_defaults": True}
 
     localidad_id: Mapped[int] = mapped_column(
         Integer,
@@ -72,6 +119,8 @@ class AddressModel(Base):
     lat: Mapped[float | None] = mapped_column(Float)
     lng: Mapped[float | None] = mapped_column(Float)
     referencia: Mapped[str | None] = mapped_column(String(500))
+    # Geohash of (lat, lng); prefix scans on it back the proximity queries.
+    geohash: Mapped[str | None] = mapped_column(String(12))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -81,9 +130,23 @@ class AddressModel(Base):
 
     location: Mapped[LocationModel] = relationship(back_populates="address")
 
+    __table_args__ = (
+        Index(
+            "ix_direcciones_geohash",
+            "geohash",
+            postgresql_ops={"geohash": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_direcciones_missing_coords",
+            "localidad_id",
+            postgresql_where=text("lat IS NULL OR lng IS NULL"),
+        ),
+    )
+
 
 class LocationAliasModel(Base):
     __tablename__ = "localidad_alias"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     localidad_id: Mapped[int] = mapped_column(
@@ -103,6 +166,7 @@ class LocationAliasModel(Base):
 
 class LocationClientModel(Base):
     __tablename__ = "localidad_clientes"
+    __mapper_args__ = {"eager_defaults": True}
 
     localidad_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("localidades.id", ondelete="CASCADE"), primary_key=True
@@ -116,23 +180,76 @@ class LocationClientModel(Base):
 
     location: Mapped[LocationModel] = relationship(back_populates="clients")
 
+    __table_args__ = (
+        # The primary key leads with localidad_id; lookups by client need their own index,
+        # and carrying localidad_id makes it covering.
+        Index(
+            "ix_localidad_clientes_cliente",
+            "cliente_source",
+            "cliente_external_id",
+            "localidad_id",
+        ),
+    )
+
+
+class LocationSearchModel(Base):
+    """Listing read model: the child rows of each aggregate pre-serialized as JSON.
+
+    Kept in sync by the repository inside the same transaction as every write when
+    ``API_MAPBOX_LOCATION_READ_MODEL_ENABLED`` is set.
+    """
+
+    __tablename__ = "location_search"
+
+    localidad_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("localidades.id", ondelete="CASCADE"), primary_key=True
+    )
+    # ``localidades.version`` the row was built from; a mismatch means it is stale.
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    address: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    aliases: Mapped[list] = mapped_column(JSON, nullable=False)
+    clients: Mapped[list] = mapped_column(JSON, nullable=False)
+
 
 class GeocodingCacheModel(Base):
     __tablename__ = "geocoding_cache"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    localidad_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("localidades.id", ondelete="CASCADE"), nullable=False
+    localidad_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("localidades.id", ondelete="CASCADE"), nullable=True
     )
     provider: Mapped[str] = mapped_column(String(50), nullable=False)
-    external_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Digest of the normalized address text; rows without it predate the lookup cache.
+    query_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # ``NULL`` for negative entries (the provider found no match).
+    external_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    lng: Mapped[float | None] = mapped_column(Float, nullable=True)
     raw_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
-    location: Mapped[LocationModel] = relationship(back_populates="geocoding_cache")
+    location: Mapped[LocationModel | None] = relationship(back_populates="geocoding_cache")
 
     __table_args__ = (
         UniqueConstraint("localidad_id", "provider", "external_id", name="uq_geocoding"),
+        Index("uq_geocoding_cache_query", "provider", "query_key", unique=True),
+    )
+
+
+class GeocodingBackfillModel(Base):
+    __tablename__ = "geocoding_backfill"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    last_localidad_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    scanned: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    geocoded: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    not_found: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
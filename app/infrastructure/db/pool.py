@@ -0,0 +1,70 @@
+"""Connection pool with checkout telemetry."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection, QueuePool
+
+
+@dataclass(slots=True)
+class PoolCheckoutStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += elapsed
+        if elapsed > self.wait_seconds_max:
+            self.wait_seconds_max = elapsed
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to obtain a connection.
+
+    The wait covers queueing for a free slot plus opening (or pre-pinging) the
+    connection, which is the latency a request sees before its first query.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = PoolCheckoutStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.timeouts += 1
+            raise
+        finally:
+            self.checkout_stats.record(time.perf_counter() - started)
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """Snapshot of the pool occupancy and, when instrumented, its checkout waits."""
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+        )
+    stats = getattr(pool, "checkout_stats", None)
+    if isinstance(stats, PoolCheckoutStats):
+        status.update(
+            checkouts=stats.checkouts,
+            checkout_timeouts=stats.timeouts,
+            wait_seconds_total=round(stats.wait_seconds_total, 6),
+            wait_seconds_avg=round(stats.wait_seconds_total / stats.checkouts, 6)
+            if stats.checkouts
+            else 0.0,
+            wait_seconds_max=round(stats.wait_seconds_max, 6),
+        )
+    return status
@@ -1,15 +1,61 @@
 """Database session and engine configuration."""
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 from app.infrastructure.db.base import Base
 from app.infrastructure.db import models  # noqa: F401
+from app.infrastructure.db.instrumentation import install_query_timing
+from app.infrastructure.db.pool import InstrumentedAsyncQueuePool
+from app.infrastructure.search.location_search import install_sqlite_functions
+
+
+def configure_engine(engine: AsyncEngine) -> AsyncEngine:
+    """Attach the dialect-specific hooks the repositories rely on and the query timing."""
+    if engine.dialect.name == "sqlite":
+        install_sqlite_functions(engine.sync_engine)
+    install_query_timing(engine.sync_engine)
+    return engine
+
+
+def engine_options(url: str, settings: Settings) -> dict[str, Any]:
+    """Engine keyword arguments derived from the ``API_MAPBOX_DB_*`` settings."""
+    parsed = make_url(url)
+    options: dict[str, Any] = {"echo": settings.debug}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection (StaticPool); nothing to size.
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        }
+    return options
+
+
+def build_engine(url: str, settings: Settings) -> AsyncEngine:
+    return configure_engine(create_async_engine(url, **engine_options(url, settings)))
 
 
 settings = get_settings()
-engine = create_async_engine(settings.async_database_url, echo=settings.debug)
+engine = build_engine(settings.async_database_url, settings)
 SessionFactory = async_sessionmaker(bind=engine, expire_on_commit=False)
 
 
@@ -23,3 +69,10 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Provide a session per request."""
     async with SessionFactory() as session:
         yield session
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Open a session outside the request dependency, e.g. for streaming responses."""
+    async with SessionFactory() as session:
+        yield session
@@ -0,0 +1,103 @@
+"""Geohash encoding and great-circle helpers used by the proximity queries.
+
+Addresses store the geohash of their coordinates so that a radius or bounding box
+search becomes a handful of indexed prefix scans (``geohash LIKE 'cell%'``) on any
+database; exact distances are then computed in Python over the candidates only.
+"""
+from __future__ import annotations
+
+import math
+
+from app.domain.models.location import BoundingBox
+
+GEOHASH_PRECISION = 9  # ~4.8 m x 4.8 m cells
+EARTH_RADIUS_M = 6_371_008.8
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Upper bound of prefix scans per query; coarser cells are used for larger areas.
+_MAX_CELLS = 16
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars: list[str] = []
+    value = bits = 0
+    even = True
+    while len(chars) < precision:
+        target, bounds = (lng, lng_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value *= 2
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            value = bits = 0
+    return "".join(chars)
+
+
+def encode_optional(lat: float | None, lng: float | None) -> str | None:
+    if lat is None or lng is None:
+        return None
+    return encode(lat, lng)
+
+
+def _cell_size(precision: int) -> tuple[float, float]:
+    lat_bits = 5 * precision // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def covering_cells(box: BoundingBox) -> list[str]:
+    """Return the geohash prefixes whose cells cover ``box``.
+
+    Picks the finest precision that needs at most ``_MAX_CELLS`` cells, so small
+    areas scan tight prefixes and large ones fall back to a few coarse cells.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = _cell_size(precision)
+        lat_cells = _cell_indexes(box.min_lat + 90.0, box.max_lat + 90.0, lat_step, 180.0)
+        lng_cells = _cell_indexes(box.min_lng + 180.0, box.max_lng + 180.0, lng_step, 360.0)
+        if len(lat_cells) * len(lng_cells) > _MAX_CELLS and precision > 1:
+            continue
+        return sorted(
+            {
+                encode(
+                    (lat_index + 0.5) * lat_step - 90.0,
+                    (lng_index + 0.5) * lng_step - 180.0,
+                    precision,
+                )
+                for lat_index in lat_cells
+                for lng_index in lng_cells
+            }
+        )
+    return []
+
+
+def _cell_indexes(low: float, high: float, step: float, span: float) -> range:
+    last = int(span / step) - 1
+    return range(min(int(low / step), last), min(int(high / step), last) + 1)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bounding_box(lat: float, lng: float, radius_m: float) -> BoundingBox:
+    """Smallest lat/lng box containing the circle; clamped at the poles and antimeridian."""
+    lat_delta = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat, max_lat = max(lat - lat_delta, -90.0), min(lat + lat_delta, 90.0)
+    cos_lat = min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+    if cos_lat <= 1e-9 or radius_m / (EARTH_RADIUS_M * cos_lat) >= math.pi:
+        return BoundingBox(min_lat, -180.0, max_lat, 180.0)
+    lng_delta = math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat))
+    return BoundingBox(min_lat, max(lng - lng_delta, -180.0), max_lat, min(lng + lng_delta, 180.0))
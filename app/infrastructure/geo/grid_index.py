@@ -0,0 +1,377 @@
+"""NumPy-backed grid index answering nearest-location queries in process.
+
+Coordinates live in flat arrays (radians plus the cosine of the latitude) and a
+uniform lat/lng grid maps every cell to the array slots inside it. A query scans
+rings of cells around its own cell, computing haversine distances for whole rings
+at once, and stops as soon as nothing outside the scanned rings can be closer than
+the current k-th result. Sparse regions fall back to one vectorized pass over
+every point, which is cheaper than walking thousands of empty cells.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from itertools import chain
+
+import numpy as np
+
+from app.domain.models.location import LocationType
+from app.domain.repositories.location_index import IndexedPoint, LocationSpatialIndex, PointQuery
+from app.infrastructure.geo.geohash import EARTH_RADIUS_M
+
+logger = logging.getLogger(__name__)
+
+_TIPOS = list(LocationType)
+_TIPO_CODES = {tipo: code for code, tipo in enumerate(_TIPOS)}
+
+PointLoader = Callable[[], Awaitable[Iterable[IndexedPoint]]]
+
+
+class GridSpatialIndex(LocationSpatialIndex):
+    def __init__(
+        self,
+        cell_degrees: float = 0.05,
+        *,
+        loader: PointLoader | None = None,
+        refresh_seconds: float = 0.0,
+    ) -> None:
+        self._cell = math.radians(cell_degrees)
+        self._lat_cells = math.ceil(180.0 / cell_degrees)
+        self._lng_cells = math.ceil(360.0 / cell_degrees)
+        self._loader = loader
+        self._refresh_seconds = refresh_seconds
+        self._refresher: asyncio.Task[None] | None = None
+        self._ready = False
+        # Writes applied while a snapshot is being loaded, replayed on top of it.
+        self._journal: dict[int, IndexedPoint | None] | None = None
+        self._loads = 0
+        self._last_load_seconds = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids = np.full(0, -1, dtype=np.int64)
+        self._lat = np.zeros(0)
+        self._lng = np.zeros(0)
+        self._cos_lat = np.zeros(0)
+        self._tipo = np.zeros(0, dtype=np.int8)
+        self._activo = np.zeros(0, dtype=bool)
+        self._used = 0
+        self._free: list[int] = []
+        self._slot_of: dict[int, int] = {}
+        self._cell_of: dict[int, tuple[int, int]] = {}
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    # -- writes -------------------------------------------------------------------
+
+    def get(self, location_id: int) -> IndexedPoint | None:
+        slot = self._slot_of.get(location_id)
+        if slot is None:
+            return None
+        return IndexedPoint(
+            location_id=location_id,
+            lat=math.degrees(self._lat[slot]),
+            lng=math.degrees(self._lng[slot]),
+            tipo=_TIPOS[self._tipo[slot]],
+            activo=bool(self._activo[slot]),
+        )
+
+    def upsert(self, point: IndexedPoint) -> None:
+        if self._journal is not None:
+            self._journal[point.location_id] = point
+        elif not self._ready:
+            return
+        self._store(point)
+
+    def remove(self, location_id: int) -> None:
+        if self._journal is not None:
+            self._journal[location_id] = None
+        self._discard(location_id)
+
+    def replace_all(self, points: Iterable[IndexedPoint]) -> None:
+        self._reset()
+        for point in points:
+            self._store(point)
+        self._ready = True
+
+    def clear(self) -> None:
+        self._reset()
+        self._ready = False
+
+    def _store(self, point: IndexedPoint) -> None:
+        self._discard(point.location_id)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._used == len(self._ids):
+                self._grow()
+            slot = self._used
+            self._used += 1
+        lat = math.radians(point.lat)
+        self._ids[slot] = point.location_id
+        self._lat[slot] = lat
+        self._lng[slot] = math.radians(point.lng)
+        self._cos_lat[slot] = math.cos(lat)
+        self._tipo[slot] = _TIPO_CODES[point.tipo]
+        self._activo[slot] = point.activo
+        cell = self._cell_index(point.lat, point.lng)
+        self._slot_of[point.location_id] = slot
+        self._cell_of[point.location_id] = cell
+        self._cells[cell].append(slot)
+
+    def _discard(self, location_id: int) -> None:
+        slot = self._slot_of.pop(location_id, None)
+        if slot is None:
+            return
+        cell = self._cell_of.pop(location_id)
+        slots = self._cells[cell]
+        slots.remove(slot)
+        if not slots:
+            del self._cells[cell]
+        self._ids[slot] = -1
+        self._free.append(slot)
+
+    def _grow(self) -> None:
+        extra = max(1024, len(self._ids))
+        self._ids = np.concatenate([self._ids, np.full(extra, -1, dtype=np.int64)])
+        self._lat = np.concatenate([self._lat, np.zeros(extra)])
+        self._lng = np.concatenate([self._lng, np.zeros(extra)])
+        self._cos_lat = np.concatenate([self._cos_lat, np.zeros(extra)])
+        self._tipo = np.concatenate([self._tipo, np.zeros(extra, dtype=np.int8)])
+        self._activo = np.concatenate([self._activo, np.zeros(extra, dtype=bool)])
+
+    # -- queries ------------------------------------------------------------------
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        k: int = 1,
+        radius_m: float | None = None,
+        tipo: LocationType | None = None,
+        activo: bool | None = None,
+    ) -> list[tuple[int, float]]:
+        distances, slots = self._search(
+            self._cell_index(lat, lng),
+            np.radians([lat]),
+            np.radians([lng]),
+            np.array([math.inf if radius_m is None else radius_m]),
+            k,
+            None if tipo is None else _TIPO_CODES[tipo],
+            activo,
+        )
+        return [
+            (int(self._ids[slot]), float(distance))
+            for distance, slot in zip(distances[0], slots[0])
+            if slot >= 0
+        ]
+
+    def nearest_many(
+        self, queries: Sequence[PointQuery], *, activo: bool | None = None
+    ) -> list[tuple[int, float] | None]:
+        results: list[tuple[int, float] | None] = [None] * len(queries)
+        if not queries or not self._slot_of:
+            return results
+        lat = np.array([query.lat for query in queries], dtype=float)
+        lng = np.array([query.lng for query in queries], dtype=float)
+        radius = np.array(
+            [math.inf if query.radius_m is None else query.radius_m for query in queries]
+        )
+        lat_rad, lng_rad = np.radians(lat), np.radians(lng)
+
+        # Points sharing a cell and a tipo filter are resolved together.
+        groups: dict[tuple[tuple[int, int], int | None], list[int]] = defaultdict(list)
+        for position, query in enumerate(queries):
+            tipo = None if query.tipo is None else _TIPO_CODES[query.tipo]
+            groups[(self._cell_index(query.lat, query.lng), tipo)].append(position)
+
+        for (cell, tipo), positions in groups.items():
+            members = np.array(positions)
+            distances, slots = self._search(
+                cell, lat_rad[members], lng_rad[members], radius[members], 1, tipo, activo
+            )
+            for position, distance, slot in zip(positions, distances[:, 0], slots[:, 0]):
+                if slot >= 0:
+                    results[position] = (int(self._ids[slot]), float(distance))
+        return results
+
+    def _search(
+        self,
+        cell: tuple[int, int],
+        lat: np.ndarray,
+        lng: np.ndarray,
+        radius: np.ndarray,
+        k: int,
+        tipo: int | None,
+        activo: bool | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(distances, slots)`` of shape ``(len(lat), k)`` sorted by distance.
+
+        Missing neighbours are reported with slot ``-1`` and an infinite distance.
+        """
+        lat = lat[:, None]
+        lng = lng[:, None]
+        cos_lat = np.cos(lat)
+        radius = radius[:, None]
+        best_d = np.full((lat.shape[0], k), np.inf)
+        best_s = np.full((lat.shape[0], k), -1, dtype=np.int64)
+        seen = 0
+
+        ring = 0
+        while True:
+            if ring > 0 and (
+                (2 * ring + 1) ** 2 > len(self._cells) or 2 * ring + 1 >= self._lng_cells
+            ):
+                # More cells scanned than occupied ones: the remaining rings are mostly
+                # empty, so finish with a single pass over every point.
+                slots = np.flatnonzero(self._ids[: self._used] >= 0)
+                best_d, best_s = self._merge(
+                    np.full_like(best_d, np.inf), np.full_like(best_s, -1),
+                    lat, lng, cos_lat, radius, slots, k, tipo, activo,
+                )
+                break
+            slots = self._ring_slots(cell, ring)
+            seen += len(slots)
+            best_d, best_s = self._merge(
+                best_d, best_s, lat, lng, cos_lat, radius, slots, k, tipo, activo
+            )
+            if seen >= len(self._slot_of):
+                break
+            reach = np.minimum(best_d[:, -1:], radius)
+            if np.all(reach <= self._ring_bound(cell, ring)):
+                break
+            ring += 1
+
+        order = np.argsort(best_d, axis=1)
+        return np.take_along_axis(best_d, order, 1), np.take_along_axis(best_s, order, 1)
+
+    def _merge(
+        self,
+        best_d: np.ndarray,
+        best_s: np.ndarray,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        cos_lat: np.ndarray,
+        radius: np.ndarray,
+        slots: np.ndarray,
+        k: int,
+        tipo: int | None,
+        activo: bool | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if tipo is not None:
+            slots = slots[self._tipo[slots] == tipo]
+        if activo is not None:
+            slots = slots[self._activo[slots] == activo]
+        if not len(slots):
+            return best_d, best_s
+        a = (
+            np.sin((self._lat[slots] - lat) / 2) ** 2
+            + cos_lat * self._cos_lat[slots] * np.sin((self._lng[slots] - lng) / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        distances[distances > radius] = np.inf
+        candidates_d = np.concatenate([best_d, distances], axis=1)
+        candidates_s = np.concatenate([best_s, np.broadcast_to(slots, distances.shape)], axis=1)
+        keep = np.argpartition(candidates_d, k - 1, axis=1)[:, :k]
+        best_d = np.take_along_axis(candidates_d, keep, 1)
+        best_s = np.take_along_axis(candidates_s, keep, 1)
+        best_s[np.isinf(best_d)] = -1
+        return best_d, best_s
+
+    def _cell_index(self, lat: float, lng: float) -> tuple[int, int]:
+        row = min(int((math.radians(lat) + math.pi / 2) / self._cell), self._lat_cells - 1)
+        column = int((math.radians(lng) + math.pi) / self._cell) % self._lng_cells
+        return row, column
+
+    def _ring_slots(self, cell: tuple[int, int], ring: int) -> np.ndarray:
+        row, column = cell
+        if ring == 0:
+            keys: Iterable[tuple[int, int]] = [cell]
+        else:
+            columns = [(column + offset) % self._lng_cells for offset in range(-ring, ring + 1)]
+            edges = [(row - ring, j) for j in columns] + [(row + ring, j) for j in columns]
+            sides = [
+                (i, j)
+                for i in range(row - ring + 1, row + ring)
+                for j in (columns[0], columns[-1])
+            ]
+            keys = edges + sides
+        buckets = [self._cells.get(key) for key in keys]
+        return np.fromiter(
+            chain.from_iterable(bucket for bucket in buckets if bucket), dtype=np.int64
+        )
+
+    def _ring_bound(self, cell: tuple[int, int], ring: int) -> float:
+        """Lower bound of the distance from any point of ``cell`` to points outside the ring."""
+        gap = ring * self._cell
+        row = cell[0]
+        edge = max(abs(row * self._cell - math.pi / 2), abs((row + 1) * self._cell - math.pi / 2))
+        max_lat = min(edge + gap, math.pi / 2)
+        across = 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.cos(max_lat) * math.sin(gap / 2)))
+        return min(EARTH_RADIUS_M * gap, across)
+
+    # -- lifecycle ----------------------------------------------------------------
+
+    async def reload(self) -> None:
+        if self._loader is None:
+            return
+        started = time.perf_counter()
+        self._journal = {}
+        try:
+            points = list(await self._loader())
+            journal = self._journal
+            self._journal = None
+            self.replace_all(points)
+            for location_id, point in journal.items():
+                if point is None:
+                    self._discard(location_id)
+                else:
+                    self._store(point)
+        finally:
+            self._journal = None
+        self._loads += 1
+        self._last_load_seconds = time.perf_counter() - started
+
+    async def start(self) -> None:
+        try:
+            await self.reload()
+        except Exception as exc:  # noqa: BLE001 - queries fall back to the database
+            logger.warning("Spatial index load failed: %s", exc)
+        if self._loader is not None and self._refresh_seconds > 0:
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
+
+    async def _refresh_periodically(self) -> None:
+        # Each worker applies its own writes immediately; the periodic reload picks up
+        # writes served by other workers or made outside the API.
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            try:
+                await self.reload()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Spatial index refresh failed: %s", exc)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "ready": self._ready,
+            "size": len(self._slot_of),
+            "cells": len(self._cells),
+            "loads": self._loads,
+            "last_load_seconds": round(self._last_load_seconds, 6),
+        }
+
@@ -0,0 +1,25 @@
+"""Process-wide spatial index loaded from ``direcciones``."""
+from __future__ import annotations
+
+from functools import lru_cache
+
+from app.core.config import get_settings
+from app.domain.repositories.location_index import IndexedPoint
+from app.infrastructure.db.session import session_scope
+from app.infrastructure.geo.grid_index import GridSpatialIndex
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+
+
+async def _load_points() -> list[IndexedPoint]:
+    async with session_scope() as session:
+        return await SQLAlchemyLocationRepository(session).list_indexed_points()
+
+
+@lru_cache
+def get_spatial_index() -> GridSpatialIndex:
+    settings = get_settings()
+    return GridSpatialIndex(
+        settings.spatial_index_cell_degrees,
+        loader=_load_points if settings.spatial_index_enabled else None,
+        refresh_seconds=settings.spatial_index_refresh_seconds,
+    )
@@ -0,0 +1,227 @@
+"""Backfill of coordinates for addresses saved without them.
+
+Addresses are scanned in ``localidad_id`` order, one chunk at a time. Each chunk is
+geocoded with bounded concurrency, its coordinates are written back with a single
+executemany UPDATE and the position is stored in ``geocoding_backfill`` so an interrupted
+run resumes where it stopped. Provider answers go through :class:`CachingGeocoder`, which
+records them in ``geocoding_cache``.
+
+Run it next to the API, not inside it::
+
+    python -m app.infrastructure.geocoding.backfill --rate 20 --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.use_cases.geocode_address import address_query
+from app.core.config import get_settings
+from app.domain.models.geocoding import BackfillCheckpoint, GeocodeResult
+from app.domain.models.location import Address
+from app.domain.repositories.geocoding import GeocodingProvider, GeocodingProviderError
+from app.domain.repositories.location_cache import LocationCache
+from app.infrastructure.cache.location_cache import get_location_cache
+from app.infrastructure.db.session import session_scope
+from app.infrastructure.geocoding.providers import RateLimitedGeocodingProvider
+from app.infrastructure.geocoding.service import CachingGeocoder, build_geocoding_provider
+from app.infrastructure.repositories.geocoding_backfill import (
+    SQLAlchemyBackfillCheckpointRepository,
+)
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+
+logger = logging.getLogger(__name__)
+
+SessionScope = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+_FAILED = object()
+
+
+@dataclass(slots=True)
+class BackfillReport:
+    checkpoint: BackfillCheckpoint
+    chunks: int = 0
+    completed: bool = False
+    interrupted: bool = False
+
+
+class GeocodingBackfill:
+    def __init__(
+        self,
+        geocoder: GeocodingProvider,
+        *,
+        name: str = "default",
+        chunk_size: int = 500,
+        concurrency: int = 8,
+        sessions: SessionScope = session_scope,
+        cache: LocationCache | None = None,
+    ) -> None:
+        self._geocoder = geocoder
+        self._name = name
+        self._chunk_size = chunk_size
+        self._slots = asyncio.Semaphore(concurrency)
+        self._sessions = sessions
+        self._cache = cache
+
+    async def reset(self) -> None:
+        async with self._sessions() as session:
+            await SQLAlchemyBackfillCheckpointRepository(session).reset(self._name)
+
+    async def run(
+        self, *, max_chunks: int | None = None, stop: asyncio.Event | None = None
+    ) -> BackfillReport:
+        """Process chunks until none is left, ``max_chunks`` is reached or ``stop`` is set.
+
+        A chunk with provider failures is committed only up to the first failed address
+        and ends the run (``interrupted``), so those addresses are retried next time.
+        """
+        async with self._sessions() as session:
+            checkpoint = await SQLAlchemyBackfillCheckpointRepository(session).load(self._name)
+        report = BackfillReport(checkpoint=checkpoint)
+        while max_chunks is None or report.chunks < max_chunks:
+            if stop is not None and stop.is_set():
+                break
+            async with self._sessions() as session:
+                addresses = await SQLAlchemyLocationRepository(session).list_ungeocoded_addresses(
+                    after_id=checkpoint.last_localidad_id, limit=self._chunk_size
+                )
+            if not addresses:
+                report.completed = True
+                break
+            report.chunks += 1
+            if not await self._process_chunk(addresses, checkpoint):
+                report.interrupted = True
+                break
+        return report
+
+    async def _process_chunk(
+        self, addresses: list[Address], checkpoint: BackfillCheckpoint
+    ) -> bool:
+        answers = await asyncio.gather(*(self._geocode(address) for address in addresses))
+
+        processed = next(
+            (position for position, answer in enumerate(answers) if answer is _FAILED),
+            len(answers),
+        )
+        # Answers past the first failure are stored too; the retry just won't see them.
+        coordinates = {
+            address.localidad_id: (answer.lat, answer.lng)
+            for address, answer in zip(addresses, answers)
+            if isinstance(answer, GeocodeResult)
+        }
+        checkpoint.not_found += sum(answer is None for answer in answers[:processed])
+        checkpoint.failed += sum(answer is _FAILED for answer in answers)
+
+        async with self._sessions() as session:
+            checkpoints = SQLAlchemyBackfillCheckpointRepository(session)
+
+            # The checkpoint commits with the coordinates: a crash can't skip or repeat rows.
+            async def _advance(filled: int) -> None:
+                checkpoint.geocoded += filled
+                checkpoint.scanned += processed
+                if processed:
+                    checkpoint.last_localidad_id = addresses[processed - 1].localidad_id
+                await checkpoints.stage(checkpoint)
+
+            repository = SQLAlchemyLocationRepository(session, cache=self._cache)
+            await repository.set_address_coordinates(coordinates, before_commit=_advance)
+        logger.info(
+            "Geocoding backfill %s: up to localidad %s, %s geocoded, %s not found",
+            checkpoint.name,
+            checkpoint.last_localidad_id,
+            checkpoint.geocoded,
+            checkpoint.not_found,
+        )
+        return processed == len(addresses)
+
+    async def _geocode(self, address: Address) -> GeocodeResult | None | object:
+        query = address_query(
+            {
+                "calle": address.calle,
+                "colonia": address.colonia,
+                "cp": address.cp,
+                "ciudad_text": address.ciudad_text,
+                "estado_text": address.estado_text,
+            }
+        )
+        if query is None:
+            return None
+        async with self._slots:
+            try:
+                return await self._geocoder.geocode(query)
+            except GeocodingProviderError as exc:
+                logger.warning("Geocoding failed for localidad %s: %s", address.localidad_id, exc)
+                return _FAILED
+
+
+async def _main(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    provider = build_geocoding_provider(settings.geocoding_provider)
+    if provider is None:
+        logger.error("Set API_MAPBOX_GEOCODING_PROVIDER to run the backfill")
+        return 2
+    geocoder = CachingGeocoder(
+        RateLimitedGeocodingProvider(provider, args.rate, burst=args.concurrency),
+        ttl=settings.geocoding_cache_ttl_seconds,
+        negative_ttl=settings.geocoding_negative_cache_ttl_seconds,
+        memory_maxsize=settings.geocoding_memory_cache_max_entries,
+    )
+    if settings.location_cache_backend == "local":
+        logger.warning(
+            "The local location cache is private to this process; API workers keep serving "
+            "cached locations until they expire. Use the redis backend to invalidate them."
+        )
+    cache = get_location_cache()
+    backfill = GeocodingBackfill(
+        geocoder,
+        name=args.name,
+        chunk_size=args.chunk_size,
+        concurrency=args.concurrency,
+        cache=cache,
+    )
+    try:
+        if args.reset:
+            await backfill.reset()
+        report = await backfill.run(max_chunks=args.max_chunks)
+    finally:
+        await geocoder.close()
+        await cache.close()
+    checkpoint = report.checkpoint
+    logger.info(
+        "Geocoding backfill %s %s after %s chunks: %s scanned, %s geocoded, %s not found",
+        checkpoint.name,
+        "completed" if report.completed else "stopped",
+        report.chunks,
+        checkpoint.scanned,
+        checkpoint.geocoded,
+        checkpoint.not_found,
+    )
+    return 1 if report.interrupted else 0
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--name", default="default", help="checkpoint name")
+    parser.add_argument("--chunk-size", type=int, default=settings.geocoding_backfill_chunk_size)
+    parser.add_argument("--concurrency", type=int, default=settings.geocoding_backfill_concurrency)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.geocoding_backfill_rate_per_second,
+        help="provider calls per second",
+    )
+    parser.add_argument("--max-chunks", type=int, default=None)
+    parser.add_argument("--reset", action="store_true", help="start again from the first address")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    raise SystemExit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Normalization of free-form address text into stable cache keys."""
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^\w#]+")
+
+# Spellings that refer to the same thing in Mexican addresses.
+_ABBREVIATIONS = {
+    "av": "avenida",
+    "ave": "avenida",
+    "avda": "avenida",
+    "blvd": "boulevard",
+    "blvr": "boulevard",
+    "bulevar": "boulevard",
+    "calz": "calzada",
+    "carr": "carretera",
+    "col": "colonia",
+    "fracc": "fraccionamiento",
+    "num": "numero",
+    "edo": "estado",
+    "mex": "mexico",
+    "cdmx": "ciudad de mexico",
+}
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, strip accents and punctuation and expand common abbreviations."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    ascii_text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    words = _NON_WORD.sub(" ", ascii_text.replace("_", " ")).split()
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def query_key(normalized: str) -> str:
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,139 @@
+"""Geocoding provider adapters."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Mapping
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+
+from app.domain.models.geocoding import GeocodeResult
+from app.domain.repositories.geocoding import GeocodingProvider, GeocodingProviderError
+from app.infrastructure.geocoding.normalization import normalize_query, query_key
+
+
+class MapboxGeocodingProvider(GeocodingProvider):
+    """Client for the Mapbox Geocoding API (v5 ``mapbox.places``) or a compatible server."""
+
+    name = "mapbox"
+
+    def __init__(
+        self,
+        access_token: str,
+        *,
+        base_url: str = "https://api.mapbox.com",
+        country: str | None = None,
+        timeout: float = 5.0,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._access_token = access_token
+        self._country = country
+        self._client = client or httpx.AsyncClient(base_url=base_url, timeout=timeout)
+
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        params: dict[str, Any] = {
+            "access_token": self._access_token,
+            "limit": 1,
+            "autocomplete": "false",
+            "language": "es",
+        }
+        if self._country:
+            params["country"] = self._country
+        try:
+            response = await self._client.get(
+                f"/geocoding/v5/mapbox.places/{quote(query, safe='')}.json", params=params
+            )
+        except httpx.HTTPError as exc:
+            raise GeocodingProviderError(str(exc) or type(exc).__name__) from exc
+        if response.status_code != 200:
+            raise GeocodingProviderError(f"Mapbox respondió {response.status_code}")
+        # A malformed answer is an outage like any other, not a reason to fail the save.
+        try:
+            return self._parse(response.json())
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise GeocodingProviderError(f"Respuesta inválida de Mapbox: {exc!r}") from exc
+
+    def _parse(self, body: Any) -> GeocodeResult | None:
+        features = body.get("features") or []
+        if not features:
+            return None
+        feature = features[0]
+        lng, lat = feature["center"]
+        return GeocodeResult(
+            lat=float(lat),
+            lng=float(lng),
+            provider=self.name,
+            external_id=str(feature["id"]),
+            relevance=feature.get("relevance"),
+            raw=feature,
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class StubGeocodingProvider(GeocodingProvider):
+    """Offline provider answering from a fixed table, keyed by normalized address."""
+
+    name = "stub"
+
+    def __init__(
+        self,
+        known: Mapping[str, tuple[float, float]] | None = None,
+        *,
+        latency: float = 0.0,
+    ) -> None:
+        self._known = {normalize_query(query): point for query, point in (known or {}).items()}
+        self._latency = latency
+        self.calls: list[str] = []
+
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        self.calls.append(query)
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        normalized = normalize_query(query)
+        point = self._known.get(normalized)
+        if point is None:
+            return None
+        lat, lng = point
+        return GeocodeResult(
+            lat=lat,
+            lng=lng,
+            provider=self.name,
+            external_id=f"stub.{query_key(normalized)}",
+            relevance=1.0,
+            raw={"query": normalized, "center": [lng, lat]},
+        )
+
+
+class RateLimitedGeocodingProvider(GeocodingProvider):
+    """Token bucket in front of a provider: at most ``rate`` calls per second, ``burst`` at once."""
+
+    def __init__(self, provider: GeocodingProvider, rate: float, *, burst: int = 1) -> None:
+        self.name = provider.name
+        self._provider = provider
+        self._interval = 1.0 / rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) / self._interval)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self._interval)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        await self._acquire()
+        return await self._provider.geocode(query)
+
+    async def close(self) -> None:
+        await self._provider.close()
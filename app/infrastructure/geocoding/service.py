@@ -0,0 +1,181 @@
+"""Geocoder with a persistent result cache in front of the configured provider.
+
+Answers are stored in ``geocoding_cache`` under a digest of the normalized address, with
+a long TTL for matches and a shorter one for misses (negative caching). A small
+in-process tier avoids the database round trip for hot addresses, and concurrent
+lookups of the same address share a single resolution so the provider is called once.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.domain.models.geocoding import CachedGeocode, GeocodeResult
+from app.domain.repositories.geocoding import GeocodingProvider, GeocodingProviderError
+from app.infrastructure.db.session import session_scope
+from app.infrastructure.geocoding.normalization import normalize_query, query_key
+from app.infrastructure.geocoding.providers import (
+    MapboxGeocodingProvider,
+    StubGeocodingProvider,
+)
+from app.infrastructure.repositories.geocoding_cache import SQLAlchemyGeocodingCacheRepository
+
+logger = logging.getLogger(__name__)
+
+SessionScope = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CachingGeocoder(GeocodingProvider):
+    def __init__(
+        self,
+        provider: GeocodingProvider,
+        *,
+        ttl: float,
+        negative_ttl: float,
+        memory_maxsize: int = 10000,
+        sessions: SessionScope = session_scope,
+        clock: Callable[[], datetime] = _utcnow,
+    ) -> None:
+        self.name = provider.name
+        self._provider = provider
+        self._ttl = timedelta(seconds=ttl)
+        self._negative_ttl = timedelta(seconds=negative_ttl)
+        self._memory: TTLCache[str, CachedGeocode] = TTLCache(memory_maxsize, max(ttl, negative_ttl))
+        self._sessions = sessions
+        self._clock = clock
+        self._inflight: dict[str, asyncio.Task[CachedGeocode]] = {}
+        self._lookups = 0
+        self._memory_hits = 0
+        self._cache_hits = 0
+        self._negative_hits = 0
+        self._coalesced = 0
+        self._provider_calls = 0
+        self._provider_errors = 0
+        self._cache_errors = 0
+
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        self._lookups += 1
+        key = query_key(normalized)
+        cached = self._memory.get(key)
+        if cached is not None and cached.expires_at > self._clock():
+            self._memory_hits += 1
+            return cached.result
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._resolve(key, normalized))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._coalesced += 1
+        # Shielded so a cancelled caller does not abort the lookup the others wait on.
+        return (await asyncio.shield(task)).result
+
+    def _finish(self, key: str, task: asyncio.Task[CachedGeocode]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self._memory.set(key, task.result())
+
+    async def _resolve(self, key: str, normalized: str) -> CachedGeocode:
+        # A cache table failure is reported like a provider outage, so address saves go
+        # ahead without coordinates instead of failing.
+        try:
+            async with self._sessions() as session:
+                stored = await SQLAlchemyGeocodingCacheRepository(session).get(
+                    self.name, key, self._clock()
+                )
+        except SQLAlchemyError as exc:
+            self._cache_errors += 1
+            logger.warning("Geocoding cache lookup failed: %s", exc)
+            raise GeocodingProviderError("geocoding cache unavailable") from exc
+        if stored is not None:
+            self._cache_hits += 1
+            if stored.result is None:
+                self._negative_hits += 1
+            return stored
+
+        self._provider_calls += 1
+        try:
+            result = await self._provider.geocode(normalized)
+        except GeocodingProviderError:
+            self._provider_errors += 1
+            raise
+        ttl = self._ttl if result is not None else self._negative_ttl
+        stored = CachedGeocode(result=result, expires_at=self._clock() + ttl)
+        try:
+            async with self._sessions() as session:
+                await SQLAlchemyGeocodingCacheRepository(session).put(
+                    self.name, key, result, stored.expires_at
+                )
+        except SQLAlchemyError as exc:
+            # The answer is still good; it is only not persisted.
+            self._cache_errors += 1
+            logger.warning("Geocoding cache write failed: %s", exc)
+        return stored
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "provider": self.name,
+            "lookups": self._lookups,
+            "memory_hits": self._memory_hits,
+            "cache_hits": self._cache_hits,
+            "negative_hits": self._negative_hits,
+            "coalesced": self._coalesced,
+            "provider_calls": self._provider_calls,
+            "provider_errors": self._provider_errors,
+            "cache_errors": self._cache_errors,
+            "in_flight": len(self._inflight),
+        }
+
+    async def close(self) -> None:
+        await self._provider.close()
+
+
+def build_geocoding_provider(name: str) -> GeocodingProvider | None:
+    settings = get_settings()
+    if name == "none":
+        return None
+    if name == "stub":
+        return StubGeocodingProvider()
+    if name == "mapbox":
+        return MapboxGeocodingProvider(
+            settings.geocoding_mapbox_access_token,
+            base_url=settings.geocoding_mapbox_base_url,
+            country=settings.geocoding_country,
+            timeout=settings.geocoding_timeout_seconds,
+        )
+    raise ValueError(f"Unknown geocoding provider: {name}")
+
+
+@lru_cache
+def get_geocoder() -> CachingGeocoder | None:
+    settings = get_settings()
+    provider = build_geocoding_provider(settings.geocoding_provider)
+    if provider is None:
+        return None
+    return CachingGeocoder(
+        provider,
+        ttl=settings.geocoding_cache_ttl_seconds,
+        negative_ttl=settings.geocoding_negative_cache_ttl_seconds,
+        memory_maxsize=settings.geocoding_memory_cache_max_entries,
+    )
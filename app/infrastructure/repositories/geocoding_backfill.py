@@ -0,0 +1,43 @@
+"""SQLAlchemy implementation of the geocoding backfill checkpoints."""
+from __future__ import annotations
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.geocoding import BackfillCheckpoint
+from app.domain.repositories.geocoding import BackfillCheckpointRepository
+from app.infrastructure.db.models import GeocodingBackfillModel
+
+_COUNTERS = ("last_localidad_id", "scanned", "geocoded", "not_found", "failed")
+
+
+class SQLAlchemyBackfillCheckpointRepository(BackfillCheckpointRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def load(self, name: str) -> BackfillCheckpoint:
+        model = await self._session.get(GeocodingBackfillModel, name)
+        if model is None:
+            return BackfillCheckpoint(name=name)
+        return BackfillCheckpoint(
+            name=name, **{field: getattr(model, field) for field in _COUNTERS}
+        )
+
+    async def save(self, checkpoint: BackfillCheckpoint) -> None:
+        await self.stage(checkpoint)
+        await self._session.commit()
+
+    async def stage(self, checkpoint: BackfillCheckpoint) -> None:
+        model = await self._session.get(GeocodingBackfillModel, checkpoint.name)
+        if model is None:
+            model = GeocodingBackfillModel(name=checkpoint.name)
+            self._session.add(model)
+        for field in _COUNTERS:
+            setattr(model, field, getattr(checkpoint, field))
+        await self._session.flush()
+
+    async def reset(self, name: str) -> None:
+        await self._session.execute(
+            delete(GeocodingBackfillModel).where(GeocodingBackfillModel.name == name)
+        )
+        await self._session.commit()
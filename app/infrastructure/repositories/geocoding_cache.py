@@ -0,0 +1,86 @@
+"""SQLAlchemy implementation of the geocoding result cache."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.geocoding import CachedGeocode, GeocodeResult
+from app.domain.repositories.geocoding import GeocodingCacheRepository
+from app.infrastructure.db.models import GeocodingCacheModel
+
+
+class SQLAlchemyGeocodingCacheRepository(GeocodingCacheRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, provider: str, query_key: str, now: datetime) -> CachedGeocode | None:
+        row = (
+            await self._session.execute(
+                select(GeocodingCacheModel).where(
+                    GeocodingCacheModel.provider == provider,
+                    GeocodingCacheModel.query_key == query_key,
+                    GeocodingCacheModel.expires_at > now,
+                )
+            )
+        ).scalar_one_or_none()
+        if row is None:
+            return None
+        result = None
+        if row.external_id is not None and row.lat is not None and row.lng is not None:
+            result = GeocodeResult(
+                lat=row.lat,
+                lng=row.lng,
+                provider=row.provider,
+                external_id=row.external_id,
+                relevance=row.raw_json.get("relevance"),
+                raw=row.raw_json,
+            )
+        expires_at = row.expires_at
+        if expires_at.tzinfo is None:
+            # SQLite hands timestamps back naive; they are stored in UTC.
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return CachedGeocode(result=result, expires_at=expires_at)
+
+    async def put(
+        self,
+        provider: str,
+        query_key: str,
+        result: GeocodeResult | None,
+        expires_at: datetime,
+        *,
+        localidad_id: int | None = None,
+    ) -> None:
+        values = {
+            "provider": provider,
+            "query_key": query_key,
+            "localidad_id": localidad_id,
+            "external_id": result.external_id if result else None,
+            "lat": result.lat if result else None,
+            "lng": result.lng if result else None,
+            "raw_json": result.raw if result else {},
+            "expires_at": expires_at,
+        }
+        insert = (
+            postgresql_insert
+            if self._session.bind.dialect.name == "postgresql"
+            else sqlite_insert
+        )
+        statement = insert(GeocodingCacheModel).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["provider", "query_key"],
+            set_={
+                "localidad_id": func.coalesce(
+                    statement.excluded.localidad_id, GeocodingCacheModel.localidad_id
+                ),
+                **{
+                    key: statement.excluded[key]
+                    for key in ("external_id", "lat", "lng", "raw_json", "expires_at")
+                },
+            },
+        )
+        await self._session.execute(statement)
+        await self._session.commit()
@@ -1,17 +1,69 @@
 """SQLAlchemy implementation for location repository."""
 from __future__ import annotations
 
-from collections.abc import Sequence
+import base64
+import binascii
+import heapq
+import json
+import math
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
 from typing import Any
 
-from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy import (
+    ColumnElement,
+    CompoundSelect,
+    Select,
+    Table,
+    and_,
+    bindparam,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    union,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.domain.models.location import Address, Alias, ClientLink, Location, LocationType
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.domain.models.location import (
+    Address,
+    Alias,
+    BoundingBox,
+    ClientLink,
+    Location,
+    LocationType,
+    LocationVersion,
+)
+from app.domain.repositories.location_cache import LocationCache
+from app.domain.repositories.location_index import (
+    IndexedPoint,
+    LocationSpatialIndex,
+    PointQuery,
+    SpatialIndexUnavailableError,
+)
 from app.domain.repositories.location_repository import (
+    ADDRESS_FIELDS,
+    FULL_PROJECTION,
+    LOCATION_FIELDS,
+    BoundingBoxResult,
+    BulkUpsertResult,
+    CountMode,
     LocationFilters,
+    LocationInclude,
+    LocationPage,
+    LocationProjection,
     LocationRepository,
+    NearbyLocation,
     Pagination,
 )
 from app.infrastructure.db.models import (
@@ -19,12 +71,74 @@ from app.infrastructure.db.models import (
     LocationAliasModel,
     LocationClientModel,
     LocationModel,
+    LocationSearchModel,
+)
+from app.infrastructure.geo.geohash import (
+    covering_cells,
+    encode,
+    encode_optional,
+    haversine_m,
+    radius_bounding_box,
+)
+from app.infrastructure.search.location_search import (
+    build_search_document,
+    get_search_engine,
+    normalize_text,
+)
+from app.infrastructure.search.read_model import (
+    address_from_json,
+    aliases_from_json,
+    clients_from_json,
+    refresh_location_search,
+)
+
+SortKey = tuple[ColumnElement[Any], bool]
+
+# Separators used to pack alias and client lists into one column per exported row.
+_LIST_SEPARATOR = "\x1f"
+_FIELD_SEPARATOR = "\x1e"
+
+# Bulk upserts are split so that one batch stays well below the bind parameter limits
+# of PostgreSQL (32767) and SQLite (32766).
+_BULK_BATCH_SIZE = 500
+_BULK_MAX_CHILD_ROWS = 4000
+_BULK_INSERT_CHUNK = 1000
+# Rows fetched per nearby search: the SQL ordering is approximate, so a few more than
+# ``limit`` are re-ranked by haversine distance in Python.
+_NEAR_CANDIDATE_FACTOR = 2
+_NEAR_CANDIDATE_SLACK = 16
+# Without a loaded spatial index, /nearest/batch resolves each point with queries over
+# rings of these radii; larger batches are refused rather than run point by point.
+_NEAREST_FALLBACK_RADII_M = (5_000.0, 50_000.0, 500_000.0)
+_NEAREST_FALLBACK_MAX_POINTS = 500
+# Transient nombre_oficial of a row whose name is handed to another row of the same batch.
+_RENAME_PLACEHOLDER = "\x1f"
+
+# Loaded by every projection: they identify the representation (ETag, cache keys).
+_IDENTITY_FIELDS = frozenset({"id", "version", "updated_at"})
+
+_settings = get_settings()
+# Exact counts reused by ``CountMode.ESTIMATED`` when planner statistics do not apply.
+_count_cache: TTLCache[tuple[Any, ...], int] = TTLCache(
+    _settings.count_cache_max_entries, _settings.count_cache_ttl_seconds
 )
 
 
 class SQLAlchemyLocationRepository(LocationRepository):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: LocationCache | None = None,
+        spatial_index: LocationSpatialIndex | None = None,
+        read_model: bool | None = None,
+    ) -> None:
         self._session = session
+        self._cache = cache
+        self._spatial_index = spatial_index
+        self._read_model = (
+            get_settings().location_read_model_enabled if read_model is None else read_model
+        )
+        self._search = get_search_engine(session.bind.dialect.name)
 
     async def upsert_location(
         self,
@@ -38,53 +152,382 @@ class SQLAlchemyLocationRepository(LocationRepository):
         aliases: Sequence[str],
         clients: Sequence[dict],
     ) -> Location:
-        location = await self._get_model_by_codigo(codigo)
-        if location is None:
+        alias_values = list(dict.fromkeys(alias for alias in aliases or () if alias))
+        client_rows = list({self._client_key(item): item for item in clients or ()}.values())
+        # Collections the payload replaces are diffed in SQL (``_sync_children``), so only
+        # the ones it leaves alone are loaded with the aggregate.
+        location = await self._get_model_by_codigo(
+            codigo, with_aliases=aliases is None, with_clients=clients is None
+        )
+        created = location is None
+        if created:
             location = LocationModel(
                 nombre_oficial=nombre_oficial,
                 codigo=codigo,
                 tipo=tipo,
                 activo=activo,
                 es_global=es_global,
+                address=None,
+                aliases=[LocationAliasModel(alias=alias) for alias in alias_values],
+                clients=[LocationClientModel(**item) for item in client_rows],
             )
             self._session.add(location)
-            await self._session.flush()
         else:
             location.nombre_oficial = nombre_oficial
             location.tipo = tipo
             location.activo = activo
             location.es_global = es_global
+            location.version += 1
 
         if address:
-            await self._apply_address(location, address)
-        if aliases is not None:
-            await self._apply_aliases(location, aliases)
-        if clients is not None:
-            await self._apply_clients(location, clients)
+            self._apply_address(location, address)
+        location.search_text = build_search_document(
+            nombre_oficial,
+            codigo,
+            aliases if aliases is not None else [alias.alias for alias in location.aliases],
+        )
 
-        await self._session.commit()
-        refreshed = await self._get_model(location.id)
-        if refreshed is None:
-            raise RuntimeError("Location not found after upsert")
-        return self._to_domain(refreshed)
+        await self._session.flush()
+        if not created:
+            await self._sync_children(
+                location,
+                alias_values if aliases is not None else None,
+                client_rows if clients is not None else None,
+            )
+        await self._commit(location.id)
+        self._index_location(location)
+        return self._to_domain(location)
+
+    async def bulk_upsert_locations(self, items: Sequence[dict]) -> list[BulkUpsertResult]:
+        results = [
+            BulkUpsertResult(index=index, codigo=item["codigo"]) for index, item in enumerate(items)
+        ]
+        last_by_codigo = {item["codigo"]: index for index, item in enumerate(items)}
+        pending: list[int] = []
+        for index, item in enumerate(items):
+            if last_by_codigo[item["codigo"]] != index:
+                results[index].error = "Código duplicado en la solicitud"
+            else:
+                pending.append(index)
+
+        for batch in self._bulk_batches(items, pending):
+            try:
+                await self._bulk_upsert_batch(items, batch, results)
+                await self._commit(*(results[index].location_id for index in batch))
+                self._index_bulk_batch(items, batch, results)
+            except IntegrityError:
+                await self._session.rollback()
+                for index in batch:
+                    if results[index].error is None:
+                        results[index].location_id = None
+                        results[index].created = False
+                        results[index].error = "Conflicto de integridad al guardar el lote"
+        return results
 
     async def list_locations(
-        self, filters: LocationFilters, pagination: Pagination
-    ) -> tuple[list[Location], int]:
-        data_stmt = self._apply_filters(self._base_query(), filters)
-        data_stmt = data_stmt.order_by(LocationModel.nombre_oficial).limit(pagination.limit).offset(
-            pagination.offset
+        self,
+        filters: LocationFilters,
+        pagination: Pagination,
+        projection: LocationProjection = FULL_PROJECTION,
+    ) -> LocationPage:
+        sort_mode, sort_keys = self._sort_keys(filters)
+        if self._read_model:
+            # Children come pre-serialized from location_search: one query, no selectin.
+            base = select(LocationModel, LocationSearchModel).outerjoin(
+                LocationSearchModel, LocationSearchModel.localidad_id == LocationModel.id
+            )
+            if not projection.is_full:
+                base = base.options(
+                    load_only(*self._location_columns(projection)),
+                    load_only(
+                        LocationSearchModel.version,
+                        *(getattr(LocationSearchModel, name) for name in projection.include),
+                    ),
+                )
+        else:
+            # Children are loaded after the look-ahead row is dropped (see below).
+            base = self._location_query(projection)
+        entities = len(base.column_descriptions)
+        data_stmt = self._apply_filters(
+            base.add_columns(*(expr for expr, _ in sort_keys)), filters
         )
+        if pagination.cursor:
+            values = self._decode_cursor(pagination.cursor, sort_mode, len(sort_keys))
+            data_stmt = data_stmt.where(self._seek_condition(sort_keys, values))
+        else:
+            data_stmt = data_stmt.offset(pagination.offset)
+        # Fetch one extra row to know whether another page exists.
+        data_stmt = data_stmt.order_by(
+            *(expr.desc() if descending else expr.asc() for expr, descending in sort_keys)
+        ).limit(pagination.limit + 1)
 
-        count_stmt = self._apply_filters(
-            select(func.count(func.distinct(LocationModel.id))).select_from(LocationModel),
-            filters,
+        result = await self._session.execute(data_stmt)
+        rows = result.unique().all()
+        next_cursor = None
+        if len(rows) > pagination.limit:
+            rows = rows[: pagination.limit]
+            next_cursor = self._encode_cursor(sort_mode, rows[-1][entities:])
+
+        total: int | None = None
+        if pagination.count is CountMode.EXACT:
+            total = await self._count(filters)
+        elif pagination.count is CountMode.ESTIMATED:
+            total = await self._estimate_count(filters)
+        if self._read_model:
+            items = await self._from_read_model([(row[0], row[1]) for row in rows], projection)
+        else:
+            models = [row[0] for row in rows]
+            await self._load_relationships(models, projection)
+            items = [self._to_domain(model, projection) for model in models]
+        return LocationPage(
+            items=items,
+            total=total,
+            next_cursor=next_cursor,
+            total_estimated=pagination.count is CountMode.ESTIMATED,
         )
 
-        result = await self._session.execute(data_stmt)
-        rows = result.scalars().unique().all()
-        total = (await self._session.execute(count_stmt)).scalar_one()
-        return [self._to_domain(row) for row in rows], total
+    async def find_nearby(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        radius_m: float,
+        limit: int,
+        filters: LocationFilters,
+    ) -> list[NearbyLocation]:
+        index = self._spatial_index
+        if (
+            index is not None
+            and index.ready
+            and filters == LocationFilters(tipo=filters.tipo, activo=filters.activo)
+        ):
+            hits = index.nearest(
+                lat, lng, k=limit, radius_m=radius_m, tipo=filters.tipo, activo=filters.activo
+            )
+            return await self._load_nearby((lat, lng), hits, radius_m, filters)
+        return await self._find_near(
+            (lat, lng), radius_bounding_box(lat, lng, radius_m), limit, filters, radius_m
+        )
+
+    async def find_in_bounding_box(
+        self, box: BoundingBox, *, limit: int, filters: LocationFilters
+    ) -> BoundingBoxResult:
+        # One extra candidate tells whether the box holds more than ``limit`` matches.
+        nearest = await self._nearest_candidates(box.center, box, limit + 1, filters)
+        return BoundingBoxResult(
+            items=await self._load_ranked(nearest[:limit]), truncated=len(nearest) > limit
+        )
+
+    async def find_nearest_many(
+        self, queries: Sequence[PointQuery], *, activo: bool | None = None
+    ) -> list[tuple[int, float] | None]:
+        index = self._spatial_index
+        if index is not None and index.ready:
+            return index.nearest_many(queries, activo=activo)
+        # No loaded index (disabled or still loading): one bounded query per point.
+        if len(queries) > _NEAREST_FALLBACK_MAX_POINTS:
+            raise SpatialIndexUnavailableError
+        return [await self._find_nearest_point(query, activo) for query in queries]
+
+    async def _find_nearest_point(
+        self, query: PointQuery, activo: bool | None
+    ) -> tuple[int, float] | None:
+        """Closest location to one point, searching rings of growing radius.
+
+        A hit within a ring's radius is the true nearest, since any closer address lies
+        inside that ring's box. Points without ``radius_m`` stop at the widest ring
+        (500 km), where the index would search without limit.
+        """
+        filters = LocationFilters(tipo=query.tipo, activo=activo)
+        radii = [
+            radius
+            for radius in _NEAREST_FALLBACK_RADII_M
+            if query.radius_m is None or radius < query.radius_m
+        ]
+        if query.radius_m is not None:
+            radii.append(query.radius_m)
+        for radius in radii:
+            nearest = await self._nearest_candidates(
+                (query.lat, query.lng),
+                radius_bounding_box(query.lat, query.lng, radius),
+                1,
+                filters,
+                radius,
+            )
+            if nearest:
+                distance, location_id = nearest[0]
+                return location_id, distance
+        return None
+
+    async def list_indexed_points(self) -> list[IndexedPoint]:
+        return await self._indexed_points()
+
+    async def _indexed_points(self, *conditions: ColumnElement[bool]) -> list[IndexedPoint]:
+        result = await self._session.execute(
+            select(
+                AddressModel.localidad_id,
+                AddressModel.lat,
+                AddressModel.lng,
+                LocationModel.tipo,
+                LocationModel.activo,
+            )
+            .join(LocationModel, LocationModel.id == AddressModel.localidad_id)
+            .where(AddressModel.lat.is_not(None), AddressModel.lng.is_not(None), *conditions)
+        )
+        return [
+            IndexedPoint(location_id=row[0], lat=row[1], lng=row[2], tipo=row[3], activo=row[4])
+            for row in result
+        ]
+
+    async def list_ungeocoded_addresses(self, *, after_id: int, limit: int) -> list[Address]:
+        result = await self._session.execute(
+            select(AddressModel)
+            .where(
+                AddressModel.localidad_id > after_id,
+                or_(AddressModel.lat.is_(None), AddressModel.lng.is_(None)),
+                AddressModel.calle.is_not(None),
+            )
+            .order_by(AddressModel.localidad_id)
+            .limit(limit)
+        )
+        return [self._address_to_domain(model) for model in result.scalars()]
+
+    async def set_address_coordinates(
+        self,
+        coordinates: Mapping[int, tuple[float, float]],
+        *,
+        before_commit: Callable[[int], Awaitable[None]] | None = None,
+    ) -> int:
+        filled = await self._fill_missing_coordinates(coordinates) if coordinates else []
+        if before_commit is not None:
+            await before_commit(len(filled))
+        await self._commit(*filled)
+        if self._spatial_index is not None and filled:
+            for point in await self._indexed_points(AddressModel.localidad_id.in_(filled)):
+                self._spatial_index.upsert(point)
+        return len(filled)
+
+    async def _fill_missing_coordinates(
+        self, coordinates: Mapping[int, tuple[float, float]]
+    ) -> list[int]:
+        """Write the coordinates of addresses still missing them and bump their versions.
+
+        Only those rows are touched: a user edit made while the lookup was in flight wins,
+        and its location keeps its version. Returns the ids that were filled.
+        """
+        address_table = AddressModel.__table__
+        # Locked, so the rows picked here are the ones the guarded UPDATE below matches.
+        filled = list(
+            (
+                await self._session.execute(
+                    select(address_table.c.localidad_id)
+                    .where(
+                        address_table.c.localidad_id.in_(list(coordinates)),
+                        or_(address_table.c.lat.is_(None), address_table.c.lng.is_(None)),
+                    )
+                    .order_by(address_table.c.localidad_id)
+                    .with_for_update()
+                )
+            ).scalars()
+        )
+        if not filled:
+            return []
+        points = {location_id: coordinates[location_id] for location_id in filled}
+        await self._session.execute(
+            update(address_table)
+            .where(
+                address_table.c.localidad_id == bindparam("b_localidad_id"),
+                or_(address_table.c.lat.is_(None), address_table.c.lng.is_(None)),
+            )
+            .values(
+                lat=bindparam("b_lat"),
+                lng=bindparam("b_lng"),
+                geohash=bindparam("b_geohash"),
+                updated_at=func.now(),
+            )
+            .execution_options(synchronize_session=False),
+            [
+                {
+                    "b_localidad_id": location_id,
+                    "b_lat": lat,
+                    "b_lng": lng,
+                    "b_geohash": encode(lat, lng),
+                }
+                for location_id, (lat, lng) in points.items()
+            ],
+        )
+        await self._session.execute(
+            update(LocationModel)
+            .where(LocationModel.id.in_(filled))
+            .values(version=LocationModel.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return filled
+
+    async def stream_locations(
+        self, filters: LocationFilters, *, batch_size: int = 1000
+    ) -> AsyncIterator[dict[str, Any]]:
+        aliases = (
+            select(func.aggregate_strings(LocationAliasModel.alias, _LIST_SEPARATOR))
+            .where(LocationAliasModel.localidad_id == LocationModel.id)
+            .scalar_subquery()
+        )
+        clients = (
+            select(
+                func.aggregate_strings(
+                    LocationClientModel.cliente_source
+                    + _FIELD_SEPARATOR
+                    + LocationClientModel.cliente_external_id
+                    + _FIELD_SEPARATOR
+                    + LocationClientModel.rol,
+                    _LIST_SEPARATOR,
+                )
+            )
+            .where(LocationClientModel.localidad_id == LocationModel.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                LocationModel.id,
+                LocationModel.nombre_oficial,
+                LocationModel.codigo,
+                LocationModel.tipo,
+                LocationModel.activo,
+                LocationModel.es_global,
+                LocationModel.created_at,
+                LocationModel.updated_at,
+                AddressModel.calle,
+                AddressModel.colonia,
+                AddressModel.ciudad_text,
+                AddressModel.estado_text,
+                AddressModel.cp,
+                AddressModel.lat,
+                AddressModel.lng,
+                AddressModel.referencia,
+                aliases.label("aliases"),
+                clients.label("clients"),
+            )
+            .outerjoin(AddressModel, AddressModel.localidad_id == LocationModel.id)
+            .order_by(LocationModel.id)
+        )
+        if filters != LocationFilters():
+            matching = self._apply_filters(select(LocationModel.id), filters).correlate(None)
+            stmt = stmt.where(LocationModel.id.in_(matching))
+
+        result = await self._session.stream(stmt.execution_options(yield_per=batch_size))
+        async for row in result.mappings():
+            item = dict(row)
+            item["aliases"] = row["aliases"].split(_LIST_SEPARATOR) if row["aliases"] else []
+            item["clients"] = [
+                dict(
+                    zip(
+                        ("cliente_source", "cliente_external_id", "rol"),
+                        packed.split(_FIELD_SEPARATOR),
+                    )
+                )
+                for packed in (row["clients"].split(_LIST_SEPARATOR) if row["clients"] else [])
+            ]
+            yield item
 
     async def get_location(self, location_id: int) -> Location | None:
         stmt = self._base_query().where(LocationModel.id == location_id)
@@ -92,6 +535,31 @@ class SQLAlchemyLocationRepository(LocationRepository):
         model = result.scalar_one_or_none()
         return self._to_domain(model) if model else None
 
+    async def get_location_by_codigo(self, codigo: str) -> Location | None:
+        stmt = self._base_query().where(LocationModel.codigo == codigo)
+        result = await self._session.execute(stmt)
+        model = result.scalar_one_or_none()
+        return self._to_domain(model) if model else None
+
+    async def get_locations(
+        self, *, ids: Sequence[int] = (), codigos: Sequence[str] = ()
+    ) -> list[Location]:
+        conditions = []
+        if ids:
+            conditions.append(LocationModel.id.in_(set(ids)))
+        if codigos:
+            conditions.append(LocationModel.codigo.in_(set(codigos)))
+        if not conditions:
+            return []
+        result = await self._session.execute(self._base_query().where(or_(*conditions)))
+        return [self._to_domain(model) for model in result.scalars()]
+
+    async def get_location_version(self, location_id: int) -> LocationVersion | None:
+        return await self._get_version(LocationModel.id == location_id)
+
+    async def get_location_version_by_codigo(self, codigo: str) -> LocationVersion | None:
+        return await self._get_version(LocationModel.codigo == codigo)
+
     async def update_location(
         self,
         location_id: int,
@@ -115,37 +583,51 @@ class SQLAlchemyLocationRepository(LocationRepository):
             model.activo = activo
         if es_global is not None:
             model.es_global = es_global
+        model.search_text = build_search_document(
+            model.nombre_oficial, model.codigo, [alias.alias for alias in model.aliases]
+        )
+        model.version += 1
 
-        await self._session.commit()
-        refreshed = await self._get_model(model.id)
-        if refreshed is None:
-            return None
-        return self._to_domain(refreshed)
+        await self._commit(model.id)
+        self._index_location(model)
+        return self._to_domain(model)
 
     async def update_address(self, location_id: int, data: dict) -> Location | None:
         model = await self._get_model(location_id)
         if model is None:
             return None
-        await self._apply_address(model, data)
-        await self._session.commit()
-        refreshed = await self._get_model(model.id)
-        if refreshed is None:
-            return None
-        return self._to_domain(refreshed)
+        self._apply_address(model, data)
+        model.version += 1
+        await self._commit(model.id)
+        self._index_location(model)
+        return self._to_domain(model)
 
     async def add_alias(self, location_id: int, alias: str) -> Alias:
-        model = await self._get_model(location_id)
+        # Only the aliases are needed (search_text), so join them instead of loading the
+        # whole aggregate: one SELECT, then the INSERT and the version bump.
+        stmt = (
+            select(LocationModel)
+            .options(joinedload(LocationModel.aliases))
+            .execution_options(populate_existing=True)
+            .where(LocationModel.id == location_id)
+        )
+        result = await self._session.execute(stmt)
+        model = result.unique().scalar_one_or_none()
         if model is None:
             raise ValueError("Localidad no encontrada")
         existing = next((item for item in model.aliases if item.alias == alias), None)
         if existing is None:
-            alias_model = LocationAliasModel(localidad_id=model.id, alias=alias)
-            self._session.add(alias_model)
-            await self._session.flush()
-            await self._session.refresh(alias_model)
+            alias_model = LocationAliasModel(alias=alias)
+            model.aliases.append(alias_model)
+            model.search_text = build_search_document(
+                model.nombre_oficial,
+                model.codigo,
+                [item.alias for item in model.aliases],
+            )
+            model.version += 1
         else:
             alias_model = existing
-        await self._session.commit()
+        await self._commit(model.id)
         return self._alias_to_domain(alias_model)
 
     async def remove_alias(self, location_id: int, alias_id: int) -> None:
@@ -158,34 +640,37 @@ class SQLAlchemyLocationRepository(LocationRepository):
         if alias is None:
             raise ValueError("Alias no encontrado")
         await self._session.delete(alias)
-        await self._session.commit()
+        location = await self._refresh_search_text(location_id)
+        if location is not None:
+            location.version += 1
+        await self._commit(location_id)
 
     async def add_client(self, location_id: int, client: ClientLink) -> ClientLink:
         model = await self._get_model(location_id)
         if model is None:
             raise ValueError("Localidad no encontrada")
-        stmt = select(LocationClientModel).where(
-            LocationClientModel.localidad_id == model.id,
-            LocationClientModel.cliente_source == client.cliente_source,
-            LocationClientModel.cliente_external_id == client.cliente_external_id,
-            LocationClientModel.rol == client.rol,
+        # The aggregate load already brought the client links; no need to query again.
+        key = (client.cliente_source, client.cliente_external_id, client.rol)
+        existing = next(
+            (
+                item
+                for item in model.clients
+                if (item.cliente_source, item.cliente_external_id, item.rol) == key
+            ),
+            None,
         )
-        result = await self._session.execute(stmt)
-        existing = result.scalar_one_or_none()
 
         if existing is None:
             client_model = LocationClientModel(
-                localidad_id=model.id,
                 cliente_source=client.cliente_source,
                 cliente_external_id=client.cliente_external_id,
                 rol=client.rol,
             )
-            self._session.add(client_model)
-            await self._session.flush()
-            await self._session.refresh(client_model)
+            model.clients.append(client_model)
+            model.version += 1
         else:
             client_model = existing
-        await self._session.commit()
+        await self._commit(model.id)
         return self._client_to_domain(client_model)
 
     async def remove_client(
@@ -207,19 +692,49 @@ class SQLAlchemyLocationRepository(LocationRepository):
         if client is None:
             raise ValueError("Cliente no encontrado")
         await self._session.delete(client)
-        await self._session.commit()
+        await self._session.execute(
+            update(LocationModel)
+            .where(LocationModel.id == location_id)
+            .values(version=LocationModel.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await self._commit(location_id)
 
     async def delete_location(self, location_id: int) -> bool:
         model = await self._get_model(location_id)
         if model is None:
             return False
         await self._session.delete(model)
-        await self._session.commit()
+        await self._commit(location_id)
+        if self._spatial_index is not None:
+            self._spatial_index.remove(location_id)
         return True
 
-    async def _get_model_by_codigo(self, codigo: str) -> LocationModel | None:
+    async def _commit(self, *location_ids: int | None) -> None:
+        """Commit the unit of work and drop the cached payloads it made stale."""
+        if self._read_model:
+            await self._session.flush()
+            await refresh_location_search(
+                self._session, [location_id for location_id in location_ids if location_id]
+            )
+        await self._session.commit()
+        if self._cache is None:
+            return
+        for location_id in location_ids:
+            if location_id is not None:
+                await self._cache.invalidate(location_id)
+
+    async def _get_model_by_codigo(
+        self, codigo: str, *, with_aliases: bool = True, with_clients: bool = True
+    ) -> LocationModel | None:
+        options = [selectinload(LocationModel.address)]
+        if with_aliases:
+            options.append(selectinload(LocationModel.aliases))
+        if with_clients:
+            options.append(selectinload(LocationModel.clients))
         stmt = (
-            self._base_query()
+            select(LocationModel)
+            .options(*options)
             .execution_options(populate_existing=True)
             .where(LocationModel.codigo == codigo)
         )
@@ -235,20 +750,573 @@ class SQLAlchemyLocationRepository(LocationRepository):
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
-    def _base_query(self) -> Select[LocationModel]:
-        return select(LocationModel).options(
-            selectinload(LocationModel.address),
-            selectinload(LocationModel.aliases),
-            selectinload(LocationModel.clients),
-        )
+    async def _find_near(
+        self,
+        origin: tuple[float, float],
+        box: BoundingBox,
+        limit: int,
+        filters: LocationFilters,
+        radius_m: float | None = None,
+    ) -> list[NearbyLocation]:
+        """Rank the addresses inside ``box`` by distance to ``origin``.
 
-    def _apply_filters(self, stmt: Select[Any], filters: LocationFilters) -> Select[Any]:
-        if filters.query:
-            pattern = f"%{filters.query}%"
+        Only the ``limit`` closest aggregates are loaded, after ``_nearest_candidates``.
+        """
+        nearest = await self._nearest_candidates(origin, box, limit, filters, radius_m)
+        return await self._load_ranked(nearest)
+
+    async def _load_ranked(self, nearest: list[tuple[float, int]]) -> list[NearbyLocation]:
+        """Load the aggregates of ``(distance_m, location_id)`` pairs, keeping their order."""
+        if not nearest:
+            return []
+        models = await self._load_models([location_id for _, location_id in nearest])
+        return [
+            NearbyLocation(location=self._to_domain(models[location_id]), distance_m=distance)
+            for distance, location_id in nearest
+            if location_id in models
+        ]
+
+    async def _nearest_candidates(
+        self,
+        origin: tuple[float, float],
+        box: BoundingBox,
+        limit: int,
+        filters: LocationFilters,
+        radius_m: float | None = None,
+    ) -> list[tuple[float, int]]:
+        """The ``(distance_m, location_id)`` of the ``limit`` addresses closest to ``origin``.
+
+        Geohash prefixes narrow the scan through the index and the lat/lng range trims
+        the cell edges. The database orders the rows by an equirectangular distance and
+        returns only a few more than ``limit``; those are re-ranked by haversine distance.
+        """
+        # Longitude degrees shrink with latitude; scaled at the origin this keeps the SQL
+        # ordering close to the true one, and the extra candidates absorb the difference.
+        lng_scale = math.cos(math.radians(origin[0]))
+        lat_delta = AddressModel.lat - origin[0]
+        lng_delta = (AddressModel.lng - origin[1]) * lng_scale
+        stmt = (
+            select(AddressModel.localidad_id, AddressModel.lat, AddressModel.lng)
+            .where(
+                AddressModel.lat.between(box.min_lat, box.max_lat),
+                AddressModel.lng.between(box.min_lng, box.max_lng),
+            )
+            .order_by(lat_delta * lat_delta + lng_delta * lng_delta, AddressModel.localidad_id)
+            .limit(limit * _NEAR_CANDIDATE_FACTOR + _NEAR_CANDIDATE_SLACK)
+        )
+        cells = covering_cells(box)
+        if cells:
+            stmt = stmt.where(or_(*(AddressModel.geohash.like(f"{cell}%") for cell in cells)))
+        if filters != LocationFilters():
             stmt = stmt.where(
-                (LocationModel.nombre_oficial.ilike(pattern))
-                | (LocationModel.codigo.ilike(pattern))
+                AddressModel.localidad_id.in_(self._apply_filters(select(LocationModel.id), filters))
+            )
+
+        candidates: list[tuple[float, int]] = []
+        for location_id, lat, lng in await self._session.execute(stmt):
+            distance = haversine_m(origin[0], origin[1], lat, lng)
+            if radius_m is None or distance <= radius_m:
+                candidates.append((distance, location_id))
+        return heapq.nsmallest(limit, candidates)
+
+    async def _load_nearby(
+        self,
+        origin: tuple[float, float],
+        hits: list[tuple[int, float]],
+        radius_m: float,
+        filters: LocationFilters,
+    ) -> list[NearbyLocation]:
+        """Load the aggregates found by the spatial index.
+
+        The filters are applied again and distances are recomputed from the loaded rows,
+        so entries the index has not caught up with yet (writes served by other workers)
+        are never reported with a stale ``tipo``/``activo`` or position.
+        """
+        models = await self._load_models(
+            [location_id for location_id, _ in hits], filters=filters
+        )
+        found: list[NearbyLocation] = []
+        for location_id, _ in hits:
+            model = models.get(location_id)
+            address = model.address if model is not None else None
+            if address is None or address.lat is None or address.lng is None:
+                continue
+            distance = haversine_m(origin[0], origin[1], address.lat, address.lng)
+            if distance <= radius_m:
+                found.append(NearbyLocation(location=self._to_domain(model), distance_m=distance))
+        found.sort(key=lambda item: item.distance_m)
+        return found
+
+    async def _load_models(
+        self,
+        location_ids: list[int],
+        projection: LocationProjection = FULL_PROJECTION,
+        *,
+        filters: LocationFilters | None = None,
+    ) -> dict[int, LocationModel]:
+        if not location_ids:
+            return {}
+        stmt = self._base_query(projection).where(LocationModel.id.in_(location_ids))
+        if filters is not None:
+            stmt = self._apply_filters(stmt, filters)
+        result = await self._session.execute(stmt)
+        return {model.id: model for model in result.scalars()}
+
+    def _index_location(self, model: LocationModel) -> None:
+        if self._spatial_index is None:
+            return
+        address = model.address
+        if address is None or address.lat is None or address.lng is None:
+            self._spatial_index.remove(model.id)
+            return
+        self._spatial_index.upsert(
+            IndexedPoint(
+                location_id=model.id,
+                lat=address.lat,
+                lng=address.lng,
+                tipo=model.tipo,
+                activo=model.activo,
             )
+        )
+
+    def _index_bulk_batch(
+        self, items: Sequence[dict], batch: list[int], results: list[BulkUpsertResult]
+    ) -> None:
+        if self._spatial_index is None:
+            return
+        for index in batch:
+            location_id = results[index].location_id
+            if location_id is None:
+                continue
+            item = items[index]
+            address = item["address"]
+            if address:
+                lat, lng = address.get("lat"), address.get("lng")
+                if lat is None or lng is None:
+                    self._spatial_index.remove(location_id)
+                    continue
+            else:
+                # The stored address was left untouched; only tipo/activo may change.
+                current = self._spatial_index.get(location_id)
+                if current is None:
+                    continue
+                lat, lng = current.lat, current.lng
+            self._spatial_index.upsert(
+                IndexedPoint(
+                    location_id=location_id,
+                    lat=lat,
+                    lng=lng,
+                    tipo=item["tipo"],
+                    activo=item["activo"],
+                )
+            )
+
+    async def _get_version(self, condition: ColumnElement[bool]) -> LocationVersion | None:
+        result = await self._session.execute(
+            select(LocationModel.id, LocationModel.version, LocationModel.updated_at).where(condition)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return LocationVersion(id=row.id, version=row.version, updated_at=row.updated_at)
+
+    def _location_query(self, projection: LocationProjection) -> Select[LocationModel]:
+        """The locations of ``projection`` without any of their children."""
+        if projection.is_full:
+            return select(LocationModel)
+        return select(LocationModel).options(load_only(*self._location_columns(projection)))
+
+    async def _load_relationships(
+        self, models: list[LocationModel], projection: LocationProjection
+    ) -> None:
+        """Load the children ``projection`` includes for ``models``, one query per relation.
+
+        The counterpart of the selectinloads in ``_base_query`` for rows that were fetched
+        without them.
+        """
+        if not models:
+            return
+        ids = [model.id for model in models]
+        if projection.is_full or LocationInclude.ADDRESS in projection.include:
+            stmt = select(AddressModel).where(AddressModel.localidad_id.in_(ids))
+            if not projection.is_full and projection.address_fields is not None:
+                stmt = stmt.options(
+                    load_only(*(getattr(AddressModel, name) for name in projection.address_fields))
+                )
+            addresses = {
+                address.localidad_id: address
+                for address in (await self._session.execute(stmt)).scalars()
+            }
+            for model in models:
+                set_committed_value(model, "address", addresses.get(model.id))
+        for include, name, child in (
+            (LocationInclude.ALIASES, "aliases", LocationAliasModel),
+            (LocationInclude.CLIENTS, "clients", LocationClientModel),
+        ):
+            if not projection.is_full and include not in projection.include:
+                continue
+            grouped: dict[int, list[Any]] = {location_id: [] for location_id in ids}
+            stmt = select(child).where(child.localidad_id.in_(ids))
+            result = await self._session.execute(
+                stmt.order_by(*LocationModel.__mapper__.relationships[name].order_by)
+            )
+            for row in result.scalars():
+                grouped[row.localidad_id].append(row)
+            for model in models:
+                set_committed_value(model, name, grouped[model.id])
+
+    def _base_query(
+        self, projection: LocationProjection = FULL_PROJECTION
+    ) -> Select[LocationModel]:
+        if projection.is_full:
+            return select(LocationModel).options(
+                selectinload(LocationModel.address),
+                selectinload(LocationModel.aliases),
+                selectinload(LocationModel.clients),
+            )
+        options = [load_only(*self._location_columns(projection))]
+        if LocationInclude.ADDRESS in projection.include:
+            address = selectinload(LocationModel.address)
+            if projection.address_fields is not None:
+                address = address.load_only(
+                    *(getattr(AddressModel, name) for name in projection.address_fields)
+                )
+            options.append(address)
+        if LocationInclude.ALIASES in projection.include:
+            options.append(selectinload(LocationModel.aliases))
+        if LocationInclude.CLIENTS in projection.include:
+            options.append(selectinload(LocationModel.clients))
+        return select(LocationModel).options(*options)
+
+    @staticmethod
+    def _location_fields(projection: LocationProjection) -> frozenset[str]:
+        if projection.fields is None:
+            return frozenset(LOCATION_FIELDS)
+        return projection.fields | _IDENTITY_FIELDS
+
+    def _location_columns(self, projection: LocationProjection) -> list[Any]:
+        return [getattr(LocationModel, name) for name in self._location_fields(projection)]
+
+    @staticmethod
+    def _pick(model: Any, names: Sequence[str], loaded: frozenset[str]) -> dict[str, Any]:
+        return {name: getattr(model, name) if name in loaded else None for name in names}
+
+    @staticmethod
+    def _bulk_batches(items: Sequence[dict], indexes: list[int]) -> list[list[int]]:
+        batches: list[list[int]] = []
+        current: list[int] = []
+        child_rows = 0
+        for index in indexes:
+            item_rows = len(items[index]["aliases"]) + len(items[index]["clients"]) + 1
+            if current and (
+                len(current) >= _BULK_BATCH_SIZE or child_rows + item_rows > _BULK_MAX_CHILD_ROWS
+            ):
+                batches.append(current)
+                current, child_rows = [], 0
+            current.append(index)
+            child_rows += item_rows
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _claim_nombres(
+        items: Sequence[dict],
+        batch: list[int],
+        stored_owner: dict[str, str],
+        current_nombre: dict[str, str],
+    ) -> set[int]:
+        """Indexes of the batch whose ``nombre_oficial`` is free once the batch is applied.
+
+        A name counts as free when its stored owner renames away from it in the same batch.
+        A rejected item keeps its stored name, which can in turn reject the item that was
+        taking it over, so the check repeats until no further item is rejected.
+        """
+        candidates = list(batch)
+        while True:
+            owner = dict(stored_owner)
+            for index in candidates:
+                codigo = items[index]["codigo"]
+                previous = current_nombre.get(codigo)
+                if previous != items[index]["nombre_oficial"] and owner.get(previous) == codigo:
+                    del owner[previous]
+            accepted = [
+                index
+                for index in candidates
+                if owner.setdefault(items[index]["nombre_oficial"], items[index]["codigo"])
+                == items[index]["codigo"]
+            ]
+            if len(accepted) == len(candidates):
+                return set(accepted)
+            candidates = accepted
+
+    async def _bulk_upsert_batch(
+        self, items: Sequence[dict], batch: list[int], results: list[BulkUpsertResult]
+    ) -> None:
+        codigos = {items[index]["codigo"] for index in batch}
+        nombres = {items[index]["nombre_oficial"] for index in batch}
+        existing = await self._session.execute(
+            select(LocationModel.codigo, LocationModel.nombre_oficial).where(
+                or_(LocationModel.codigo.in_(codigos), LocationModel.nombre_oficial.in_(nombres))
+            )
+        )
+        stored_owner: dict[str, str] = {}
+        current_nombre: dict[str, str] = {}
+        for codigo, nombre in existing:
+            stored_owner[nombre] = codigo
+            if codigo in codigos:
+                current_nombre[codigo] = nombre
+        existing_codigos = set(current_nombre)
+
+        accepted = self._claim_nombres(items, batch, stored_owner, current_nombre)
+        for index in batch:
+            if index not in accepted:
+                results[index].error = "El nombre_oficial ya pertenece a otra localidad"
+        accepted = [index for index in batch if index in accepted]
+        if not accepted:
+            return
+
+        locations = LocationModel.__table__
+        # Unique constraints are checked row by row, so names handed over inside the
+        # batch (renames onto a freed name, swaps) are parked on a placeholder first.
+        claimed = {items[index]["nombre_oficial"] for index in accepted}
+        released = [
+            items[index]["codigo"]
+            for index in accepted
+            if current_nombre.get(items[index]["codigo"], items[index]["nombre_oficial"])
+            in claimed - {items[index]["nombre_oficial"]}
+        ]
+        if released:
+            await self._session.execute(
+                update(locations)
+                .where(locations.c.codigo.in_(released))
+                .values(nombre_oficial=literal(_RENAME_PLACEHOLDER) + locations.c.codigo)
+            )
+        insert_stmt = self._insert(locations).values(
+            [
+                {
+                    "nombre_oficial": items[index]["nombre_oficial"],
+                    "codigo": items[index]["codigo"],
+                    "tipo": items[index]["tipo"],
+                    "activo": items[index]["activo"],
+                    "es_global": items[index]["es_global"],
+                    "search_text": build_search_document(
+                        items[index]["nombre_oficial"],
+                        items[index]["codigo"],
+                        items[index]["aliases"],
+                    ),
+                }
+                for index in accepted
+            ]
+        )
+        upsert_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[locations.c.codigo],
+            set_={
+                "nombre_oficial": insert_stmt.excluded.nombre_oficial,
+                "tipo": insert_stmt.excluded.tipo,
+                "activo": insert_stmt.excluded.activo,
+                "es_global": insert_stmt.excluded.es_global,
+                "search_text": insert_stmt.excluded.search_text,
+                "version": locations.c.version + 1,
+                "updated_at": func.now(),
+            },
+        ).returning(locations.c.id, locations.c.codigo)
+        ids = {codigo: location_id for location_id, codigo in await self._session.execute(upsert_stmt)}
+
+        for index in accepted:
+            result = results[index]
+            result.location_id = ids[result.codigo]
+            result.created = result.codigo not in existing_codigos
+
+        addresses = [
+            {
+                "localidad_id": ids[items[index]["codigo"]],
+                **items[index]["address"],
+                "geohash": encode_optional(
+                    items[index]["address"].get("lat"), items[index]["address"].get("lng")
+                ),
+            }
+            for index in accepted
+            if items[index]["address"]
+        ]
+        if addresses:
+            address_table = AddressModel.__table__
+            for chunk in self._chunks(addresses):
+                address_stmt = self._insert(address_table).values(chunk)
+                columns = {key for row in chunk for key in row} - {"localidad_id"}
+                await self._session.execute(
+                    address_stmt.on_conflict_do_update(
+                        index_elements=[address_table.c.localidad_id],
+                        set_={
+                            **{column: address_stmt.excluded[column] for column in columns},
+                            "updated_at": func.now(),
+                        },
+                    )
+                )
+
+        location_ids = [ids[items[index]["codigo"]] for index in accepted]
+        await self._replace_children(
+            LocationAliasModel.__table__,
+            ("localidad_id", "alias"),
+            location_ids,
+            [
+                {"localidad_id": ids[items[index]["codigo"]], "alias": alias}
+                for index in accepted
+                for alias in dict.fromkeys(alias for alias in items[index]["aliases"] if alias)
+            ],
+        )
+        await self._replace_children(
+            LocationClientModel.__table__,
+            ("localidad_id", "cliente_source", "rol", "cliente_external_id"),
+            location_ids,
+            [
+                {"localidad_id": ids[items[index]["codigo"]], **client}
+                for index in accepted
+                for client in items[index]["clients"]
+            ],
+        )
+
+    async def _replace_children(
+        self,
+        table: Table,
+        key_columns: tuple[str, ...],
+        location_ids: list[int],
+        rows: list[dict],
+    ) -> None:
+        """Make the child rows of ``location_ids`` equal to ``rows`` with set-based statements."""
+        keys = list(dict.fromkeys(tuple(row[column] for column in key_columns) for row in rows))
+        stale = delete(table).where(table.c.localidad_id.in_(location_ids))
+        if keys and len(location_ids) == 1:
+            # localidad_id is fixed, so match the other columns; SQLite scans a row-value
+            # list once per row, a plain IN list is looked up.
+            stale = stale.where(
+                ~self._key_filter(table, key_columns[1:], [key[1:] for key in keys])
+            )
+        elif keys:
+            stale = stale.where(
+                tuple_(*(table.c[column] for column in key_columns)).not_in(keys)
+            )
+        await self._session.execute(stale)
+        if rows:
+            # executemany: the statement compiles once (and is cached) and the driver
+            # batches the rows, instead of rendering a bind parameter per value.
+            await self._session.execute(
+                self._insert(table).on_conflict_do_nothing(
+                    index_elements=[table.c[column] for column in key_columns]
+                ),
+                rows,
+            )
+
+    @staticmethod
+    def _key_filter(
+        table: Table, key_columns: Sequence[str], keys: list[tuple[Any, ...]]
+    ) -> ColumnElement[bool]:
+        """``(key_columns) IN keys`` grouped on the leading columns, ``IN`` on the last one."""
+        *leading, last = key_columns
+        groups: dict[tuple[Any, ...], list[Any]] = {}
+        for key in keys:
+            groups.setdefault(key[:-1], []).append(key[-1])
+        return or_(
+            *(
+                and_(
+                    *(table.c[column] == value for column, value in zip(leading, prefix)),
+                    table.c[last].in_(values),
+                )
+                for prefix, values in groups.items()
+            )
+        )
+
+    def _insert(self, table: Table):  # noqa: ANN202 - dialect specific Insert construct
+        if self._session.bind.dialect.name == "postgresql":
+            return postgresql_insert(table)
+        return sqlite_insert(table)
+
+    @staticmethod
+    def _chunks(rows: list[dict]) -> list[list[dict]]:
+        return [
+            rows[start : start + _BULK_INSERT_CHUNK]
+            for start in range(0, len(rows), _BULK_INSERT_CHUNK)
+        ]
+
+    async def _count(self, filters: LocationFilters) -> int:
+        count_stmt = self._apply_filters(
+            select(func.count(LocationModel.id)).select_from(LocationModel),
+            filters,
+        )
+        return (await self._session.execute(count_stmt)).scalar_one()
+
+    async def _estimate_count(self, filters: LocationFilters) -> int:
+        dialect = self._session.bind.dialect.name
+        if dialect == "postgresql" and filters == LocationFilters():
+            # reltuples is -1 until the table has been vacuumed/analyzed at least once.
+            stmt = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'localidades'::regclass")
+            estimate = (await self._session.execute(stmt)).scalar_one_or_none()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        key = (
+            dialect,
+            filters.query,
+            filters.cliente_source,
+            filters.cliente_external_id,
+            filters.estado,
+            filters.ciudad,
+            filters.tipo,
+            filters.activo,
+        )
+        total = _count_cache.get(key)
+        if total is None:
+            total = await self._count(filters)
+            _count_cache.set(key, total)
+        return total
+
+    def _sort_keys(self, filters: LocationFilters) -> tuple[str, list[SortKey]]:
+        keys: list[SortKey] = [(LocationModel.nombre_oficial, False), (LocationModel.id, False)]
+        if self._has_query(filters):
+            return "rank", [(self._search.rank(filters.query), True), *keys]
+        return "name", keys
+
+    @staticmethod
+    def _seek_condition(keys: list[SortKey], values: list[Any]) -> ColumnElement[bool]:
+        if not any(descending for _, descending in keys):
+            # Row-value comparison lets the database seek straight into the index.
+            return tuple_(*(expr for expr, _ in keys)) > tuple_(*values)
+        clauses = []
+        for position, (expr, descending) in enumerate(keys):
+            ties = [keys[index][0] == values[index] for index in range(position)]
+            step = expr < values[position] if descending else expr > values[position]
+            clauses.append(and_(*ties, step))
+        return or_(*clauses)
+
+    @staticmethod
+    def _encode_cursor(sort_mode: str, values: Sequence[Any]) -> str:
+        raw = json.dumps([sort_mode, *values], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_mode: str, size: int) -> list[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            payload = None
+        if (
+            not isinstance(payload, list)
+            or len(payload) != size + 1
+            or payload[0] != sort_mode
+            or not isinstance(payload[-2], str)
+            or not isinstance(payload[-1], int)
+            or (size > 2 and not isinstance(payload[1], (int, float)))
+        ):
+            raise ValueError("Cursor inválido")
+        return payload[1:]
+
+    @staticmethod
+    def _has_query(filters: LocationFilters) -> bool:
+        return bool(normalize_text(filters.query))
+
+    def _apply_filters(self, stmt: Select[Any], filters: LocationFilters) -> Select[Any]:
+        if self._has_query(filters):
+            stmt = stmt.where(self._search.condition(filters.query))
         if filters.tipo:
             stmt = stmt.where(LocationModel.tipo == filters.tipo)
         if filters.activo is not None:
@@ -260,114 +1328,103 @@ class SQLAlchemyLocationRepository(LocationRepository):
             if filters.ciudad:
                 stmt = stmt.where(AddressModel.ciudad_text.ilike(f"%{filters.ciudad}%"))
         if filters.cliente_source or filters.cliente_external_id:
-            stmt = stmt.join(LocationModel.clients, isouter=True)
-            conditions = []
-            if filters.cliente_source:
-                conditions.append(
-                    LocationClientModel.cliente_source == filters.cliente_source
-                )
-            if filters.cliente_external_id:
-                conditions.append(
-                    LocationClientModel.cliente_external_id == filters.cliente_external_id
-                )
-            match_condition = and_(*conditions) if conditions else None
-            if match_condition is not None:
-                stmt = stmt.where(
-                    or_(
-                        LocationModel.es_global.is_(True),
-                        match_condition,
-                    )
-                )
-            else:
-                stmt = stmt.where(LocationModel.es_global.is_(True))
+            stmt = stmt.where(LocationModel.id.in_(self._client_scope(filters)))
         return stmt
 
-    async def _apply_address(self, model: LocationModel, data: dict) -> None:
-        stmt = select(AddressModel).where(AddressModel.localidad_id == model.id)
-        result = await self._session.execute(stmt)
-        address_model = result.scalar_one_or_none()
+    @staticmethod
+    def _client_scope(filters: LocationFilters) -> CompoundSelect:
+        """Ids visible to a client: its linked locations plus every global one.
 
-        if address_model is None:
-            address_model = AddressModel(localidad_id=model.id, **data)
-            self._session.add(address_model)
-        else:
-            for key, value in data.items():
-                setattr(address_model, key, value)
+        A UNION of two index-only lookups (``ix_localidad_clientes_cliente`` and the partial
+        ``ix_localidades_global``) instead of ``es_global OR <client match>`` over an outer
+        join, which can use neither index and fans rows out per client link.
+        """
+        linked = select(LocationClientModel.localidad_id)
+        if filters.cliente_source:
+            linked = linked.where(LocationClientModel.cliente_source == filters.cliente_source)
+        if filters.cliente_external_id:
+            linked = linked.where(
+                LocationClientModel.cliente_external_id == filters.cliente_external_id
+            )
+        return union(linked, select(LocationModel.id).where(LocationModel.es_global.is_(True)))
 
-        model.address = address_model
+    async def _refresh_search_text(self, location_id: int) -> LocationModel | None:
         await self._session.flush()
+        location = await self._session.get(LocationModel, location_id)
+        if location is None:
+            return None
+        result = await self._session.execute(
+            select(LocationAliasModel.alias).where(LocationAliasModel.localidad_id == location_id)
+        )
+        location.search_text = build_search_document(
+            location.nombre_oficial, location.codigo, result.scalars().all()
+        )
+        return location
 
-    async def _apply_aliases(self, model: LocationModel, aliases: Sequence[str]) -> None:
-        stmt = select(LocationAliasModel).where(LocationAliasModel.localidad_id == model.id)
-        result = await self._session.execute(stmt)
-        aliases_models = result.scalars().all()
-        existing_aliases = {alias.alias: alias for alias in aliases_models}
-        target_aliases = {alias for alias in aliases if alias}
-
-        # remove aliases not present anymore
-        for alias_value, alias_model in list(existing_aliases.items()):
-            if alias_value not in target_aliases:
-                await self._session.delete(alias_model)
-
-        # add new aliases
-        for alias_value in target_aliases:
-            if alias_value not in existing_aliases:
-                self._session.add(
-                    LocationAliasModel(localidad_id=model.id, alias=alias_value)
-                )
-        await self._session.flush()
+    # The helpers below work on the relationships loaded by ``_base_query`` (or initialised
+    # empty for new aggregates) so the response can be built from session state after the
+    # commit; ``eager_defaults`` on the models fetches server timestamps via RETURNING.
+    def _apply_address(self, model: LocationModel, data: dict) -> None:
+        if model.address is None:
+            model.address = AddressModel(**data)
+        else:
+            for key, value in data.items():
+                setattr(model.address, key, value)
+        model.address.geohash = encode_optional(model.address.lat, model.address.lng)
 
-    async def _apply_clients(self, model: LocationModel, clients: Sequence[dict]) -> None:
-        stmt = select(LocationClientModel).where(
-            LocationClientModel.localidad_id == model.id
-        )
-        result = await self._session.execute(stmt)
-        client_models = result.scalars().all()
-        existing = {
-            (client.cliente_source, client.cliente_external_id, client.rol): client
-            for client in client_models
-        }
-        target = {
-            (
-                item["cliente_source"],
-                item["cliente_external_id"],
-                item["rol"],
-            )
-            for item in clients
-        }
+    async def _sync_children(
+        self,
+        model: LocationModel,
+        aliases: list[str] | None,
+        clients: list[dict] | None,
+    ) -> None:
+        """Replace the aliases/clients of ``model`` (``None`` keeps them) and load the result.
 
-        for key, client_model in list(existing.items()):
-            if key not in target:
-                await self._session.delete(client_model)
+        One ``DELETE ... NOT IN`` and one batched ``INSERT ... ON CONFLICT DO NOTHING`` per
+        collection, whatever the number of links, instead of an ORM object per row.
+        """
+        if aliases is not None:
+            await self._replace_children(
+                LocationAliasModel.__table__,
+                ("localidad_id", "alias"),
+                [model.id],
+                [{"localidad_id": model.id, "alias": alias} for alias in aliases],
+            )
+            await self._load_children(model, "aliases", LocationAliasModel, bool(aliases))
+        if clients is not None:
+            await self._replace_children(
+                LocationClientModel.__table__,
+                ("localidad_id", "cliente_source", "rol", "cliente_external_id"),
+                [model.id],
+                [{"localidad_id": model.id, **client} for client in clients],
+            )
+            await self._load_children(model, "clients", LocationClientModel, bool(clients))
 
-        for item in clients:
-            key = (
-                item["cliente_source"],
-                item["cliente_external_id"],
-                item["rol"],
+    async def _load_children(
+        self,
+        model: LocationModel,
+        name: str,
+        child: type[LocationAliasModel] | type[LocationClientModel],
+        any_rows: bool,
+    ) -> None:
+        rows: list[Any] = []
+        if any_rows:
+            result = await self._session.execute(
+                select(child).where(child.localidad_id == model.id)
             )
-            if key not in existing:
-                self._session.add(LocationClientModel(localidad_id=model.id, **item))
-        await self._session.flush()
+            rows = list(result.scalars())
+        set_committed_value(model, name, rows)
 
-    def _to_domain(self, model: LocationModel) -> Location:
-        address = (
-            Address(
-                localidad_id=model.address.localidad_id,
-                calle=model.address.calle,
-                colonia=model.address.colonia,
-                ciudad_text=model.address.ciudad_text,
-                estado_text=model.address.estado_text,
-                cp=model.address.cp,
-                lat=model.address.lat,
-                lng=model.address.lng,
-                referencia=model.address.referencia,
-                created_at=model.address.created_at,
-                updated_at=model.address.updated_at,
-            )
-            if model.address
-            else None
-        )
+    @staticmethod
+    def _client_key(item: dict) -> tuple[str, str, str]:
+        return item["cliente_source"], item["cliente_external_id"], item["rol"]
+
+    def _to_domain(
+        self, model: LocationModel, projection: LocationProjection = FULL_PROJECTION
+    ) -> Location:
+        if not projection.is_full:
+            return self._to_projected_domain(model, projection)
+        address = self._address_to_domain(model.address) if model.address else None
         aliases = [self._alias_to_domain(alias) for alias in model.aliases]
         clients = [self._client_to_domain(client) for client in model.clients]
         return Location(
@@ -379,11 +1436,119 @@ class SQLAlchemyLocationRepository(LocationRepository):
             es_global=model.es_global,
             created_at=model.created_at,
             updated_at=model.updated_at,
+            version=model.version,
             address=address,
             aliases=aliases,
             clients=clients,
         )
 
+    def _to_projected_domain(
+        self, model: LocationModel, projection: LocationProjection
+    ) -> Location:
+        # Attributes the projection did not load are never touched: with an async session
+        # that would trigger a lazy load. They are left as ``None`` (or empty lists).
+        address = None
+        if LocationInclude.ADDRESS in projection.include and model.address is not None:
+            address_fields = (
+                frozenset(ADDRESS_FIELDS)
+                if projection.address_fields is None
+                else projection.address_fields
+            )
+            address = Address(
+                localidad_id=model.id,
+                **self._pick(model.address, ADDRESS_FIELDS, address_fields),
+            )
+        return Location(
+            **self._pick(model, LOCATION_FIELDS, self._location_fields(projection)),
+            address=address,
+            aliases=(
+                [self._alias_to_domain(alias) for alias in model.aliases]
+                if LocationInclude.ALIASES in projection.include
+                else []
+            ),
+            clients=(
+                [self._client_to_domain(client) for client in model.clients]
+                if LocationInclude.CLIENTS in projection.include
+                else []
+            ),
+        )
+
+    async def _from_read_model(
+        self,
+        rows: list[tuple[LocationModel, LocationSearchModel | None]],
+        projection: LocationProjection = FULL_PROJECTION,
+    ) -> list[Location]:
+        # Rows missing from location_search (or built from an older version, e.g. written
+        # while the read model was disabled) fall back to loading the aggregate.
+        stale = [
+            model.id
+            for model, search in rows
+            if search is None or search.version != model.version
+        ]
+        loaded = await self._load_models(stale, projection) if stale else {}
+        items: list[Location] = []
+        for model, search in rows:
+            if model.id in loaded:
+                items.append(self._to_domain(loaded[model.id], projection))
+                continue
+            if not projection.is_full:
+                items.append(self._projected_from_read_model(model, search, projection))
+                continue
+            items.append(
+                Location(
+                    id=model.id,
+                    nombre_oficial=model.nombre_oficial,
+                    codigo=model.codigo,
+                    tipo=model.tipo,
+                    activo=model.activo,
+                    es_global=model.es_global,
+                    created_at=model.created_at,
+                    updated_at=model.updated_at,
+                    version=model.version,
+                    address=address_from_json(model.id, search.address),
+                    aliases=aliases_from_json(model.id, search.aliases),
+                    clients=clients_from_json(model.id, search.clients),
+                )
+            )
+        return items
+
+    def _projected_from_read_model(
+        self, model: LocationModel, search: LocationSearchModel, projection: LocationProjection
+    ) -> Location:
+        include = projection.include
+        address = None
+        if LocationInclude.ADDRESS in include:
+            address = address_from_json(model.id, search.address)
+        return Location(
+            **self._pick(model, LOCATION_FIELDS, self._location_fields(projection)),
+            address=address,
+            aliases=(
+                aliases_from_json(model.id, search.aliases)
+                if LocationInclude.ALIASES in include
+                else []
+            ),
+            clients=(
+                clients_from_json(model.id, search.clients)
+                if LocationInclude.CLIENTS in include
+                else []
+            ),
+        )
+
+    def _address_to_domain(self, model: AddressModel) -> Address:
+        return Address(
+            localidad_id=model.localidad_id,
+            calle=model.calle,
+            colonia=model.colonia,
+            ciudad_text=model.ciudad_text,
+            estado_text=model.estado_text,
+            cp=model.cp,
+            lat=model.lat,
+            lng=model.lng,
+            referencia=model.referencia,
+            created_at=model.created_at,
+            updated_at=model.updated_at,
+        )
+
     def _alias_to_domain(self, model: LocationAliasModel) -> Alias:
         return Alias(
             id=model.id,
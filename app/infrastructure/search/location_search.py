@@ -0,0 +1,164 @@
+"""Search engines backing the free-text ``q`` filter for locations.
+
+Every location keeps a normalized ``search_text`` document (official name, code and
+aliases, lower-cased and without accents). PostgreSQL matches it through pg_trgm GIN
+indexes and a generated ``search_vector`` tsvector column, while SQLite falls back to
+pure-Python trigram scoring registered as a SQL function.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from functools import lru_cache
+
+from sqlalchemy import ColumnElement, Float, and_, event, func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.db.models import LocationModel
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(value: str | None) -> str:
+    """Lower-case, strip accents and collapse anything that is not alphanumeric."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", stripped.lower()).split())
+
+
+def build_search_document(nombre_oficial: str, codigo: str, aliases: Iterable[str]) -> str:
+    """Build the normalized document stored in ``localidades.search_text``."""
+    parts = [normalize_text(nombre_oficial), normalize_text(codigo)]
+    parts.extend(normalize_text(alias) for alias in aliases)
+    return " ".join(part for part in parts if part)
+
+
+@lru_cache(maxsize=4096)
+def _word_trigrams(word: str) -> frozenset[str]:
+    padded = f"  {word} "
+    return frozenset(padded[index : index + 3] for index in range(len(padded) - 2))
+
+
+def _trigrams(words: Iterable[str]) -> set[str]:
+    result: set[str] = set()
+    for word in words:
+        result |= _word_trigrams(word)
+    return result
+
+
+def similarity(left: str | None, right: str | None) -> float:
+    """Pure-Python counterpart of pg_trgm's ``similarity(left, right)``."""
+    if not left or not right:
+        return 0.0
+    left_trigrams = _trigrams(left.split())
+    right_trigrams = _trigrams(right.split())
+    union = left_trigrams | right_trigrams
+    return len(left_trigrams & right_trigrams) / len(union) if union else 0.0
+
+
+def word_similarity(query: str | None, document: str | None) -> float:
+    """Pure-Python counterpart of pg_trgm's ``word_similarity(query, document)``.
+
+    Returns the best trigram similarity between the query and any contiguous run of
+    words in the document, so short autocomplete inputs score high against long
+    documents that contain them.
+    """
+    if not query or not document:
+        return 0.0
+    query_words = query.split()
+    query_trigrams = _trigrams(query_words)
+    if not query_trigrams:
+        return 0.0
+    document_words = document.split()
+    max_span = len(query_words) + 2
+    best = 0.0
+    for start in range(len(document_words)):
+        span: set[str] = set()
+        for end in range(start, min(start + max_span, len(document_words))):
+            span |= _word_trigrams(document_words[end])
+            shared = len(query_trigrams & span)
+            if shared:
+                score = shared / len(query_trigrams | span)
+                if score > best:
+                    best = score
+                    if best == 1.0:
+                        return best
+    return best
+
+
+def install_sqlite_functions(engine: Engine) -> None:
+    """Register the Python search helpers on every new SQLite connection."""
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_connection, _connection_record) -> None:  # noqa: ANN001
+        dbapi_connection.create_function("similarity", 2, similarity, deterministic=True)
+        dbapi_connection.create_function(
+            "word_similarity", 2, word_similarity, deterministic=True
+        )
+
+
+class LocationSearchEngine(ABC):
+    """Translate a free-text query into a SQL filter and a ranking expression."""
+
+    @abstractmethod
+    def condition(self, query: str) -> ColumnElement[bool]:
+        """Return the WHERE clause selecting locations that match the query."""
+
+    @abstractmethod
+    def rank(self, query: str) -> ColumnElement[float]:
+        """Return an expression where higher values mean better matches."""
+
+    @staticmethod
+    def _trigram_rank(normalized: str) -> ColumnElement[float]:
+        # word_similarity finds the query inside the document; similarity breaks ties
+        # in favour of documents that contain little else.
+        query = literal(normalized)
+        return func.word_similarity(query, LocationModel.search_text, type_=Float) + func.similarity(
+            query, LocationModel.search_text, type_=Float
+        )
+
+
+class PostgresLocationSearch(LocationSearchEngine):
+    """pg_trgm + full-text search over the indexed ``search_text`` document."""
+
+    _search_vector = literal_column("localidades.search_vector", type_=TSVECTOR)
+
+    def _ts_query(self, query: str) -> ColumnElement[object]:
+        return func.plainto_tsquery(literal_column("'simple'"), normalize_text(query))
+
+    def condition(self, query: str) -> ColumnElement[bool]:
+        normalized = normalize_text(query)
+        return or_(
+            LocationModel.search_text.contains(normalized, autoescape=True),
+            LocationModel.search_text.op("%>")(normalized),
+            self._search_vector.op("@@")(self._ts_query(query)),
+        )
+
+    def rank(self, query: str) -> ColumnElement[float]:
+        return self._trigram_rank(normalize_text(query)) + func.ts_rank(
+            self._search_vector, self._ts_query(query), type_=Float
+        )
+
+
+class PythonLocationSearch(LocationSearchEngine):
+    """Portable fallback: token containment plus Python trigram ranking."""
+
+    def condition(self, query: str) -> ColumnElement[bool]:
+        tokens = normalize_text(query).split()
+        return and_(
+            *(LocationModel.search_text.contains(token, autoescape=True) for token in tokens)
+        )
+
+    def rank(self, query: str) -> ColumnElement[float]:
+        return self._trigram_rank(normalize_text(query))
+
+
+def get_search_engine(dialect_name: str) -> LocationSearchEngine:
+    if dialect_name == "postgresql":
+        return PostgresLocationSearch()
+    return PythonLocationSearch()
@@ -0,0 +1,193 @@
+"""Maintenance of the ``location_search`` listing read model.
+
+Rows are rebuilt in the database with one ``INSERT ... SELECT`` that serializes the
+address, aliases and clients of each aggregate with the dialect's JSON functions, so a
+refresh costs two statements no matter how many locations a write touched.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, delete, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.location import Address, Alias, ClientLink
+from app.infrastructure.db.models import (
+    AddressModel,
+    LocationAliasModel,
+    LocationClientModel,
+    LocationModel,
+    LocationSearchModel,
+)
+
+_ADDRESS_FIELDS = (
+    "calle",
+    "colonia",
+    "ciudad_text",
+    "estado_text",
+    "cp",
+    "lat",
+    "lng",
+    "referencia",
+    "created_at",
+    "updated_at",
+)
+
+
+def _json_object(dialect: str, columns: dict[str, ColumnElement[Any]]) -> ColumnElement[Any]:
+    # Keys are inlined: untyped bind parameters in json_build_object trip asyncpg.
+    arguments = [
+        part for key, column in columns.items() for part in (literal_column(f"'{key}'"), column)
+    ]
+    if dialect == "postgresql":
+        return func.json_build_object(*arguments)
+    return func.json_object(*arguments)
+
+
+def _json_array(
+    dialect: str, element: ColumnElement[Any], *order_by: ColumnElement[Any]
+) -> ColumnElement[Any]:
+    if dialect == "postgresql":
+        return func.coalesce(
+            func.json_agg(aggregate_order_by(element, *order_by)), literal_column("'[]'::json")
+        )
+    # SQLite aggregates in the order rows arrive; the correlated subquery supplies it.
+    return func.json_group_array(element)
+
+
+def _rows(dialect: str, location_ids: Sequence[int] | None):  # noqa: ANN202 - Select
+    address = (
+        select(
+            _json_object(
+                dialect, {field: getattr(AddressModel, field) for field in _ADDRESS_FIELDS}
+            )
+        )
+        .where(AddressModel.localidad_id == LocationModel.id)
+        .scalar_subquery()
+    )
+    alias_rows = (
+        select(LocationAliasModel)
+        .where(LocationAliasModel.localidad_id == LocationModel.id)
+        .order_by(LocationAliasModel.id)
+        .correlate(LocationModel)
+        .subquery()
+    )
+    aliases = select(
+        _json_array(
+            dialect,
+            _json_object(
+                dialect,
+                {
+                    "id": alias_rows.c.id,
+                    "alias": alias_rows.c.alias,
+                    "created_at": alias_rows.c.created_at,
+                },
+            ),
+            alias_rows.c.id,
+        )
+    ).scalar_subquery()
+    client_order = (
+        LocationClientModel.cliente_source,
+        LocationClientModel.cliente_external_id,
+        LocationClientModel.rol,
+    )
+    client_rows = (
+        select(LocationClientModel)
+        .where(LocationClientModel.localidad_id == LocationModel.id)
+        .order_by(*client_order)
+        .correlate(LocationModel)
+        .subquery()
+    )
+    clients = select(
+        _json_array(
+            dialect,
+            _json_object(
+                dialect,
+                {
+                    "cliente_source": client_rows.c.cliente_source,
+                    "cliente_external_id": client_rows.c.cliente_external_id,
+                    "rol": client_rows.c.rol,
+                    "created_at": client_rows.c.created_at,
+                },
+            ),
+            client_rows.c.cliente_source,
+            client_rows.c.cliente_external_id,
+            client_rows.c.rol,
+        )
+    ).scalar_subquery()
+    stmt = select(LocationModel.id, LocationModel.version, address, aliases, clients)
+    if location_ids is not None:
+        stmt = stmt.where(LocationModel.id.in_(location_ids))
+    return stmt
+
+
+async def refresh_location_search(
+    session: AsyncSession, location_ids: Sequence[int] | None = None
+) -> None:
+    """Rebuild the rows of ``location_ids`` (every row when ``None``) in the open transaction.
+
+    Deleted locations simply lose their row, so the same call serves every kind of write.
+    """
+    dialect = session.bind.dialect.name
+    cleanup = delete(LocationSearchModel)
+    if location_ids is not None:
+        if not location_ids:
+            return
+        cleanup = cleanup.where(LocationSearchModel.localidad_id.in_(location_ids))
+    await session.execute(cleanup)
+    await session.execute(
+        insert(LocationSearchModel).from_select(
+            ["localidad_id", "version", "address", "aliases", "clients"],
+            _rows(dialect, location_ids),
+        )
+    )
+
+
+def _timestamp(value: str | datetime) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def address_from_json(localidad_id: int, data: dict[str, Any] | None) -> Address | None:
+    if data is None:
+        return None
+    return Address(
+        localidad_id=localidad_id,
+        calle=data["calle"],
+        colonia=data["colonia"],
+        ciudad_text=data["ciudad_text"],
+        estado_text=data["estado_text"],
+        cp=data["cp"],
+        lat=data["lat"],
+        lng=data["lng"],
+        referencia=data["referencia"],
+        created_at=_timestamp(data["created_at"]),
+        updated_at=_timestamp(data["updated_at"]),
+    )
+
+
+def aliases_from_json(localidad_id: int, data: list[dict[str, Any]]) -> list[Alias]:
+    return [
+        Alias(
+            id=item["id"],
+            localidad_id=localidad_id,
+            alias=item["alias"],
+            created_at=_timestamp(item["created_at"]),
+        )
+        for item in data
+    ]
+
+
+def clients_from_json(localidad_id: int, data: list[dict[str, Any]]) -> list[ClientLink]:
+    return [
+        ClientLink(
+            localidad_id=localidad_id,
+            cliente_source=item["cliente_source"],
+            cliente_external_id=item["cliente_external_id"],
+            rol=item["rol"],
+            created_at=_timestamp(item["created_at"]),
+        )
+        for item in data
+    ]
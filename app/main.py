@@ -3,8 +3,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.core.config import get_settings
+from app.entrypoints.api.diagnostics import router as diagnostics_router
 from app.entrypoints.api.locations import router as locations_router
+from app.entrypoints.api.metrics import RequestMetricsMiddleware
+from app.entrypoints.api.metrics import router as metrics_router
+from app.infrastructure.cache.location_cache import get_location_cache
 from app.infrastructure.db.session import init_db
+from app.infrastructure.geo.spatial_index import get_spatial_index
+from app.infrastructure.geocoding.service import get_geocoder
 
 
 settings = get_settings()
@@ -13,11 +19,24 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     await init_db()
+    location_cache = get_location_cache()
+    await location_cache.start()
+    spatial_index = get_spatial_index()
+    await spatial_index.start()
     yield
+    geocoder = get_geocoder()
+    if geocoder is not None:
+        await geocoder.close()
+    await spatial_index.close()
+    await location_cache.close()
 
 
 app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
 app.include_router(locations_router)
+app.include_router(diagnostics_router)
+if settings.metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware, server_timing=settings.server_timing_enabled)
+    app.include_router(metrics_router)
 
 
 @app.get("/health", tags=["health"])  # simple health check endpoint
@@ -0,0 +1,305 @@
+"""In-process load scenarios against the locations API, reported as JSON.
+
+Seeds a synthetic dataset (see :mod:`benchmarks.data`), then drives the FastAPI app
+through ``httpx.ASGITransport`` (no network, no server process) and reports, per
+scenario, throughput, p50/p99 latency and SQL statements per request. The output is
+meant to be stored and diffed across commits.
+
+The target database is wiped and re-seeded, so only point ``--database-url`` at a
+scratch database::
+
+    python -m benchmarks.api_load --locations 10000 --output results.json
+    python -m benchmarks.api_load --database-url postgresql+asyncpg://.../bench
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.config import get_settings
+from app.infrastructure.cache.location_cache import get_location_cache
+from app.infrastructure.db import session as db_session
+from app.infrastructure.db.session import build_engine
+from app.main import app
+from benchmarks.data import CLIENT_SOURCE, ESTADOS, DatasetSpec, seed
+
+
+@dataclass(slots=True)
+class Context:
+    client: httpx.AsyncClient
+    spec: DatasetSpec
+    rng: random.Random
+    sequence: int = 0
+
+    def location_number(self) -> int:
+        return self.rng.randrange(self.spec.locations)
+
+    def next_sequence(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+
+Operation = Callable[[Context], Awaitable[list[httpx.Response]]]
+
+
+async def get_by_id(ctx: Context) -> list[httpx.Response]:
+    return [await ctx.client.get(f"/locations/{ctx.location_number() + 1}")]
+
+
+async def filtered_list(ctx: Context) -> list[httpx.Response]:
+    params = {"estado": ctx.rng.choice(ESTADOS), "tipo": "Origen", "limit": 50}
+    return [await ctx.client.get("/locations", params=params)]
+
+
+async def client_list(ctx: Context) -> list[httpx.Response]:
+    external_id = ctx.rng.randrange(ctx.spec.clients)
+    return [
+        await ctx.client.get(
+            f"/locations/by-client/{CLIENT_SOURCE}/{external_id}", params={"limit": 50}
+        )
+    ]
+
+
+async def upsert(ctx: Context) -> list[httpx.Response]:
+    n = ctx.location_number()
+    payload = {
+        "nombre_oficial": f"Localidad {n:07d}",
+        "codigo": f"L{n:07d}",
+        "address": {
+            "calle": f"Calle {ctx.rng.randrange(500)}",
+            "estado_text": ESTADOS[n % len(ESTADOS)],
+            "lat": round(ctx.rng.uniform(14.5, 32.7), 6),
+            "lng": round(ctx.rng.uniform(-117.1, -86.7), 6),
+        },
+        "aliases": [
+            {"alias": f"Alias {n:07d}-{k}"} for k in range(ctx.spec.aliases_per_location - 1)
+        ]
+        + [{"alias": f"Upsert {ctx.next_sequence()}"}],
+        "clients": [
+            {
+                "cliente_source": CLIENT_SOURCE,
+                "cliente_external_id": str(client),
+                "rol": "Operador",
+            }
+            for client in ctx.rng.sample(range(ctx.spec.clients), ctx.spec.links_per_location)
+        ],
+    }
+    return [await ctx.client.post("/locations", json=payload)]
+
+
+async def churn(ctx: Context) -> list[httpx.Response]:
+    location_id = ctx.location_number() + 1
+    sequence = ctx.next_sequence()
+    link = {
+        "cliente_source": CLIENT_SOURCE,
+        "cliente_external_id": f"churn-{sequence}",
+        "rol": "Operador",
+    }
+    added = await ctx.client.post(
+        f"/locations/{location_id}/aliases", json={"alias": f"Churn {sequence}"}
+    )
+    responses = [added]
+    if added.status_code == 201:
+        responses.append(
+            await ctx.client.delete(f"/locations/{location_id}/aliases/{added.json()['id']}")
+        )
+    responses.append(await ctx.client.post(f"/locations/{location_id}/clients", json=link))
+    responses.append(
+        await ctx.client.request("DELETE", f"/locations/{location_id}/clients", json=link)
+    )
+    return responses
+
+
+SCENARIOS: dict[str, Operation] = {
+    "get_by_id": get_by_id,
+    "filtered_list": filtered_list,
+    "client_list": client_list,
+    "upsert": upsert,
+    "churn": churn,
+}
+
+
+@dataclass(slots=True)
+class QueryCounter:
+    count: int = 0
+
+    def __call__(self, *_: Any) -> None:
+        self.count += 1
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+async def run_scenario(
+    engine: AsyncEngine,
+    operation: Operation,
+    ctx: Context,
+    *,
+    operations: int,
+    concurrency: int,
+    warmup: int,
+) -> dict[str, Any]:
+    for _ in range(warmup):
+        await operation(ctx)
+
+    counter = QueryCounter()
+    latencies: list[float] = []
+    requests = errors = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def _one() -> None:
+        nonlocal requests, errors
+        async with slots:
+            started = time.perf_counter()
+            responses = await operation(ctx)
+            latencies.append((time.perf_counter() - started) * 1000)
+            requests += len(responses)
+            errors += sum(response.status_code >= 400 for response in responses)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(_one() for _ in range(operations)))
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+    ordered = sorted(latencies)
+    return {
+        "operations": operations,
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "throughput_ops": round(operations / elapsed, 2),
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "queries_per_request": round(counter.count / requests, 2) if requests else 0.0,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run(args: argparse.Namespace, url: str) -> dict[str, Any]:
+    settings = get_settings()
+    settings.location_cache_enabled = not args.no_location_cache
+    if settings.location_cache_backend == "none":
+        # One in-process app: the per-process cache is coherent here.
+        settings.location_cache_backend = "local"
+    get_location_cache.cache_clear()
+    spec = DatasetSpec(
+        locations=args.locations,
+        aliases_per_location=args.aliases,
+        links_per_location=args.links,
+        clients=args.clients,
+        seed=args.seed,
+    )
+    engine = build_engine(url, settings)
+    db_session.engine = engine
+    db_session.SessionFactory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        started = time.perf_counter()
+        await seed(engine, spec, read_model=settings.location_read_model_enabled)
+        seeded = time.perf_counter() - started
+        print(f"seeded {spec.locations} locations in {seeded:.1f}s ({url})", file=sys.stderr)
+
+        results: dict[str, Any] = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                await get_location_cache().clear()
+                ctx = Context(client=client, spec=spec, rng=random.Random(f"{args.seed}:{name}"))
+                results[name] = await run_scenario(
+                    engine,
+                    SCENARIOS[name],
+                    ctx,
+                    operations=args.operations,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                )
+                print(f"{name:<14} {json.dumps(results[name])}", file=sys.stderr)
+    finally:
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "dataset": spec.as_dict(),
+            "operations": args.operations,
+            "concurrency": args.concurrency,
+            "location_cache": settings.location_cache_enabled,
+            "read_model": settings.location_read_model_enabled,
+        },
+        "scenarios": results,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.database_url:
+        report = await run(args, args.database_url)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            report = await run(args, f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}")
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+def _scenarios(value: str) -> list[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = sorted(set(names) - SCENARIOS.keys())
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenarios: {', '.join(unknown)}")
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", default=None, help="scratch database (default: temporary SQLite)"
+    )
+    parser.add_argument("--locations", type=int, default=10_000)
+    parser.add_argument("--aliases", type=int, default=2, help="aliases per location")
+    parser.add_argument("--links", type=int, default=3, help="client links per location")
+    parser.add_argument("--clients", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--scenarios", type=_scenarios, default=list(SCENARIOS))
+    parser.add_argument("--operations", type=int, default=500, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--no-location-cache", action="store_true")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,196 @@
+"""Latency of upserting a location with many client links, before and after the set-based diff.
+
+"before" is the original ``upsert_location``: the whole aggregate is loaded and the
+aliases/client links are diffed as ORM objects, one object deleted or added per changed
+row. "after" is ``SQLAlchemyLocationRepository``, which replaces each collection with one
+``DELETE ... NOT IN`` and multi-row ``INSERT ... ON CONFLICT DO NOTHING``. Every round
+replaces ``--churn`` of the ``--links`` links of each aggregate.
+
+The target database is wiped and re-seeded, so only point ``--database-url`` at a
+scratch database::
+
+    python -m benchmarks.child_sync --links 1000 --churn 100
+    python -m benchmarks.child_sync --database-url postgresql+asyncpg://.../bench
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.config import get_settings
+from app.domain.models.location import Location, LocationType
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.models import LocationAliasModel, LocationClientModel, LocationModel
+from app.infrastructure.db.session import build_engine
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+from app.infrastructure.search.location_search import build_search_document
+
+
+class LegacyChildDiffRepository(SQLAlchemyLocationRepository):
+    """Repository with ``upsert_location`` as it was before the set-based child diff."""
+
+    async def upsert_location(
+        self,
+        *,
+        nombre_oficial: str,
+        codigo: str,
+        tipo: LocationType,
+        activo: bool,
+        es_global: bool,
+        address: dict | None,
+        aliases: Sequence[str],
+        clients: Sequence[dict],
+    ) -> Location:
+        location = await self._get_model_by_codigo(codigo)
+        if location is None:
+            location = LocationModel(
+                nombre_oficial=nombre_oficial,
+                codigo=codigo,
+                tipo=tipo,
+                activo=activo,
+                es_global=es_global,
+                address=None,
+                aliases=[],
+                clients=[],
+            )
+            self._session.add(location)
+        else:
+            location.nombre_oficial = nombre_oficial
+            location.tipo = tipo
+            location.activo = activo
+            location.es_global = es_global
+            location.version += 1
+
+        if address:
+            self._apply_address(location, address)
+        target_aliases = list(dict.fromkeys(alias for alias in aliases if alias))
+        for alias_model in list(location.aliases):
+            if alias_model.alias not in target_aliases:
+                location.aliases.remove(alias_model)
+        existing_aliases = {alias.alias for alias in location.aliases}
+        for alias in target_aliases:
+            if alias not in existing_aliases:
+                location.aliases.append(LocationAliasModel(alias=alias))
+        target = {self._client_key(item): item for item in clients}
+        existing_clients = set()
+        for client_model in list(location.clients):
+            key = (client_model.cliente_source, client_model.cliente_external_id, client_model.rol)
+            if key not in target:
+                location.clients.remove(client_model)
+            else:
+                existing_clients.add(key)
+        for key, item in target.items():
+            if key not in existing_clients:
+                location.clients.append(LocationClientModel(**item))
+        location.search_text = build_search_document(nombre_oficial, codigo, aliases)
+
+        await self._session.flush()
+        await self._commit(location.id)
+        self._index_location(location)
+        return self._to_domain(location)
+
+
+def payload(n: int, round_: int, *, links: int, churn: int, aliases: int) -> dict:
+    """Upsert arguments for location ``n``; each round swaps ``churn`` links for new ones."""
+    kept = range(round_ * churn, round_ * churn + links)
+    return {
+        "nombre_oficial": f"Localidad {n:05d}",
+        "codigo": f"L{n:05d}",
+        "tipo": LocationType.AMBOS,
+        "activo": True,
+        "es_global": False,
+        "address": {"calle": f"Calle {n}", "lat": 19.4, "lng": -99.1},
+        "aliases": [f"Alias {n}-{k}" for k in range(round_, round_ + aliases)],
+        "clients": [
+            {"cliente_source": "erp", "cliente_external_id": str(value), "rol": "Operador"}
+            for value in kept
+        ],
+    }
+
+
+async def measure(
+    engine: AsyncEngine,
+    repository_class: type[SQLAlchemyLocationRepository],
+    args: argparse.Namespace,
+) -> tuple[list[float], float]:
+    """Seed the aggregates, then time ``--rounds`` upserts of each; return timings and
+    statements per upsert."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    shape = {"links": args.links, "churn": args.churn, "aliases": args.aliases}
+    for n in range(args.locations):
+        async with sessions() as session:
+            await repository_class(session).upsert_location(**payload(n, 0, **shape))
+
+    statements = 0
+
+    def count(*_: object) -> None:
+        nonlocal statements
+        statements += 1
+
+    timings: list[float] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        for round_ in range(1, args.rounds + 1):
+            for n in range(args.locations):
+                async with sessions() as session:
+                    repository = repository_class(session)
+                    started = time.perf_counter()
+                    await repository.upsert_location(**payload(n, round_, **shape))
+                    timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return timings, statements / len(timings)
+
+
+def summary(label: str, timings: list[float], statements: float) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{label:<7} p50 {statistics.median(ordered):9.2f} ms   p95 {p95:9.2f} ms"
+        f"   {statements:.1f} statements/upsert"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.database_url:
+        await run(args, args.database_url)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        await run(args, f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}")
+
+
+async def run(args: argparse.Namespace, url: str) -> None:
+    engine = build_engine(url, get_settings())
+    try:
+        print(
+            f"{args.locations} aggregates x {args.links} client links, {args.churn} replaced "
+            f"per upsert ({url})"
+        )
+        print(summary("before", *await measure(engine, LegacyChildDiffRepository, args)))
+        print(summary("after", *await measure(engine, SQLAlchemyLocationRepository, args)))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", default=None, help="scratch database (default: temporary SQLite)"
+    )
+    parser.add_argument("--locations", type=int, default=5)
+    parser.add_argument("--links", type=int, default=1_000, help="client links per aggregate")
+    parser.add_argument("--churn", type=int, default=100, help="links replaced per upsert")
+    parser.add_argument("--aliases", type=int, default=20, help="aliases per aggregate")
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,176 @@
+"""Latency of GET /locations/by-client before and after the client listing indexes.
+
+"before" uses the original plan (outer join on ``localidad_clientes`` with
+``es_global OR <client match>``) without the new indexes; "after" uses the UNION plan of
+``SQLAlchemyLocationRepository`` with ``ix_localidad_clientes_cliente`` and
+``ix_localidades_global``. Both run the repository's list query plus its exact count.
+
+The target database is wiped and re-seeded, so only point ``--database-url`` at a
+scratch database::
+
+    python -m benchmarks.client_listing --links 1000000
+    python -m benchmarks.client_listing --database-url postgresql+asyncpg://.../bench
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Select, and_, insert, or_, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.config import get_settings
+from app.domain.repositories.location_repository import CountMode, LocationFilters, Pagination
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.models import LocationClientModel, LocationModel
+from app.infrastructure.db.session import build_engine
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+
+_CHUNK = 10_000
+_NEW_INDEXES = {
+    "ix_localidad_clientes_cliente": "localidad_clientes",
+    "ix_localidades_global": "localidades",
+}
+
+
+class LegacyClientFilterRepository(SQLAlchemyLocationRepository):
+    """Repository with the client filter as it was before the UNION rewrite."""
+
+    def _apply_filters(self, stmt: Select[Any], filters: LocationFilters) -> Select[Any]:
+        stmt = super()._apply_filters(
+            stmt, dataclasses.replace(filters, cliente_source=None, cliente_external_id=None)
+        )
+        stmt = stmt.join(LocationModel.clients, isouter=True)
+        return stmt.where(
+            or_(
+                LocationModel.es_global.is_(True),
+                and_(
+                    LocationClientModel.cliente_source == filters.cliente_source,
+                    LocationClientModel.cliente_external_id == filters.cliente_external_id,
+                ),
+            )
+        )
+
+
+async def seed(engine: AsyncEngine, *, locations: int, links: int, clients: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        for start in range(0, locations, _CHUNK):
+            await connection.execute(
+                insert(LocationModel.__table__),
+                [
+                    {
+                        "id": n + 1,
+                        "nombre_oficial": f"Localidad {n:07d}",
+                        "codigo": f"L{n:07d}",
+                        "es_global": n % 100 == 0,
+                        "search_text": f"localidad {n:07d}",
+                    }
+                    for n in range(start, min(start + _CHUNK, locations))
+                ],
+            )
+        for start in range(0, links, _CHUNK):
+            # For a given location the external id changes with every "round" of links,
+            # so (localidad_id, source, external_id, rol) stays unique.
+            await connection.execute(
+                insert(LocationClientModel.__table__),
+                [
+                    {
+                        "localidad_id": n % locations + 1,
+                        "cliente_source": "erp",
+                        "cliente_external_id": str((n // locations + n % locations) % clients),
+                        "rol": "Operador",
+                    }
+                    for n in range(start, min(start + _CHUNK, links))
+                ],
+            )
+    async with engine.begin() as connection:
+        await connection.execute(text("ANALYZE"))
+
+
+async def set_indexes(engine: AsyncEngine, enabled: bool) -> None:
+    async with engine.begin() as connection:
+        for name, table in _NEW_INDEXES.items():
+            await connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if enabled:
+            indexes = {
+                index.name: index
+                for table in (LocationModel.__table__, LocationClientModel.__table__)
+                for index in table.indexes
+            }
+            for name in _NEW_INDEXES:
+                await connection.run_sync(indexes[name].create)
+        await connection.execute(text("ANALYZE"))
+
+
+async def measure(
+    engine: AsyncEngine,
+    repository_class: type[SQLAlchemyLocationRepository],
+    client_ids: list[str],
+) -> list[float]:
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    timings: list[float] = []
+    for external_id in client_ids:
+        async with sessions() as session:
+            repository = repository_class(session)
+            started = time.perf_counter()
+            await repository.list_locations(
+                LocationFilters(cliente_source="erp", cliente_external_id=external_id),
+                Pagination(limit=50, count=CountMode.EXACT),
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summary(label: str, timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{label:<7} p50 {statistics.median(ordered):9.2f} ms   p95 {p95:9.2f} ms"
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.database_url:
+        await run(args, args.database_url)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        await run(args, f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}")
+
+
+async def run(args: argparse.Namespace, url: str) -> None:
+    engine = build_engine(url, get_settings())
+    try:
+        started = time.perf_counter()
+        await seed(engine, locations=args.locations, links=args.links, clients=args.clients)
+        print(f"seeded {args.links} client links in {time.perf_counter() - started:.1f}s ({url})")
+        sample = random.Random(7).sample(range(args.clients), args.samples)
+        client_ids = [str(value) for value in sample]
+
+        await set_indexes(engine, enabled=False)
+        await measure(engine, LegacyClientFilterRepository, client_ids[:2])
+        print(summary("before", await measure(engine, LegacyClientFilterRepository, client_ids)))
+
+        await set_indexes(engine, enabled=True)
+        await measure(engine, SQLAlchemyLocationRepository, client_ids[:2])
+        print(summary("after", await measure(engine, SQLAlchemyLocationRepository, client_ids)))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", default=None, help="scratch database (default: temporary SQLite)"
+    )
+    parser.add_argument("--links", type=int, default=1_000_000)
+    parser.add_argument("--locations", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--samples", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""Deterministic synthetic datasets: locations with addresses, aliases and client links."""
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.domain.models.location import LocationType
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.models import (
+    AddressModel,
+    LocationAliasModel,
+    LocationClientModel,
+    LocationModel,
+)
+from app.infrastructure.db.session import session_scope
+from app.infrastructure.geo.geohash import encode
+from app.infrastructure.search.location_search import build_search_document
+from app.infrastructure.search.read_model import refresh_location_search
+
+_CHUNK = 5_000
+_TYPES = tuple(LocationType)
+ESTADOS = ("Ciudad de México", "Jalisco", "Nuevo León", "Puebla", "Querétaro", "Veracruz")
+CLIENT_SOURCE = "erp"
+
+
+@dataclass(slots=True, frozen=True)
+class DatasetSpec:
+    locations: int = 10_000
+    aliases_per_location: int = 2
+    links_per_location: int = 3
+    clients: int = 1_000
+    # One location in ``global_every`` is visible to every client.
+    global_every: int = 100
+    seed: int = 7
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def location_rows(spec: DatasetSpec) -> Iterator[tuple[dict, dict, list[dict], list[dict]]]:
+    """Yield ``(location, address, aliases, links)`` rows; the same spec yields the same rows."""
+    rng = random.Random(spec.seed)
+    for n in range(spec.locations):
+        location_id = n + 1
+        estado = ESTADOS[n % len(ESTADOS)]
+        aliases = [f"Alias {n:07d}-{k}" for k in range(spec.aliases_per_location)]
+        lat = round(rng.uniform(14.5, 32.7), 6)
+        lng = round(rng.uniform(-117.1, -86.7), 6)
+        clients = rng.sample(range(spec.clients), min(spec.links_per_location, spec.clients))
+        nombre, codigo = f"Localidad {n:07d}", f"L{n:07d}"
+        yield (
+            {
+                "id": location_id,
+                "nombre_oficial": nombre,
+                "codigo": codigo,
+                "tipo": _TYPES[n % len(_TYPES)],
+                "es_global": n % spec.global_every == 0,
+                "search_text": build_search_document(nombre, codigo, aliases),
+            },
+            {
+                "localidad_id": location_id,
+                "calle": f"Calle {n % 500}",
+                "colonia": f"Colonia {n % 97}",
+                "ciudad_text": f"Ciudad {n % 53}",
+                "estado_text": estado,
+                "cp": f"{n % 100000:05d}",
+                "lat": lat,
+                "lng": lng,
+                "geohash": encode(lat, lng),
+            },
+            [{"localidad_id": location_id, "alias": alias} for alias in aliases],
+            [
+                {
+                    "localidad_id": location_id,
+                    "cliente_source": CLIENT_SOURCE,
+                    "cliente_external_id": str(client),
+                    "rol": "Operador",
+                }
+                for client in clients
+            ],
+        )
+
+
+async def seed(engine: AsyncEngine, spec: DatasetSpec, *, read_model: bool = False) -> None:
+    """Recreate the schema on ``engine`` and load the dataset described by ``spec``."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        batch: tuple[list[dict], ...] = ([], [], [], [])
+        for rows in location_rows(spec):
+            batch[0].append(rows[0])
+            batch[1].append(rows[1])
+            batch[2].extend(rows[2])
+            batch[3].extend(rows[3])
+            if len(batch[0]) >= _CHUNK:
+                await _insert(connection, batch)
+                batch = ([], [], [], [])
+        await _insert(connection, batch)
+        if engine.dialect.name == "postgresql":
+            # Rows were inserted with explicit ids; move the sequences past them.
+            for table in ("localidades", "localidad_alias"):
+                await connection.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                    )
+                )
+    if read_model:
+        async with session_scope() as session:
+            await refresh_location_search(session, None)
+            await session.commit()
+    async with engine.begin() as connection:
+        await connection.execute(text("ANALYZE"))
+
+
+async def _insert(connection, batch: tuple[list[dict], ...]) -> None:  # noqa: ANN001
+    for model, rows in zip(
+        (LocationModel, AddressModel, LocationAliasModel, LocationClientModel), batch
+    ):
+        if rows:
+            await connection.execute(insert(model.__table__), rows)
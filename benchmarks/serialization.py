@@ -0,0 +1,169 @@
+"""CPU cost of turning a page of location aggregates into a JSON response body.
+
+"before" is the original path: ``model_validate`` for every DTO in the mapper, then
+FastAPI's ``response_model`` handling (dump, validate again, ``jsonable_encoder``) and
+``JSONResponse``. "after" is ``to_location_read`` (one ``from_attributes`` validation
+per aggregate) plus ``PydanticJSONResponse``. No database is involved::
+
+    python -m benchmarks.serialization --items 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.application.dto.location import (
+    AddressRead,
+    AliasRead,
+    ClientRead,
+    LocationListResponse,
+    LocationRead,
+)
+from app.application.mappers.location_mapper import to_location_read
+from app.domain.models.location import Address, Alias, ClientLink, Location, LocationType
+from app.entrypoints.api.responses import PydanticJSONResponse
+
+
+def legacy_to_location_read(location: Location) -> LocationRead:
+    """The mapper as it was before validating from attributes."""
+    address = None
+    if location.address is not None:
+        address = AddressRead.model_validate(
+            {
+                "calle": location.address.calle,
+                "colonia": location.address.colonia,
+                "ciudad_text": location.address.ciudad_text,
+                "estado_text": location.address.estado_text,
+                "cp": location.address.cp,
+                "lat": location.address.lat,
+                "lng": location.address.lng,
+                "referencia": location.address.referencia,
+                "created_at": location.address.created_at,
+                "updated_at": location.address.updated_at,
+            }
+        )
+    aliases = [
+        AliasRead.model_validate(
+            {"id": alias.id, "alias": alias.alias, "created_at": alias.created_at}
+        )
+        for alias in location.aliases
+    ]
+    clients = [
+        ClientRead.model_validate(
+            {
+                "cliente_source": client.cliente_source,
+                "cliente_external_id": client.cliente_external_id,
+                "rol": client.rol,
+                "created_at": client.created_at,
+            }
+        )
+        for client in location.clients
+    ]
+    return LocationRead.model_validate(
+        {
+            "id": location.id,
+            "nombre_oficial": location.nombre_oficial,
+            "codigo": location.codigo,
+            "tipo": location.tipo,
+            "activo": location.activo,
+            "es_global": location.es_global,
+            "created_at": location.created_at,
+            "updated_at": location.updated_at,
+            "version": location.version,
+            "address": address,
+            "aliases": aliases,
+            "clients": clients,
+        }
+    )
+
+
+def build_locations(count: int) -> list[Location]:
+    now = datetime.now(timezone.utc)
+    return [
+        Location(
+            id=n,
+            nombre_oficial=f"Terminal {n:05d}",
+            codigo=f"T-{n:05d}",
+            tipo=LocationType.ORIGEN,
+            created_at=now,
+            updated_at=now,
+            version=3,
+            address=Address(
+                localidad_id=n,
+                calle="Av. Central 100",
+                colonia="Centro",
+                ciudad_text="Ciudad de México",
+                estado_text="CDMX",
+                cp="06000",
+                lat=19.4326,
+                lng=-99.1332,
+                referencia="Frente a la estación",
+                created_at=now,
+                updated_at=now,
+            ),
+            aliases=[
+                Alias(id=n * 10 + k, localidad_id=n, alias=f"Alias {k}", created_at=now)
+                for k in range(2)
+            ],
+            clients=[
+                ClientLink(
+                    localidad_id=n,
+                    cliente_source="erp",
+                    cliente_external_id=str(k),
+                    rol="Operador",
+                    created_at=now,
+                )
+                for k in range(2)
+            ],
+        )
+        for n in range(count)
+    ]
+
+
+async def before(locations: list[Location], field) -> bytes:  # noqa: ANN001
+    page = LocationListResponse(
+        items=[legacy_to_location_read(item) for item in locations], total=len(locations)
+    )
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def after(locations: list[Location], field) -> bytes:  # noqa: ANN001, ARG001
+    page = LocationListResponse(
+        items=[to_location_read(item) for item in locations], total=len(locations)
+    )
+    return PydanticJSONResponse(page).body
+
+
+async def main(args: argparse.Namespace) -> None:
+    locations = build_locations(args.items)
+    field = create_response_field(name="response", type_=LocationListResponse, mode="serialization")
+    results = {}
+    for label, path in (("before", before), ("after", after)):
+        await path(locations, field)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = await path(locations, field)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[label] = body
+        print(
+            f"{label:<7} {args.items} items: p50 {statistics.median(timings):7.2f} ms   "
+            f"min {min(timings):7.2f} ms   ({len(body)} bytes)"
+        )
+    assert json.loads(results["before"]) == json.loads(results["after"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
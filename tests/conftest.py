@@ -6,22 +6,28 @@ from pathlib import Path
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 # Configure the database URL before importing the application
 TEST_DB_PATH = Path("test.db")
 TEST_DB_URL = f"sqlite+aiosqlite:///{TEST_DB_PATH}"
 os.environ.setdefault("API_MAPBOX_DATABASE_URL", TEST_DB_URL)
+# Tests run in a single process, so the per-process cache sees every write.
+os.environ.setdefault("API_MAPBOX_LOCATION_CACHE_BACKEND", "local")
 
+from app.infrastructure.cache.location_cache import get_location_cache
 from app.infrastructure.db import session as db_session
 from app.infrastructure.db.base import Base
 from app.infrastructure.db.session import get_session
+from app.infrastructure.geo.spatial_index import get_spatial_index
 from app.main import app
 
+pytest_plugins = ("query_budget",)
+
 
 @pytest_asyncio.fixture(scope="session")
 async def test_engine():
-    engine = create_async_engine(TEST_DB_URL)
+    engine = db_session.build_engine(TEST_DB_URL, db_session.settings)
     db_session.engine = engine
     db_session.SessionFactory = async_sessionmaker(bind=engine, expire_on_commit=False)
     async with engine.begin() as conn:
@@ -37,6 +43,8 @@ async def clean_database(test_engine):
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    await get_location_cache().clear()
+    get_spatial_index().clear()
     yield
 
 
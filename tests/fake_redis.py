@@ -0,0 +1,95 @@
+"""Minimal Redis-protocol server for exercising the shared cache backend in tests."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+
+
+class FakeRedisServer:
+    def __init__(self) -> None:
+        self.data: dict[bytes, tuple[float | None, bytes]] = {}
+        self.subscribers: dict[bytes, set[asyncio.StreamWriter]] = defaultdict(set)
+        self.commands: list[bytes] = []
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        assert self._server is not None
+        self._server.close()
+        for writers in self.subscribers.values():
+            for writer in writers:
+                writer.close()
+        await self._server.wait_closed()
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> list[bytes] | None:
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    @staticmethod
+    def _bulk(value: bytes | None) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while (command := await self._read_command(reader)) is not None:
+                name, args = command[0].upper(), command[1:]
+                self.commands.append(name)
+                writer.write(self._execute(name, args, writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+
+    def _execute(self, name: bytes, args: list[bytes], writer: asyncio.StreamWriter) -> bytes:
+        if name == b"GET":
+            entry = self.data.get(args[0])
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                del self.data[args[0]]
+                entry = None
+            return self._bulk(entry[1] if entry else None)
+        if name == b"SET":
+            expires = None
+            if len(args) >= 4 and args[2].upper() == b"PX":
+                expires = time.monotonic() + int(args[3]) / 1000
+            self.data[args[0]] = (expires, args[1])
+            return b"+OK\r\n"
+        if name == b"INCR":
+            entry = self.data.get(args[0])
+            value = int(entry[1]) + 1 if entry else 1
+            self.data[args[0]] = (entry[0] if entry else None, str(value).encode())
+            return b":%d\r\n" % value
+        if name == b"DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if name == b"PUBLISH":
+            receivers = self.subscribers[args[0]]
+            for receiver in receivers:
+                receiver.write(
+                    b"*3\r\n" + self._bulk(b"message") + self._bulk(args[0]) + self._bulk(args[1])
+                )
+            return b":%d\r\n" % len(receivers)
+        if name == b"SUBSCRIBE":
+            self.subscribers[args[0]].add(writer)
+            return b"*3\r\n" + self._bulk(b"subscribe") + self._bulk(args[0]) + b":1\r\n"
+        if name in (b"PING", b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
@@ -0,0 +1,158 @@
+"""Query budgets: the SQL statements and rows a block of code costs.
+
+Loaded as a pytest plugin from ``conftest.py``. ``record_queries`` hooks an engine and
+counts the statements it sends and the rows fetched back; the ``assert_max_queries`` and
+``query_budget`` fixtures fail the test when a block goes over its allowance, and every
+``query_budget`` block is listed in the terminal summary with its cost and wall time.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_FETCHERS = ("fetchone", "fetchmany", "fetchall")
+
+
+class QueryRecorder:
+    """Collect the SQL statements sent through an engine and the rows fetched back."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.rows = 0
+        # Cursor classes whose fetch methods are wrapped, with the methods they defined.
+        self._patched: dict[type, dict[str, Callable | None]] = {}
+
+    def __call__(  # noqa: ANN001
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        self.statements.append(statement)
+        self._count_fetches(type(cursor))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def restore(self) -> None:
+        for cursor_type, originals in self._patched.items():
+            for name, original in originals.items():
+                if original is None:
+                    delattr(cursor_type, name)
+                else:
+                    setattr(cursor_type, name, original)
+        self._patched.clear()
+
+    def _count_fetches(self, cursor_type: type) -> None:
+        # DBAPI cursors (and the async adapters) use __slots__, so the wrappers go on
+        # the class; they are removed again by ``restore``.
+        if cursor_type in self._patched:
+            return
+        self._patched[cursor_type] = {name: cursor_type.__dict__.get(name) for name in _FETCHERS}
+        for name in _FETCHERS:
+            setattr(cursor_type, name, self._counting(getattr(cursor_type, name), name))
+
+    def _counting(self, fetch: Callable, name: str) -> Callable:
+        def counted(cursor, *args, **kwargs):  # noqa: ANN001, ANN202
+            result = fetch(cursor, *args, **kwargs)
+            if name == "fetchone":
+                self.rows += result is not None
+            else:
+                self.rows += len(result)
+            return result
+
+        return counted
+
+
+@contextmanager
+def record_queries(engine: AsyncEngine) -> Iterator[QueryRecorder]:
+    recorder = QueryRecorder()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        yield recorder
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", recorder)
+        recorder.restore()
+
+
+@dataclass(slots=True)
+class BudgetResult:
+    label: str
+    queries: int
+    max_queries: int
+    rows: int
+    max_rows: int | None
+    elapsed_ms: float
+
+
+_results = pytest.StashKey[list[BudgetResult]]()
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_results] = []
+
+
+@pytest.fixture()
+def assert_max_queries(test_engine):  # noqa: ANN201
+    """Fail when the wrapped block issues more than ``limit`` SQL statements."""
+
+    @contextmanager
+    def _assert_max_queries(limit: int) -> Iterator[QueryRecorder]:
+        with record_queries(test_engine) as counter:
+            yield counter
+        assert counter.count <= limit, (
+            f"Expected at most {limit} queries, got {counter.count}:\n"
+            + "\n".join(counter.statements)
+        )
+
+    return _assert_max_queries
+
+
+@pytest.fixture()
+def query_budget(test_engine, request: pytest.FixtureRequest):  # noqa: ANN201
+    """Fail when the wrapped block exceeds ``queries`` statements or ``rows`` fetched rows."""
+
+    @contextmanager
+    def _query_budget(
+        label: str, *, queries: int, rows: int | None = None
+    ) -> Iterator[QueryRecorder]:
+        started = time.perf_counter()
+        with record_queries(test_engine) as recorder:
+            yield recorder
+        request.config.stash[_results].append(
+            BudgetResult(
+                label=label,
+                queries=recorder.count,
+                max_queries=queries,
+                rows=recorder.rows,
+                max_rows=rows,
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+        )
+        assert recorder.count <= queries, (
+            f"{label}: expected at most {queries} queries, got {recorder.count}:\n"
+            + "\n".join(recorder.statements)
+        )
+        assert rows is None or recorder.rows <= rows, (
+            f"{label}: expected at most {rows} fetched rows, got {recorder.rows}"
+        )
+
+    return _query_budget
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:  # noqa: ANN001
+    results = config.stash.get(_results, [])
+    if not results:
+        return
+    terminalreporter.section("query budgets")
+    width = max(len(result.label) for result in results)
+    for result in results:
+        rows = f"{result.rows}/{result.max_rows}" if result.max_rows is not None else result.rows
+        terminalreporter.write_line(
+            f"{result.label:<{width}}  queries {result.queries}/{result.max_queries}"
+            f"  rows {rows}  {result.elapsed_ms:.2f} ms"
+        )
@@ -0,0 +1,36 @@
+"""Load a small ``benchmarks.data`` catalog into the test schema.
+
+The rows come from ``benchmarks.data.location_rows``, the generator the benchmarks use, so
+the budgets and the benchmarks measure the same data. Rows are inserted directly,
+bypassing the repository, so seeding does not count against the budgets of the code under
+test. Unlike ``benchmarks.data.seed``, the schema the fixtures created is kept.
+"""
+from __future__ import annotations
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.infrastructure.db.models import (
+    AddressModel,
+    LocationAliasModel,
+    LocationClientModel,
+    LocationModel,
+)
+from benchmarks.data import DatasetSpec, location_rows
+
+
+async def seed(engine: AsyncEngine, spec: DatasetSpec) -> None:
+    """Load the dataset described by ``spec`` into the (empty) test schema."""
+    tables: tuple[list[dict], ...] = ([], [], [], [])
+    for rows in location_rows(spec):
+        tables[0].append(rows[0])
+        tables[1].append(rows[1])
+        tables[2].extend(rows[2])
+        tables[3].extend(rows[3])
+    async with engine.begin() as connection:
+        for model, rows in zip(
+            (LocationModel, AddressModel, LocationAliasModel, LocationClientModel), tables
+        ):
+            if rows:
+                await connection.execute(insert(model.__table__), rows)
+        await connection.execute(text("ANALYZE"))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+
+async def _create(client, codigo: str) -> dict:
+    response = await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": f"Lote {codigo}",
+            "codigo": codigo,
+            "address": {"calle": "Juárez", "lat": 19.43, "lng": -99.14},
+            "aliases": [{"alias": f"Alias {codigo}"}],
+            "clients": [{"cliente_source": "erp", "cliente_external_id": "1", "rol": "Op"}],
+        },
+    )
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_batch_get_keeps_request_order_and_marks_missing(client, assert_max_queries):
+    first, second, third = [await _create(client, f"BG-{n}") for n in range(3)]
+    payload = {
+        "ids": [second["id"], 999_999, first["id"], second["id"]],
+        "codigos": ["BG-2", "NO-EXISTE"],
+        "use_cache": False,
+    }
+
+    # one IN query for ids and codigos + the address/alias/client selectins
+    with assert_max_queries(4):
+        response = await client.post("/locations/batch-get", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["found"], body["not_found"]) == (4, 2)
+    keys = [(item["index"], item["id"], item["codigo"], item["found"]) for item in body["items"]]
+    assert keys == [
+        (0, second["id"], None, True),
+        (1, 999_999, None, False),
+        (2, first["id"], None, True),
+        (3, second["id"], None, True),
+        (4, None, "BG-2", True),
+        (5, None, "NO-EXISTE", False),
+    ]
+    assert body["items"][0]["location"] == second
+    assert body["items"][1]["location"] is None
+    assert body["items"][4]["location"] == third
+
+
+@pytest.mark.asyncio
+async def test_batch_get_reads_through_the_location_cache(client, assert_max_queries):
+    created = await _create(client, "BG-C")
+    payload = {"ids": [created["id"]], "codigos": ["BG-C"]}
+
+    await client.post("/locations/batch-get", json=payload)
+    with assert_max_queries(0):
+        response = await client.post("/locations/batch-get", json=payload)
+    assert [item["location"] for item in response.json()["items"]] == [created, created]
+
+    with assert_max_queries(0):
+        detail = await client.get(f"/locations/{created['id']}")
+    assert detail.json() == created
+
+
+@pytest.mark.asyncio
+async def test_batch_get_requires_a_key(client):
+    response = await client.post("/locations/batch-get", json={"ids": [], "codigos": []})
+    assert response.status_code == 422
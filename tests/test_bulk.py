@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_creates_and_updates_aggregates(client):
+    await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Bulk Existente",
+            "codigo": "BLK-1",
+            "aliases": [{"alias": "Viejo"}, {"alias": "Se queda"}],
+            "clients": [{"cliente_source": "erp", "cliente_external_id": "1", "rol": "Operador"}],
+        },
+    )
+
+    response = await client.post(
+        "/locations/bulk",
+        json={
+            "items": [
+                {
+                    "nombre_oficial": "Bulk Existente Renombrada",
+                    "codigo": "BLK-1",
+                    "tipo": "Origen",
+                    "address": {"ciudad_text": "León", "lat": 21.12, "lng": -101.68},
+                    "aliases": [{"alias": "Se queda"}, {"alias": "Nuevo"}],
+                    "clients": [
+                        {"cliente_source": "erp", "cliente_external_id": "2", "rol": "Operador"}
+                    ],
+                },
+                {"nombre_oficial": "Bulk Nueva", "codigo": "BLK-2", "aliases": [{"alias": "N"}]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (1, 1, 0)
+    assert [item["status"] for item in body["items"]] == ["updated", "created"]
+
+    updated = (await client.get(f"/locations/{body['items'][0]['id']}")).json()
+    assert updated["nombre_oficial"] == "Bulk Existente Renombrada"
+    assert updated["tipo"] == "Origen"
+    assert updated["address"]["ciudad_text"] == "León"
+    assert sorted(alias["alias"] for alias in updated["aliases"]) == ["Nuevo", "Se queda"]
+    assert [client["cliente_external_id"] for client in updated["clients"]] == ["2"]
+
+    search = (await client.get("/locations", params={"q": "nuevo"})).json()
+    assert [item["codigo"] for item in search["items"]] == ["BLK-1"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_reports_per_item_errors(client):
+    await client.post("/locations", json={"nombre_oficial": "Nombre Tomado", "codigo": "TAKEN"})
+
+    response = await client.post(
+        "/locations/bulk",
+        json={
+            "items": [
+                {"nombre_oficial": "Primera", "codigo": "DUP"},
+                {"nombre_oficial": "Nombre Tomado", "codigo": "OTHER"},
+                {"nombre_oficial": "Segunda", "codigo": "DUP"},
+                {"nombre_oficial": "Valida", "codigo": "OK-1"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["status"] for item in items] == ["error", "error", "created", "created"]
+    assert items[0]["error"] == "Código duplicado en la solicitud"
+    assert items[1]["id"] is None
+
+    listing = (await client.get("/locations", params={"limit": 10})).json()
+    assert {item["nombre_oficial"] for item in listing["items"]} == {
+        "Nombre Tomado",
+        "Segunda",
+        "Valida",
+    }
+
+
+async def _names(client) -> dict[str, str]:
+    items = (await client.get("/locations", params={"limit": 50})).json()["items"]
+    return {item["codigo"]: item["nombre_oficial"] for item in items}
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_hands_names_over_within_a_batch(client):
+    for codigo, nombre in (("X", "N1"), ("Y", "N2"), ("Z", "N4")):
+        await client.post("/locations", json={"nombre_oficial": nombre, "codigo": codigo})
+
+    # X frees N1 for Y in the same batch.
+    renamed = await client.post(
+        "/locations/bulk",
+        json={
+            "items": [
+                {"nombre_oficial": "N1", "codigo": "Y"},
+                {"nombre_oficial": "N3", "codigo": "X"},
+            ]
+        },
+    )
+    assert renamed.json()["failed"] == 0
+    assert await _names(client) == {"X": "N3", "Y": "N1", "Z": "N4"}
+
+    swapped = await client.post(
+        "/locations/bulk",
+        json={
+            "items": [
+                {"nombre_oficial": "N3", "codigo": "Y"},
+                {"nombre_oficial": "N1", "codigo": "X"},
+            ]
+        },
+    )
+    assert swapped.json()["failed"] == 0
+    assert await _names(client) == {"X": "N1", "Y": "N3", "Z": "N4"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_keeps_names_of_rejected_renames(client):
+    for codigo, nombre in (("X", "N1"), ("Z", "N4")):
+        await client.post("/locations", json={"nombre_oficial": nombre, "codigo": codigo})
+
+    # X cannot take Z's name, so it keeps N1 and the item claiming N1 is rejected too.
+    response = await client.post(
+        "/locations/bulk",
+        json={
+            "items": [
+                {"nombre_oficial": "N4", "codigo": "X"},
+                {"nombre_oficial": "N1", "codigo": "W"},
+                {"nombre_oficial": "N5", "codigo": "V"},
+            ]
+        },
+    )
+    body = response.json()
+    assert [item["status"] for item in body["items"]] == ["error", "error", "created"]
+    assert await _names(client) == {"X": "N1", "Z": "N4", "V": "N5"}
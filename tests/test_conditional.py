@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+from app.infrastructure.cache.location_cache import get_location_cache
+
+PAYLOAD = {
+    "nombre_oficial": "Central Etag",
+    "codigo": "ETG-1",
+    "clients": [{"cliente_source": "erp", "cliente_external_id": "9", "rol": "Operador"}],
+}
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_answers_304_from_version_query(client, assert_max_queries):
+    location_id = (await client.post("/locations", json=PAYLOAD)).json()["id"]
+
+    first = await client.get(f"/locations/{location_id}")
+    etag = first.headers["ETag"]
+    assert first.json()["version"] == 1
+
+    with assert_max_queries(1):
+        revalidated = await client.get(f"/locations/{location_id}", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+
+    by_codigo = await client.get("/locations/by-codigo/ETG-1", headers={"If-None-Match": f"W/{etag}"})
+    assert by_codigo.status_code == 304
+
+    missing = await client.get("/locations/999999", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_child_changes_produce_new_etag(client):
+    location_id = (await client.post("/locations", json=PAYLOAD)).json()["id"]
+    etags = [(await client.get(f"/locations/{location_id}")).headers["ETag"]]
+
+    alias = await client.post(f"/locations/{location_id}/aliases", json={"alias": "Otra"})
+    etags.append((await client.get(f"/locations/{location_id}")).headers["ETag"])
+
+    await client.delete(f"/locations/{location_id}/aliases/{alias.json()['id']}")
+    etags.append((await client.get(f"/locations/{location_id}")).headers["ETag"])
+
+    await client.request(
+        "DELETE",
+        f"/locations/{location_id}/clients",
+        json={"cliente_source": "erp", "cliente_external_id": "9", "rol": "Operador"},
+    )
+    etags.append((await client.get(f"/locations/{location_id}")).headers["ETag"])
+
+    assert len(set(etags)) == 4
+    stale = await client.get(f"/locations/{location_id}", headers={"If-None-Match": etags[0]})
+    assert stale.status_code == 200
+    assert stale.json()["version"] == 4
+
+
+@pytest.mark.asyncio
+async def test_list_etag_changes_with_page_contents(client, assert_max_queries):
+    await client.post("/locations", json=PAYLOAD)
+
+    first = await client.get("/locations")
+    etag = first.headers["ETag"]
+    # The page's version stamps and its count; no columns or child collections.
+    with assert_max_queries(2):
+        unchanged = await client.get("/locations", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    await client.put(f"/locations/{first.json()['items'][0]['id']}", json={"activo": False})
+    changed = await client.get("/locations", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_stale_cache_entry_is_refreshed_on_revalidation(client):
+    location_id = (await client.post("/locations", json=PAYLOAD)).json()["id"]
+    first = await client.get(f"/locations/{location_id}")
+    cache = get_location_cache()
+    stale = await cache.get(location_id)
+
+    await client.put(f"/locations/{location_id}", json={"nombre_oficial": "Renombrada"})
+    # Simulate another worker's cache still holding the pre-write body.
+    await cache.set(location_id, PAYLOAD["codigo"], stale)
+
+    response = await client.get(
+        f"/locations/{location_id}", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["nombre_oficial"] == "Renombrada"
+    assert response.headers["ETag"] != first.headers["ETag"]
+    again = await client.get(
+        f"/locations/{location_id}", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert again.status_code == 304
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import pytest
+
+
+async def _seed(client) -> None:
+    await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Export Uno",
+            "codigo": "EXP-1",
+            "tipo": "Origen",
+            "address": {"ciudad_text": "Monterrey", "lat": 25.68, "lng": -100.31},
+            "aliases": [{"alias": "Uno A"}, {"alias": "Uno B"}],
+            "clients": [
+                {"cliente_source": "erp", "cliente_external_id": "7", "rol": "Operador"},
+            ],
+        },
+    )
+    await client.post(
+        "/locations",
+        json={"nombre_oficial": "Export Dos", "codigo": "EXP-2", "tipo": "Destino"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_flat_rows(client):
+    await _seed(client)
+
+    response = await client.get("/locations/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["codigo"] for row in rows] == ["EXP-1", "EXP-2"]
+    first = rows[0]
+    assert first["ciudad_text"] == "Monterrey"
+    assert sorted(first["aliases"]) == ["Uno A", "Uno B"]
+    assert first["clients"] == [
+        {"cliente_source": "erp", "cliente_external_id": "7", "rol": "Operador"}
+    ]
+    assert rows[1]["aliases"] == [] and rows[1]["lat"] is None
+
+
+@pytest.mark.asyncio
+async def test_export_csv_honors_filters(client):
+    await _seed(client)
+
+    response = await client.get("/locations/export", params={"format": "csv", "tipo": "Destino"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["codigo"] for row in rows] == ["EXP-2"]
+
+    by_client = await client.get(
+        "/locations/export",
+        params={"format": "csv", "cliente_source": "erp", "cliente_external_id": "7"},
+    )
+    rows = list(csv.DictReader(io.StringIO(by_client.text)))
+    assert [row["codigo"] for row in rows] == ["EXP-1"]
+    assert rows[0]["clients"] == "erp:7:Operador"
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.domain.models.geocoding import GeocodeResult
+from app.domain.repositories.geocoding import GeocodingProvider, GeocodingProviderError
+from app.entrypoints.api import locations as locations_api
+from app.infrastructure.db import session as db_session
+from app.infrastructure.geocoding.providers import MapboxGeocodingProvider, StubGeocodingProvider
+from app.infrastructure.geocoding.service import CachingGeocoder
+
+REFORMA = {"Avenida Reforma 222, Juárez, Ciudad de México": (19.4284, -99.1617)}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class FailingProvider(GeocodingProvider):
+    name = "stub"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        self.calls += 1
+        raise GeocodingProviderError("503")
+
+
+def _geocoder(provider: GeocodingProvider, clock: FakeClock | None = None) -> CachingGeocoder:
+    return CachingGeocoder(
+        provider,
+        ttl=3600,
+        negative_ttl=60,
+        sessions=db_session.session_scope,
+        **({"clock": clock} if clock else {}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_provider_call(test_engine):
+    provider = StubGeocodingProvider(REFORMA, latency=0.05)
+    geocoder = _geocoder(provider)
+
+    results = await asyncio.gather(
+        geocoder.geocode("Av. Reforma 222, Juárez, CDMX"),
+        geocoder.geocode("avenida reforma 222 juarez ciudad de mexico"),
+        *(geocoder.geocode("AV REFORMA 222, JUAREZ, CDMX") for _ in range(8)),
+    )
+
+    assert len(provider.calls) == 1
+    assert {(result.lat, result.lng) for result in results} == {(19.4284, -99.1617)}
+    assert geocoder.stats()["coalesced"] == 9
+
+    # A fresh worker finds the answer in geocoding_cache instead of calling the provider.
+    other = _geocoder(provider)
+    assert (await other.geocode("Av Reforma 222 Juarez CDMX")).external_id == results[0].external_id
+    assert len(provider.calls) == 1
+    assert other.stats()["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_negative_entries_expire_and_failures_are_not_cached(test_engine):
+    clock = FakeClock()
+    provider = StubGeocodingProvider()
+    geocoder = _geocoder(provider, clock)
+
+    assert await geocoder.geocode("Calle Inexistente 1") is None
+    assert await _geocoder(provider, clock).geocode("calle inexistente 1") is None
+    assert len(provider.calls) == 1
+
+    clock.now += timedelta(seconds=61)
+    assert await _geocoder(provider, clock).geocode("Calle Inexistente 1") is None
+    assert len(provider.calls) == 2
+
+    failing = FailingProvider()
+    for _ in range(2):
+        with pytest.raises(GeocodingProviderError):
+            await _geocoder(failing, clock).geocode("Otra Calle 5")
+    assert failing.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_address_saves_fill_missing_coordinates(client, monkeypatch):
+    provider = StubGeocodingProvider(REFORMA)
+    geocoder = _geocoder(provider)
+    monkeypatch.setattr(locations_api, "get_geocoder", lambda: geocoder)
+
+    created = await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Oficina Reforma",
+            "codigo": "GEO-1",
+            "address": {"calle": "Av. Reforma 222", "colonia": "Juárez", "ciudad_text": "CDMX"},
+        },
+    )
+    assert created.status_code == 201
+    assert created.json()["address"]["lat"] == pytest.approx(19.4284)
+    assert created.json()["address"]["lng"] == pytest.approx(-99.1617)
+
+    # Explicit coordinates win and unknown streets are saved without them.
+    location_id = created.json()["id"]
+    updated = await client.put(
+        f"/locations/{location_id}/address", json={"calle": "Sin Salida 9", "lat": None}
+    )
+    assert updated.status_code == 200
+    assert updated.json()["address"]["calle"] == "Sin Salida 9"
+    assert len(provider.calls) == 2
+
+    monkeypatch.setattr(locations_api, "get_geocoder", lambda: _geocoder(FailingProvider()))
+    failed = await client.post(
+        "/locations",
+        json={"nombre_oficial": "Otra", "codigo": "GEO-2", "address": {"calle": "Norte 1"}},
+    )
+    assert failed.status_code == 201
+    assert failed.json()["address"]["lat"] is None
+
+
+@pytest.mark.asyncio
+async def test_partial_address_updates_geocode_the_merged_address(client, monkeypatch):
+    provider = StubGeocodingProvider(REFORMA)
+    monkeypatch.setattr(locations_api, "get_geocoder", lambda: _geocoder(provider))
+    created = await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Mudanza",
+            "codigo": "GEO-3",
+            "address": {"calle": "Calle Vieja 1", "colonia": "Juárez", "ciudad_text": "CDMX"},
+        },
+    )
+    location_id = created.json()["id"]
+    assert created.json()["address"]["lat"] is None
+
+    # Only the street is sent; colonia and city come from the stored address.
+    moved = await client.put(f"/locations/{location_id}/address", json={"calle": "Av. Reforma 222"})
+    assert moved.json()["address"]["lat"] == pytest.approx(19.4284)
+    assert moved.json()["address"]["colonia"] == "Juárez"
+    calls = len(provider.calls)
+
+    await client.put(f"/locations/{location_id}/address", json={"referencia": "Portón azul"})
+    pinned = await client.put(
+        f"/locations/{location_id}/address",
+        json={"calle": "Calle Vieja 1", "lat": 19.5, "lng": -99.2},
+    )
+    assert len(provider.calls) == calls
+    assert (pinned.json()["address"]["lat"], pinned.json()["address"]["lng"]) == (19.5, -99.2)
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_failures_do_not_block_address_saves(client, monkeypatch):
+    @asynccontextmanager
+    async def broken_sessions():
+        raise OperationalError("SELECT", {}, Exception("database is locked"))
+        yield
+
+    provider = StubGeocodingProvider(REFORMA)
+    geocoder = CachingGeocoder(provider, ttl=3600, negative_ttl=60, sessions=broken_sessions)
+    monkeypatch.setattr(locations_api, "get_geocoder", lambda: geocoder)
+
+    created = await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Sin Caché",
+            "codigo": "GEO-4",
+            "address": {"calle": "Av. Reforma 222", "colonia": "Juárez", "ciudad_text": "CDMX"},
+        },
+    )
+    assert created.status_code == 201
+    assert created.json()["address"]["lat"] is None
+    updated = await client.put(
+        f"/locations/{created.json()['id']}/address", json={"calle": "Otra 1"}
+    )
+    assert updated.status_code == 200
+    assert geocoder.stats()["cache_errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_mapbox_provider_parses_features():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if "sin%20resultados" in request.url.raw_path.decode():
+            return httpx.Response(200, json={"features": []})
+        if "limite" in request.url.raw_path.decode():
+            return httpx.Response(429, json={"message": "Too Many Requests"})
+        return httpx.Response(
+            200,
+            json={
+                "features": [
+                    {"id": "address.42", "center": [-99.1617, 19.4284], "relevance": 0.97}
+                ]
+            },
+        )
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="https://geo.test"
+    )
+    provider = MapboxGeocodingProvider("token", country="mx", client=client)
+
+    result = await provider.geocode("avenida reforma 222")
+    assert (result.lat, result.lng, result.external_id) == (19.4284, -99.1617, "address.42")
+    assert requests[0].url.params["country"] == "mx"
+    assert requests[0].url.path.endswith("/mapbox.places/avenida reforma 222.json")
+    assert await provider.geocode("sin resultados") is None
+    with pytest.raises(GeocodingProviderError):
+        await provider.geocode("limite")
+    await provider.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html>upstream error</html>"),
+        httpx.Response(200, json={"features": [{"id": "address.1"}]}),
+        httpx.Response(200, json={"features": [{"center": [-99.1, 19.4]}]}),
+        httpx.Response(200, json={"features": [{"id": "a", "center": None}]}),
+        httpx.Response(200, json=["no", "es", "un", "objeto"]),
+    ],
+)
+async def test_malformed_mapbox_answers_do_not_block_address_saves(
+    client, monkeypatch, response
+):
+    transport = httpx.MockTransport(lambda request: response)
+    provider = MapboxGeocodingProvider(
+        "token", client=httpx.AsyncClient(transport=transport, base_url="https://geo.test")
+    )
+    with pytest.raises(GeocodingProviderError):
+        await provider.geocode("avenida reforma 222")
+
+    monkeypatch.setattr(locations_api, "get_geocoder", lambda: _geocoder(provider))
+    created = await client.post(
+        "/locations",
+        json={"nombre_oficial": "Mal", "codigo": "GEO-5", "address": {"calle": "Reforma 1"}},
+    )
+    assert created.status_code == 201
+    assert created.json()["address"]["lat"] is None
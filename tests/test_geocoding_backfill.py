@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.domain.models.geocoding import GeocodeResult
+from app.domain.repositories.geocoding import GeocodingProvider, GeocodingProviderError
+from app.infrastructure.cache.location_cache import get_location_cache
+from app.infrastructure.db import session as db_session
+from app.infrastructure.geocoding.backfill import GeocodingBackfill
+from app.infrastructure.geocoding.providers import (
+    RateLimitedGeocodingProvider,
+    StubGeocodingProvider,
+)
+from app.infrastructure.geocoding.service import CachingGeocoder
+from app.infrastructure.repositories.geocoding_backfill import (
+    SQLAlchemyBackfillCheckpointRepository,
+)
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+
+KNOWN = {
+    "Norte 1, Monterrey": (25.6866, -100.3161),
+    "Norte 2, Monterrey": (25.6900, -100.3200),
+    "Norte 4, Monterrey": (25.7000, -100.3300),
+    "Norte 5, Monterrey": (25.7100, -100.3400),
+}
+
+
+class FlakyProvider(StubGeocodingProvider):
+    def __init__(self, failing: str) -> None:
+        super().__init__(KNOWN)
+        self._failing = failing
+
+    async def geocode(self, query: str) -> GeocodeResult | None:
+        if self._failing in query:
+            self.calls.append(query)
+            raise GeocodingProviderError("503")
+        return await super().geocode(query)
+
+
+async def _seed(client) -> dict[str, int]:  # noqa: ANN001
+    items = [
+        {
+            "nombre_oficial": f"Bodega {n}",
+            "codigo": f"BF-{n}",
+            "address": {"calle": f"Norte {n}", "ciudad_text": "Monterrey"},
+        }
+        for n in range(1, 6)
+    ]
+    items.append(
+        {
+            "nombre_oficial": "Con coordenadas",
+            "codigo": "BF-GPS",
+            "address": {"calle": "Sur 1", "lat": 19.0, "lng": -99.0},
+        }
+    )
+    items.append({"nombre_oficial": "Sin calle", "codigo": "BF-CP", "address": {"cp": "64000"}})
+    response = await client.post("/locations/bulk", json={"items": items})
+    return {item["codigo"]: item["id"] for item in response.json()["items"]}
+
+
+def _backfill(provider: GeocodingProvider, **kwargs) -> GeocodingBackfill:  # noqa: ANN003
+    geocoder = CachingGeocoder(
+        provider, ttl=3600, negative_ttl=3600, sessions=db_session.session_scope
+    )
+    return GeocodingBackfill(
+        geocoder, sessions=db_session.session_scope, cache=get_location_cache(), **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_from_checkpoint(client):
+    ids = await _seed(client)
+    before = (await client.get(f"/locations/{ids['BF-1']}")).json()
+    provider = StubGeocodingProvider(KNOWN)
+
+    first = await _backfill(provider, chunk_size=2).run(max_chunks=1)
+    assert first.chunks == 1 and not first.completed
+    assert first.checkpoint.last_localidad_id == ids["BF-2"]
+
+    # A new process picks up after the stored checkpoint.
+    report = await _backfill(provider, chunk_size=2, concurrency=2).run()
+    assert report.completed
+    assert report.checkpoint.scanned == 5
+    assert report.checkpoint.geocoded == 4
+    assert report.checkpoint.not_found == 1
+    assert len(provider.calls) == 5
+
+    after = (await client.get(f"/locations/{ids['BF-1']}")).json()
+    assert (after["address"]["lat"], after["address"]["lng"]) == (25.6866, -100.3161)
+    assert after["version"] == before["version"] + 1
+    assert (await client.get(f"/locations/{ids['BF-3']}")).json()["address"]["lat"] is None
+    gps = (await client.get(f"/locations/{ids['BF-GPS']}")).json()["address"]
+    assert (gps["lat"], gps["lng"]) == (19.0, -99.0)
+
+    nearby = await client.get(
+        "/locations/nearby", params={"lat": 25.6866, "lng": -100.3161, "k": 1}
+    )
+    assert nearby.json()["items"][0]["location"]["id"] == ids["BF-1"]
+
+
+@pytest.mark.asyncio
+async def test_provider_failure_stops_before_failed_address(client):
+    ids = await _seed(client)
+
+    report = await _backfill(FlakyProvider("norte 3"), chunk_size=10).run()
+    assert report.interrupted and not report.completed
+    assert report.checkpoint.last_localidad_id == ids["BF-2"]
+    assert report.checkpoint.failed == 1
+    # Addresses answered in the same chunk are stored anyway.
+    assert (await client.get(f"/locations/{ids['BF-4']}")).json()["address"]["lat"] == 25.7
+
+    healthy = StubGeocodingProvider(KNOWN)
+    report = await _backfill(healthy).run()
+    assert report.completed
+    assert healthy.calls == ["norte 3 monterrey"]
+
+
+@pytest.mark.asyncio
+async def test_only_filled_addresses_get_a_new_version(client):
+    ids = await _seed(client)
+    before = {codigo: (await client.get(f"/locations/{ids[codigo]}")).json() for codigo in ids}
+
+    async with db_session.session_scope() as session:
+        repository = SQLAlchemyLocationRepository(session, cache=get_location_cache())
+        filled = await repository.set_address_coordinates(
+            {ids["BF-1"]: (25.6866, -100.3161), ids["BF-GPS"]: (20.0, -100.0)}
+        )
+    assert filled == 1
+
+    gps = (await client.get(f"/locations/{ids['BF-GPS']}")).json()
+    # The stale-address guard skipped it, so its representation (and ETag) is unchanged.
+    assert gps == before["BF-GPS"]
+    bf1 = (await client.get(f"/locations/{ids['BF-1']}")).json()
+    assert bf1["version"] == before["BF-1"]["version"] + 1
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_commits_with_the_coordinates(client, monkeypatch):
+    ids = await _seed(client)
+
+    async def _crash(self, checkpoint):  # noqa: ANN001
+        raise RuntimeError("crash before commit")
+
+    monkeypatch.setattr(SQLAlchemyBackfillCheckpointRepository, "stage", _crash)
+    with pytest.raises(RuntimeError):
+        await _backfill(StubGeocodingProvider(KNOWN), chunk_size=2).run()
+    # Neither the coordinates nor the progress were committed.
+    assert (await client.get(f"/locations/{ids['BF-1']}")).json()["address"]["lat"] is None
+
+    monkeypatch.undo()
+    report = await _backfill(StubGeocodingProvider(KNOWN)).run()
+    assert report.checkpoint.scanned == 5
+    assert report.checkpoint.geocoded == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_provider_spaces_calls():
+    provider = RateLimitedGeocodingProvider(StubGeocodingProvider(), 50.0)
+    started = time.perf_counter()
+    await asyncio.gather(*(provider.geocode(f"calle {n}") for n in range(6)))
+    # The first call uses the initial token; the other five wait 20ms each.
+    assert time.perf_counter() - started >= 0.09
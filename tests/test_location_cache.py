@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from app.application.dto.location import BatchGetRequest
+from app.application.mappers.location_mapper import pack_cached_location, unpack_cached_location
+from app.application.use_cases.batch_get_locations import BatchGetLocations
+from app.application.use_cases.get_location import GetLocation
+from app.infrastructure.cache.location_cache import get_location_cache
+from app.infrastructure.db import session as db_session
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+
+
+async def _stats(client) -> dict[str, int]:
+    return (await client.get("/diagnostics/cache")).json()
+
+
+@pytest.mark.asyncio
+async def test_get_location_reads_through_cache(client, assert_max_queries):
+    created = await client.post(
+        "/locations", json={"nombre_oficial": "Cacheada", "codigo": "CCH-1"}
+    )
+    location_id = created.json()["id"]
+    hits_before = (await _stats(client))["hits"]
+
+    first = await client.get(f"/locations/{location_id}")
+    with assert_max_queries(0):
+        second = await client.get(f"/locations/{location_id}")
+        by_codigo = await client.get("/locations/by-codigo/CCH-1")
+    assert first.json() == second.json() == by_codigo.json()
+
+    stats = await _stats(client)
+    assert stats["hits"] - hits_before == 2
+    assert stats["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_serves_stored_body_unparsed(client):
+    created = await client.post("/locations", json={"nombre_oficial": "Bytes", "codigo": "BYT-1"})
+    location_id = created.json()["id"]
+    first = await client.get(f"/locations/{location_id}")
+
+    cache = get_location_cache()
+    entry = unpack_cached_location(await cache.get(location_id))
+    assert entry.body == first.content
+    # A hit returns whatever body was stored; it is not re-validated or re-encoded.
+    marker = entry.body.replace(b'"Bytes"', b'"Bytes (cached)"')
+    await cache.set(location_id, "BYT-1", pack_cached_location(replace(entry, body=marker)))
+
+    second = await client.get(f"/locations/{location_id}")
+    assert second.content == marker
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_mutations_invalidate_cached_location(client):
+    created = await client.post(
+        "/locations", json={"nombre_oficial": "Invalida", "codigo": "INV-1"}
+    )
+    location_id = created.json()["id"]
+    await client.get(f"/locations/{location_id}")
+
+    alias = await client.post(f"/locations/{location_id}/aliases", json={"alias": "Nuevo"})
+    aliases = (await client.get(f"/locations/{location_id}")).json()["aliases"]
+    assert [item["alias"] for item in aliases] == ["Nuevo"]
+
+    await client.delete(f"/locations/{location_id}/aliases/{alias.json()['id']}")
+    assert (await client.get(f"/locations/{location_id}")).json()["aliases"] == []
+
+    client_ref = {"cliente_source": "erp", "cliente_external_id": "5", "rol": "Operador"}
+    await client.post(f"/locations/{location_id}/clients", json=client_ref)
+    assert len((await client.get(f"/locations/{location_id}")).json()["clients"]) == 1
+
+    await client.request("DELETE", f"/locations/{location_id}/clients", json=client_ref)
+    assert (await client.get(f"/locations/{location_id}")).json()["clients"] == []
+
+    await client.put(f"/locations/{location_id}/address", json={"ciudad_text": "Toluca"})
+    detail = (await client.get(f"/locations/{location_id}")).json()
+    assert detail["address"]["ciudad_text"] == "Toluca"
+
+    await client.put(f"/locations/{location_id}", json={"codigo": "INV-2"})
+    assert (await client.get("/locations/by-codigo/INV-1")).status_code == 404
+    assert (await client.get("/locations/by-codigo/INV-2")).json()["id"] == location_id
+
+    await client.delete(f"/locations/{location_id}")
+    assert (await client.get(f"/locations/{location_id}")).status_code == 404
+    assert (await _stats(client))["invalidations"] >= 7
+
+
+class _OvertakenRepository(SQLAlchemyLocationRepository):
+    """Reads that a concurrent commit invalidates before the caller can cache them."""
+
+    async def get_location(self, location_id):
+        location = await super().get_location(location_id)
+        await get_location_cache().invalidate(location_id)
+        return location
+
+    async def get_locations(self, *, ids=(), codigos=()):
+        locations = await super().get_locations(ids=ids, codigos=codigos)
+        for location in locations:
+            await get_location_cache().invalidate(location.id)
+        return locations
+
+
+@pytest.mark.asyncio
+async def test_reads_overtaken_by_an_invalidation_are_not_cached(client):
+    created = await client.post("/locations", json={"nombre_oficial": "Carrera", "codigo": "RC-1"})
+    location_id = created.json()["id"]
+    cache = get_location_cache()
+
+    async with db_session.SessionFactory() as session:
+        repository = _OvertakenRepository(session)
+        await GetLocation(repository, cache=cache).execute(location_id)
+        assert await cache.get(location_id) is None
+        await BatchGetLocations(repository, cache=cache).execute(
+            BatchGetRequest(ids=[location_id], codigos=["RC-1"])
+        )
+        assert await cache.get(location_id) is None
+        assert await cache.get_by_codigo("RC-1") is None
+
+    stats = await _stats(client)
+    assert stats["stale_writes"] + stats.get("shared_stale_writes", 0) == 2
+    # A read that no invalidation overtakes is cached as before.
+    await client.get(f"/locations/{location_id}")
+    assert await cache.get(location_id) is not None
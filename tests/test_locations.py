@@ -137,6 +137,34 @@ async def test_get_location_detail(client):
     assert body["address"]["ciudad_text"] == "Puebla"
 
 
+@pytest.mark.asyncio
+async def test_read_endpoints_serialize_same_body_as_writes(client):
+    created = await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Estación Querétaro",
+            "codigo": "LOC-202",
+            "address": {"calle": "Av. Zaragoza", "lat": 20.59, "lng": -100.39},
+            "aliases": [{"alias": "Querétaro Centro"}],
+            "clients": [{"cliente_source": "erp", "cliente_external_id": "9", "rol": "Operador"}],
+        },
+    )
+    expected = created.json()
+
+    detail = await client.get(f"/locations/{expected['id']}")
+    by_codigo = await client.get("/locations/by-codigo/LOC-202")
+    listing = await client.get("/locations")
+
+    for response in (detail, by_codigo, listing):
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"]
+    assert detail.json() == expected
+    assert by_codigo.json() == expected
+    assert listing.json()["items"] == [expected]
+    assert "Querétaro".encode() in detail.content
+
+
 @pytest.mark.asyncio
 async def test_create_location_without_tipo_defaults_to_ambos(client):
     payload = {
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from app.core.metrics import get_request_metrics_registry
+
+
+@pytest.mark.asyncio
+async def test_requests_report_server_timing_and_prometheus_histograms(client):
+    registry = get_request_metrics_registry()
+    registry.clear()
+    created = await client.post(
+        "/locations", json={"nombre_oficial": "Métrica", "codigo": "MET-1", "aliases": []}
+    )
+    location_id = created.json()["id"]
+
+    listing = await client.get("/locations")
+    timing = listing.headers["server-timing"]
+    queries = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+    assert queries >= 2  # page + count
+    assert re.search(r"serialize;dur=[\d.]+", timing)
+    assert re.search(r"total;dur=[\d.]+", timing)
+    await client.get(f"/locations/{location_id}")
+    await client.get("/no-existe")
+
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="POST",route="/locations",status="201"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/locations"} 1' in body
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",route="/locations/{location_id}",'
+        'le="+Inf"} 1' in body
+    )
+    assert f'http_request_db_queries_sum{{method="GET",route="/locations"}} {queries}' in body
+    assert (
+        'http_request_serialization_duration_seconds_count{method="GET",route="/locations"} 1'
+        in body
+    )
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
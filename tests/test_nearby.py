@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.infrastructure.geo.geohash import haversine_m
+
+# Around Zócalo, CDMX: ~0.9 km, ~2.6 km and ~11 km away from the origin.
+ORIGIN = {"lat": 19.4326, "lng": -99.1332}
+POINTS = [
+    ("NEAR-1", "Bellas Artes", 19.4352, -99.1412, "Origen"),
+    ("NEAR-2", "Tlatelolco", 19.4510, -99.1370, "Destino"),
+    ("NEAR-3", "Coyoacan", 19.3500, -99.1620, "Origen"),
+]
+
+
+async def _seed(client) -> None:
+    for codigo, nombre, lat, lng, tipo in POINTS:
+        await client.post(
+            "/locations",
+            json={
+                "nombre_oficial": nombre,
+                "codigo": codigo,
+                "tipo": tipo,
+                "address": {"lat": lat, "lng": lng, "ciudad_text": "CDMX"},
+            },
+        )
+    await client.post("/locations", json={"nombre_oficial": "Sin coordenadas", "codigo": "NEAR-0"})
+
+
+@pytest.mark.asyncio
+async def test_nearby_returns_closest_first_with_distances(client):
+    await _seed(client)
+
+    response = await client.get("/locations/nearby", params={**ORIGIN, "radius_m": 5_000})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["location"]["codigo"] for item in items] == ["NEAR-1", "NEAR-2"]
+    assert 800 < items[0]["distance_m"] < 1_000
+    assert items[0]["distance_m"] < items[1]["distance_m"]
+
+    nearest = await client.get("/locations/nearby", params={**ORIGIN, "radius_m": 20_000, "k": 1})
+    assert [item["location"]["codigo"] for item in nearest.json()["items"]] == ["NEAR-1"]
+
+    filtered = await client.get(
+        "/locations/nearby", params={**ORIGIN, "radius_m": 20_000, "tipo": "Origen"}
+    )
+    assert [item["location"]["codigo"] for item in filtered.json()["items"]] == ["NEAR-1", "NEAR-3"]
+
+
+@pytest.mark.asyncio
+async def test_nearby_follows_address_updates(client):
+    await _seed(client)
+    location_id = (await client.get("/locations/by-codigo/NEAR-3")).json()["id"]
+
+    await client.put(f"/locations/{location_id}/address", json={"lat": 19.4330, "lng": -99.1335})
+    items = (await client.get("/locations/nearby", params={**ORIGIN, "radius_m": 500})).json()["items"]
+    assert [item["location"]["codigo"] for item in items] == ["NEAR-3"]
+
+
+@pytest.mark.asyncio
+async def test_bounding_box_query(client):
+    await _seed(client)
+
+    response = await client.get(
+        "/locations/bbox",
+        params={"min_lat": 19.43, "min_lng": -99.15, "max_lat": 19.46, "max_lng": -99.13},
+    )
+    codes = {item["location"]["codigo"] for item in response.json()["items"]}
+    assert codes == {"NEAR-1", "NEAR-2"}
+    assert response.json()["truncated"] is False
+
+    inverted = await client.get(
+        "/locations/bbox",
+        params={"min_lat": 19.46, "min_lng": -99.15, "max_lat": 19.43, "max_lng": -99.13},
+    )
+    assert inverted.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_wide_bounding_box_fetches_only_the_closest_rows(client, query_budget):
+    rng = random.Random(11)
+    points = {
+        f"WIDE-{n}": (rng.uniform(15.0, 30.0), rng.uniform(-115.0, -87.0)) for n in range(300)
+    }
+    items = [
+        {"nombre_oficial": codigo, "codigo": codigo, "address": {"lat": lat, "lng": lng}}
+        for codigo, (lat, lng) in points.items()
+    ]
+    assert (await client.post("/locations/bulk", json={"items": items})).json()["failed"] == 0
+
+    box = {"min_lat": 14.0, "min_lng": -118.0, "max_lat": 33.0, "max_lng": -86.0, "limit": 5}
+    # (5 + 1) * 2 + 16 ranked candidates (one past the limit flags truncation), then the
+    # 5 aggregates (location + address rows).
+    with query_budget("bbox[wide]", queries=5, rows=28 + 5 * 2):
+        response = await client.get("/locations/bbox", params=box)
+
+    center = (23.5, -102.0)
+    expected = sorted(points, key=lambda codigo: haversine_m(*center, *points[codigo]))[:5]
+    assert [item["location"]["codigo"] for item in response.json()["items"]] == expected
+    assert response.json()["truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_bulk_upserted_addresses_are_searchable(client):
+    await client.post(
+        "/locations/bulk",
+        json={
+            "items": [
+                {
+                    "nombre_oficial": "Bulk Cerca",
+                    "codigo": "NEAR-B",
+                    "address": {"lat": 19.4340, "lng": -99.1340},
+                }
+            ]
+        },
+    )
+    items = (await client.get("/locations/nearby", params={**ORIGIN, "radius_m": 500})).json()["items"]
+    assert [item["location"]["codigo"] for item in items] == ["NEAR-B"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+
+from app.infrastructure.geo.spatial_index import get_spatial_index
+
+LOCATIONS = [
+    ("BAT-CDMX", 19.4326, -99.1332, "Origen", True),
+    ("BAT-GDL", 20.6597, -103.3496, "Destino", True),
+    ("BAT-MTY", 25.6866, -100.3161, "Ambos", False),
+]
+
+
+async def _seed(client) -> None:
+    for codigo, lat, lng, tipo, activo in LOCATIONS:
+        await client.post(
+            "/locations",
+            json={
+                "nombre_oficial": codigo,
+                "codigo": codigo,
+                "tipo": tipo,
+                "activo": activo,
+                "address": {"lat": lat, "lng": lng},
+            },
+        )
+
+
+async def _resolve(client, payload) -> list[str | None]:
+    response = await client.post("/locations/nearest/batch", json=payload)
+    assert response.status_code == 200
+    ids = {
+        (await client.get(f"/locations/by-codigo/{codigo}")).json()["id"]: codigo
+        for codigo, *_ in LOCATIONS
+    }
+    return [ids.get(item["location_id"]) for item in response.json()["items"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_resolves_each_point_with_its_own_filters(client):
+    await _seed(client)
+    await get_spatial_index().reload()
+
+    payload = {
+        "points": [
+            {"lat": 19.44, "lng": -99.14},
+            {"lat": 19.44, "lng": -99.14, "tipo": "Destino"},
+            {"lat": 19.44, "lng": -99.14, "radius_m": 100},
+            {"lat": 25.70, "lng": -100.30},
+        ]
+    }
+    assert await _resolve(client, payload) == ["BAT-CDMX", "BAT-GDL", None, "BAT-MTY"]
+    assert await _resolve(client, {**payload, "activo": True}) == [
+        "BAT-CDMX",
+        "BAT-GDL",
+        None,
+        "BAT-GDL",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_without_index_queries_each_point(client, assert_max_queries):
+    await _seed(client)
+    payload = {
+        "points": [
+            {"lat": 19.44, "lng": -99.14},
+            {"lat": 19.44, "lng": -99.14, "tipo": "Destino"},
+            {"lat": 19.44, "lng": -99.14, "radius_m": 100},
+            {"lat": 25.70, "lng": -100.30},
+        ],
+        "activo": True,
+    }
+    # One query per ring tried: 1 + 3 + 1 + 3; GDL is ~640 km from the last point,
+    # beyond the 500 km the fallback searches.
+    with assert_max_queries(8):
+        response = await client.post("/locations/nearest/batch", json=payload)
+    assert response.status_code == 200
+    assert await _resolve(client, payload) == ["BAT-CDMX", "BAT-GDL", None, None]
+
+    many = {"points": [{"lat": 19.44, "lng": -99.14}] * 501}
+    with assert_max_queries(0):
+        refused = await client.post("/locations/nearest/batch", json=many)
+    assert refused.status_code == 503
+
+    await get_spatial_index().reload()
+    assert (await client.post("/locations/nearest/batch", json=many)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_batch_handles_thousands_of_points(client):
+    await _seed(client)
+    await get_spatial_index().reload()
+    points = [{"lat": 19.0 + index * 1e-4, "lng": -99.0} for index in range(10_000)]
+
+    response = await client.post("/locations/nearest/batch", json={"points": points})
+    body = response.json()
+    assert body["matched"] == 10_000
+    assert body["items"][0]["distance_m"] > 0
+
+    too_many = await client.post("/locations/nearest/batch", json={"points": points + points[:1]})
+    assert too_many.status_code == 422
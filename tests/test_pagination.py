@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+
+async def _seed(client, count: int, prefix: str = "Central") -> None:
+    for index in range(count):
+        await client.post(
+            "/locations",
+            json={"nombre_oficial": f"{prefix} {index:02d}", "codigo": f"{prefix[:3]}-{index:02d}"},
+        )
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_walks_full_catalog(client):
+    await _seed(client, 7)
+
+    seen: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/locations", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(item["nombre_oficial"] for item in data["items"])
+        pages += 1
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [f"Central {index:02d}" for index in range(7)]
+
+    first_page = (await client.get("/locations", params={"limit": 3})).json()
+    by_offset = await client.get("/locations", params={"limit": 3, "offset": 3})
+    by_cursor = await client.get(
+        "/locations", params={"limit": 3, "cursor": first_page["next_cursor"]}
+    )
+    assert by_offset.json()["items"] == by_cursor.json()["items"]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_keeps_search_ranking(client):
+    await _seed(client, 4, prefix="Bodega")
+    await client.post("/locations", json={"nombre_oficial": "Bodega", "codigo": "BOD-X"})
+
+    first = (await client.get("/locations", params={"q": "bodega", "limit": 2})).json()
+    assert first["items"][0]["codigo"] == "BOD-X"
+    second = (
+        await client.get("/locations", params={"q": "bodega", "limit": 10, "cursor": first["next_cursor"]})
+    ).json()
+    codes = [item["codigo"] for item in first["items"] + second["items"]]
+    assert len(codes) == len(set(codes)) == 5
+    assert second["next_cursor"] is None
+
+    mismatched = await client.get("/locations", params={"cursor": first["next_cursor"]})
+    assert mismatched.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(client):
+    response = await client.get("/locations/by-client/erp/1", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_count_modes(client):
+    await _seed(client, 3, prefix="Conteo")
+
+    exact = (await client.get("/locations", params={"q": "conteo", "limit": 1})).json()
+    assert exact["total"] == 3
+    assert exact["total_estimated"] is False
+
+    skipped = (await client.get("/locations", params={"q": "conteo", "limit": 1, "count": "none"})).json()
+    assert skipped["total"] is None
+    assert len(skipped["items"]) == 1
+    assert skipped["next_cursor"] is not None
+
+    estimated = (
+        await client.get("/locations", params={"q": "conteo", "limit": 1, "count": "estimated"})
+    ).json()
+    assert estimated["total"] == 3
+    assert estimated["total_estimated"] is True
+
+    invalid = await client.get("/locations", params={"count": "sometimes"})
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_client_listing_pages_are_not_shortened_by_multiple_roles(client, test_engine):
+    roles = [
+        {"cliente_source": "erp", "cliente_external_id": "7", "rol": rol}
+        for rol in ("Operador", "Facturación", "Almacén")
+    ]
+    for index in range(3):
+        await client.post(
+            "/locations",
+            json={"nombre_oficial": f"Roles {index}", "codigo": f"ROL-{index}", "clients": roles},
+        )
+    await client.post(
+        "/locations", json={"nombre_oficial": "Roles Global", "codigo": "ROL-G", "es_global": True}
+    )
+
+    page = (await client.get("/locations/by-client/erp/7", params={"limit": 2})).json()
+    assert [item["codigo"] for item in page["items"]] == ["ROL-0", "ROL-1"]
+    assert page["total"] == 4
+    rest = (
+        await client.get("/locations/by-client/erp/7", params={"cursor": page["next_cursor"]})
+    ).json()
+    assert [item["codigo"] for item in rest["items"]] == ["ROL-2", "ROL-G"]
+
+    async with test_engine.connect() as connection:
+        plan = await connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT localidad_id FROM localidad_clientes "
+            "WHERE cliente_source = 'erp' AND cliente_external_id = '7'"
+        )
+        assert "ix_localidad_clientes_cliente" in " ".join(str(row) for row in plan)
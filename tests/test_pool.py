@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.config import Settings
+from app.infrastructure.db.pool import InstrumentedAsyncQueuePool
+from app.infrastructure.db.session import engine_options
+
+
+def test_engine_options_follow_settings():
+    settings = Settings(
+        db_pool_size=3,
+        db_max_overflow=1,
+        db_pool_timeout_seconds=2.5,
+        db_statement_cache_size=0,
+        db_prepared_statement_cache_size=0,
+    )
+    options = engine_options("postgresql+asyncpg://user:secret@db/locations", settings)
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"]) == (3, 1, 2.5)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    assert "poolclass" not in engine_options("sqlite+aiosqlite://", settings)
+
+
+@pytest.mark.asyncio
+async def test_pool_diagnostics_report_checkouts(client):
+    await client.get("/locations")
+
+    stats = (await client.get("/diagnostics/pool")).json()
+    assert stats["pool"] == "InstrumentedAsyncQueuePool"
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] >= 1
+    assert stats["wait_seconds_max"] >= stats["wait_seconds_avg"] >= 0
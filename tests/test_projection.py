@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.config import get_settings
+
+LIGHT = {
+    "fields": "codigo,nombre_oficial,address.lat,address.lng",
+    "include": "address",
+    "count": "none",
+}
+
+
+async def _seed(client) -> list[int]:
+    ids = []
+    for index in range(3):
+        response = await client.post(
+            "/locations",
+            json={
+                "nombre_oficial": f"Proyección {index}",
+                "codigo": f"PRJ-{index}",
+                "address": {"calle": "Reforma", "lat": 19.4 + index, "lng": -99.1},
+                "aliases": [{"alias": f"Alias {index}"}],
+                "clients": [{"cliente_source": "erp", "cliente_external_id": "1", "rol": "Op"}],
+            },
+        )
+        ids.append(response.json()["id"])
+    return ids
+
+
+
+@pytest.fixture(autouse=True)
+def read_model_disabled(monkeypatch) -> None:
+    """Start every test with the read model off; tests turn it on where they need it."""
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", False)
+
+@pytest.mark.asyncio
+async def test_sparse_fields_shrink_query_and_payload(client, assert_max_queries):
+    ids = await _seed(client)
+
+    # localidades + the address selectin; aliases and clients are not loaded
+    with assert_max_queries(2) as counter:
+        response = await client.get("/locations", params=LIGHT)
+    assert response.status_code == 200
+    assert "search_text" not in counter.statements[0]
+    assert "calle" not in counter.statements[1]
+    assert response.json()["items"] == [
+        {
+            "id": location_id,
+            "nombre_oficial": f"Proyección {index}",
+            "codigo": f"PRJ-{index}",
+            "address": {"lat": 19.4 + index, "lng": -99.1},
+        }
+        for index, location_id in enumerate(ids)
+    ]
+
+    with assert_max_queries(1):
+        bare = await client.get("/locations", params={"include": "", "count": "none"})
+    item = bare.json()["items"][0]
+    assert item["codigo"] == "PRJ-0" and item["version"] >= 1
+    assert not {"address", "aliases", "clients"} & item.keys()
+
+    by_client = await client.get(
+        "/locations/by-client/erp/1", params={"fields": "codigo", "include": "aliases"}
+    )
+    assert by_client.json()["items"][0] == {
+        "id": ids[0],
+        "codigo": "PRJ-0",
+        "aliases": [by_client.json()["items"][0]["aliases"][0]],
+    }
+
+
+@pytest.mark.asyncio
+async def test_projection_is_part_of_the_etag_and_validated(client):
+    await _seed(client)
+
+    full = await client.get("/locations")
+    light = await client.get("/locations", params=LIGHT)
+    assert full.headers["etag"] != light.headers["etag"]
+    revalidated = await client.get(
+        "/locations", params=LIGHT, headers={"If-None-Match": light.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+    for params in (
+        {"fields": "codigo,search_text"},
+        {"include": "address,owner"},
+        {"fields": "address.lat", "include": "aliases"},
+    ):
+        assert (await client.get("/locations", params=params)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_read_model_serves_the_same_projection(client, monkeypatch, assert_max_queries):
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", True)
+    await _seed(client)
+
+    params = {**LIGHT, "include": "address,clients"}
+    with assert_max_queries(1):
+        from_read_model = (await client.get("/locations", params=params)).json()
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", False)
+    assert (await client.get("/locations", params=params)).json() == from_read_model
+    assert from_read_model["items"][0]["clients"][0]["rol"] == "Op"
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.metrics import get_request_metrics_registry, statement_shape
+from app.entrypoints.api.metrics import RequestMetricsMiddleware
+from app.infrastructure.db.session import session_scope
+
+
+def test_statement_shape_collapses_parameters_and_lists():
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?, ?) AND b = $1") == (
+        "SELECT a FROM t WHERE id IN (?) AND b = ?"
+    )
+    assert statement_shape("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (?)"
+    )
+
+
+@pytest.mark.asyncio
+async def test_detector_reports_repeated_statements_per_route(
+    test_engine, monkeypatch, caplog
+):
+    monkeypatch.setattr(get_settings(), "query_detector_enabled", True)
+    registry = get_request_metrics_registry()
+    registry.clear()
+    monkeypatch.setattr(registry, "query_budget", 4)
+    monkeypatch.setattr(registry, "repeat_threshold", 3)
+
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def lookup(item_id: int, repeat: int = 1) -> dict[str, int]:
+        async with session_scope() as session:
+            for value in range(repeat):
+                await session.execute(text("SELECT :value"), {"value": value})
+        return {"id": item_id}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/items/1")
+        with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+            await client.get("/items/2", params={"repeat": 5})
+
+    findings = registry.findings()
+    assert list(findings) == ["GET /items/{item_id}"]
+    report = findings["GET /items/{item_id}"]
+    assert report["flagged"] == 1 and report["over_budget"] == 1
+    assert report["statements"] == [{"statement": "SELECT ?", "max_executions": 5}]
+    assert "possible N+1" in caplog.text
+    assert 'reason="repeated_statement"' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_their_route(client, monkeypatch, caplog):
+    get_request_metrics_registry().clear()
+    monkeypatch.setattr(get_settings(), "slow_query_threshold_ms", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        await client.get("/locations", params={"count": "none"})
+
+    assert "Slow query on GET /locations" in caplog.text
+    body = (await client.get("/metrics")).text
+    assert 'http_request_slow_queries_total{method="GET",route="/locations"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_add_client_reuses_the_loaded_aggregate(client, monkeypatch, assert_max_queries):
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", False)
+    location_id = (
+        await client.post("/locations", json={"nombre_oficial": "Cliente", "codigo": "CLI-1"})
+    ).json()["id"]
+    link = {"cliente_source": "erp", "cliente_external_id": "1", "rol": "Operador"}
+
+    # aggregate load (base + 3 selectin) + INSERT + version bump
+    with assert_max_queries(6):
+        response = await client.post(f"/locations/{location_id}/clients", json=link)
+    assert response.status_code == 201
+    again = await client.post(f"/locations/{location_id}/clients", json=link)
+    assert again.json()["created_at"] == response.json()["created_at"]
+    detail = (await client.get(f"/locations/{location_id}")).json()
+    assert len(detail["clients"]) == 1
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.infrastructure.db import session as db_session
+from app.infrastructure.db.models import LocationSearchModel
+
+CLIENT = {"cliente_source": "erp", "cliente_external_id": "55", "rol": "Operador"}
+
+
+def _payload(index: int) -> dict:
+    return {
+        "nombre_oficial": f"Modelo {index}",
+        "codigo": f"RM-{index}",
+        "address": {"calle": f"Calle {index}", "ciudad_text": "Puebla", "lat": 19.0, "lng": -98},
+        "aliases": [{"alias": f"Alias {index}a"}, {"alias": f"Alias {index}b"}],
+        "clients": [CLIENT],
+    }
+
+
+async def _read_model_rows() -> dict[int, int]:
+    async with db_session.session_scope() as session:
+        rows = await session.execute(
+            select(LocationSearchModel.localidad_id, LocationSearchModel.version)
+        )
+        return dict(rows.all())
+
+
+
+@pytest.fixture(autouse=True)
+def read_model_disabled(monkeypatch) -> None:
+    """Start every test with the read model off; tests turn it on where they need it."""
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", False)
+
+@pytest.mark.asyncio
+async def test_listing_reads_read_model_in_one_query(client, monkeypatch, assert_max_queries):
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", True)
+    ids = [
+        (await client.post("/locations", json=_payload(index))).json()["id"] for index in range(3)
+    ]
+    await client.post(
+        "/locations/bulk", json={"items": [_payload(3), {**_payload(4), "address": None}]}
+    )
+    await client.put(f"/locations/{ids[0]}/address", json={"cp": "72000"})
+    await client.post(f"/locations/{ids[1]}/aliases", json={"alias": "Extra"})
+    await client.request("DELETE", f"/locations/{ids[2]}/clients", json=CLIENT)
+
+    with assert_max_queries(1):
+        listing = await client.get("/locations", params={"count": "none", "limit": 50})
+    items = listing.json()["items"]
+    assert [item["codigo"] for item in items] == [f"RM-{index}" for index in range(5)]
+    for item in items:
+        assert item == (await client.get(f"/locations/{item['id']}")).json()
+    assert items[0]["address"]["cp"] == "72000"
+    assert [alias["alias"] for alias in items[1]["aliases"]] == ["Alias 1a", "Alias 1b", "Extra"]
+    assert items[2]["clients"] == []
+    assert items[4]["address"] is None
+
+    by_client = (await client.get("/locations/by-client/erp/55", params={"limit": 2})).json()
+    assert [item["codigo"] for item in by_client["items"]] == ["RM-0", "RM-1"]
+    assert by_client["total"] == 4
+
+    await client.delete(f"/locations/{ids[0]}")
+    assert ids[0] not in await _read_model_rows()
+
+
+@pytest.mark.asyncio
+async def test_rows_written_while_disabled_fall_back_to_aggregates(client, monkeypatch):
+    created = (await client.post("/locations", json=_payload(1))).json()
+    assert await _read_model_rows() == {}
+
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", True)
+    listing = (await client.get("/locations")).json()
+    assert listing["items"] == [created]
+
+    updated = (await client.put(f"/locations/{created['id']}", json={"activo": False})).json()
+    assert await _read_model_rows() == {created["id"]: updated["version"]}
+    assert (await client.get("/locations")).json()["items"] == [updated]
@@ -0,0 +1,176 @@
+"""Statement and row budgets for every ``SQLAlchemyLocationRepository`` method.
+
+Each case runs against a small ``benchmarks.data`` catalog (see ``seed_data.py``); a
+change to the repository that adds round trips or over-fetches fails here like a
+functional regression would. The repository is built with the read model off so the
+budgets do not depend on ``API_MAPBOX_LOCATION_READ_MODEL_ENABLED``. Measured costs and
+timings are listed under "query budgets" in the pytest summary.
+"""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import pytest
+import pytest_asyncio
+
+from app.domain.models.location import ClientLink, LocationType
+from app.domain.repositories.location_repository import (
+    CountMode,
+    LocationFilters,
+    LocationInclude,
+    LocationProjection,
+    Pagination,
+)
+from app.infrastructure.db import session as db_session
+from app.infrastructure.repositories.location import SQLAlchemyLocationRepository
+from benchmarks.data import CLIENT_SOURCE, DatasetSpec, location_rows
+from seed_data import seed
+
+# 2 aliases and 3 client links per location: one aggregate is 1 + 1 + 2 + 3 rows.
+SPEC = DatasetSpec(locations=200, aliases_per_location=2, links_per_location=3, clients=50)
+AGGREGATE_ROWS = 7
+# Aliases are inserted in location order, so location 10 owns alias ids 19 and 20.
+ALIAS_ID = 19
+LINK = next(location_rows(SPEC))[3][0]
+PAGE = Pagination(limit=20, count=CountMode.EXACT)
+UPSERT = {
+    "nombre_oficial": "Localidad 0000009",
+    "codigo": "L0000009",
+    "tipo": LocationType.ORIGEN,
+    "activo": True,
+    "es_global": False,
+    "address": {"calle": "Reforma 1", "lat": 19.43, "lng": -99.13},
+    "aliases": ["Alias 0000009-0", "Nuevo"],
+    "clients": [{"cliente_source": CLIENT_SOURCE, "cliente_external_id": "x", "rol": "Operador"}],
+}
+
+Call = Callable[[SQLAlchemyLocationRepository], Awaitable[Any]]
+
+
+async def _drain(repository: SQLAlchemyLocationRepository) -> list[dict[str, Any]]:
+    return [row async for row in repository.stream_locations(LocationFilters(estado="Jalisco"))]
+
+
+CASES: list[tuple[str, Call, int, int]] = [
+    # (label, call, max statements, max fetched rows)
+    ("get_location", lambda repo: repo.get_location(10), 4, AGGREGATE_ROWS),
+    ("get_location_by_codigo", lambda repo: repo.get_location_by_codigo("L0000009"), 4, 7),
+    (
+        "get_locations",
+        lambda repo: repo.get_locations(ids=range(1, 21), codigos=["L0000099"]),
+        4,
+        21 * AGGREGATE_ROWS,
+    ),
+    ("get_location_version", lambda repo: repo.get_location_version(10), 1, 1),
+    (
+        "list_locations",
+        lambda repo: repo.list_locations(LocationFilters(estado="Jalisco"), PAGE),
+        5,
+        # count + the page and its look-ahead row; children only for the page
+        1 + 21 + 20 * (AGGREGATE_ROWS - 1),
+    ),
+    (
+        "list_locations[projection]",
+        lambda repo: repo.list_locations(
+            LocationFilters(tipo=LocationType.ORIGEN),
+            Pagination(limit=20, count=CountMode.NONE),
+            LocationProjection(
+                fields=frozenset({"codigo"}), include=frozenset({LocationInclude.ALIASES})
+            ),
+        ),
+        2,
+        21 + 20 * 2,
+    ),
+    (
+        "list_locations[client]",
+        lambda repo: repo.list_locations(
+            LocationFilters(cliente_source=CLIENT_SOURCE, cliente_external_id="3"), PAGE
+        ),
+        5,
+        1 + 21 + 20 * (AGGREGATE_ROWS - 1),
+    ),
+    (
+        "find_nearby",
+        lambda repo: repo.find_nearby(
+            23.6, -102.0, radius_m=300_000, limit=10, filters=LocationFilters()
+        ),
+        5,
+        # candidate addresses in the geohash cells + the closest aggregates
+        83,
+    ),
+    ("stream_locations", _drain, 1, 34),
+    (
+        "upsert_location[update]",
+        lambda repo: repo.upsert_location(**UPSERT),
+        10,
+        AGGREGATE_ROWS,
+    ),
+    (
+        "upsert_location[create]",
+        lambda repo: repo.upsert_location(**{**UPSERT, "nombre_oficial": "Nueva", "codigo": "N1"}),
+        6,
+        5,
+    ),
+    (
+        "update_location",
+        lambda repo: repo.update_location(
+            10, nombre_oficial="Renombrada", codigo=None, tipo=None, activo=None, es_global=None
+        ),
+        5,
+        AGGREGATE_ROWS + 1,
+    ),
+    (
+        "update_address",
+        lambda repo: repo.update_address(10, {"calle": "Insurgentes"}),
+        6,
+        AGGREGATE_ROWS + 2,
+    ),
+    ("add_alias", lambda repo: repo.add_alias(10, "Otro nombre"), 3, 4),
+    ("remove_alias", lambda repo: repo.remove_alias(10, ALIAS_ID), 5, 4),
+    (
+        "add_client",
+        lambda repo: repo.add_client(
+            10,
+            ClientLink(
+                localidad_id=10,
+                cliente_source=CLIENT_SOURCE,
+                cliente_external_id="nuevo",
+                rol="Operador",
+                created_at=None,
+            ),
+        ),
+        6,
+        AGGREGATE_ROWS + 2,
+    ),
+    (
+        "remove_client",
+        lambda repo: repo.remove_client(
+            1,
+            cliente_source=LINK["cliente_source"],
+            cliente_external_id=LINK["cliente_external_id"],
+            rol=LINK["rol"],
+        ),
+        3,
+        1,
+    ),
+    ("delete_location", lambda repo: repo.delete_location(10), 9, AGGREGATE_ROWS),
+]
+
+
+@pytest_asyncio.fixture()
+async def seeded(test_engine):
+    await seed(test_engine, SPEC)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("label", "call", "queries", "rows"), CASES, ids=[case[0] for case in CASES]
+)
+async def test_repository_method_stays_within_budget(
+    seeded, query_budget, label, call, queries, rows
+):
+    async with db_session.SessionFactory() as session:
+        repository = SQLAlchemyLocationRepository(session, read_model=False)
+        with query_budget(label, queries=queries, rows=rows):
+            await call(repository)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+from app.infrastructure.search.location_search import (
+    build_search_document,
+    normalize_text,
+    word_similarity,
+)
+
+
+def test_search_document_is_normalized():
+    document = build_search_document("Central Méx", "LOC-001", ["Terminal  Ñuñoa"])
+    assert document == "central mex loc 001 terminal nunoa"
+    assert normalize_text("  ¡Hola, Señor! ") == "hola senor"
+
+
+def test_word_similarity_prefers_contained_words():
+    exact = word_similarity("terminal", "central norte terminal")
+    partial = word_similarity("termin", "central norte terminal")
+    unrelated = word_similarity("puebla", "central norte terminal")
+    assert exact == 1.0
+    assert exact > partial > unrelated
+
+
+@pytest.mark.asyncio
+async def test_search_matches_aliases_codes_and_accents(client):
+    await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Bodega Querétaro",
+            "codigo": "QRO-01",
+            "aliases": [{"alias": "Patio Bajío"}],
+        },
+    )
+    await client.post(
+        "/locations",
+        json={"nombre_oficial": "Terminal Queretaro Norte", "codigo": "QRO-02"},
+    )
+    await client.post("/locations", json={"nombre_oficial": "Central Puebla", "codigo": "PUE-01"})
+
+    by_alias = await client.get("/locations", params={"q": "bajio"})
+    assert [item["codigo"] for item in by_alias.json()["items"]] == ["QRO-01"]
+
+    by_code = await client.get("/locations", params={"q": "qro-02"})
+    assert [item["codigo"] for item in by_code.json()["items"]] == ["QRO-02"]
+
+    by_name = await client.get("/locations", params={"q": "QUERETARO"})
+    data = by_name.json()
+    assert data["total"] == 2
+    assert {item["codigo"] for item in data["items"]} == {"QRO-01", "QRO-02"}
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_best_match_first(client):
+    await client.post("/locations", json={"nombre_oficial": "Almacen Monterrey Sur", "codigo": "A-1"})
+    await client.post("/locations", json={"nombre_oficial": "Monterrey", "codigo": "B-2"})
+
+    response = await client.get("/locations", params={"q": "monterrey"})
+    codes = [item["codigo"] for item in response.json()["items"]]
+    assert codes[0] == "B-2"
+
+
+@pytest.mark.asyncio
+async def test_search_text_follows_alias_changes(client):
+    created = await client.post(
+        "/locations", json={"nombre_oficial": "Centro Logistico", "codigo": "CL-1"}
+    )
+    location_id = created.json()["id"]
+
+    alias = await client.post(f"/locations/{location_id}/aliases", json={"alias": "Hub Oriente"})
+    assert (await client.get("/locations", params={"q": "oriente"})).json()["total"] == 1
+
+    await client.delete(f"/locations/{location_id}/aliases/{alias.json()['id']}")
+    assert (await client.get("/locations", params={"q": "oriente"})).json()["total"] == 0
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.infrastructure.cache.backends import InMemoryCacheBackend, RedisCacheBackend
+from app.core.config import Settings
+from app.infrastructure.cache.location_cache import (
+    NullLocationCache,
+    SharedLocationCache,
+    build_location_cache,
+)
+from fake_redis import FakeRedisServer
+
+
+@pytest_asyncio.fixture()
+async def redis_server():
+    server = FakeRedisServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def _worker(backend) -> SharedLocationCache:
+    return SharedLocationCache(backend, ttl=60, local_maxsize=100, local_ttl=60)
+
+
+async def _eventually(predicate) -> None:
+    for _ in range(100):
+        if await predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+@pytest.mark.asyncio
+async def test_workers_share_entries_and_invalidations_over_redis_protocol(redis_server):
+    worker_a = _worker(RedisCacheBackend(redis_server.url))
+    worker_b = _worker(RedisCacheBackend(redis_server.url))
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        await worker_a.set(1, "LOC-1", b'{"id":1}')
+        assert await worker_b.get(1) == b'{"id":1}'
+        assert await worker_b.get_by_codigo("LOC-1") == b'{"id":1}'
+        assert worker_b.stats()["shared_hits"] == 1
+
+        # worker B now serves id 1 from its local tier; a write in A must evict it.
+        await worker_a.invalidate(1)
+
+        async def _evicted() -> bool:
+            return await worker_b.get(1) is None
+
+        await _eventually(_evicted)
+        assert b"PUBLISH" in redis_server.commands
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_backend_outage_degrades_to_cache_miss(redis_server):
+    url = redis_server.url
+    await redis_server.stop()
+    cache = _worker(RedisCacheBackend(url, timeout=0.2))
+
+    await cache.set(1, "LOC-1", b"payload")
+    await cache.invalidate(1)
+    assert await cache.get(2) is None
+    assert cache.stats()["backend_errors"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_broadcasts_invalidations():
+    backend = InMemoryCacheBackend()
+    worker_a, worker_b = _worker(backend), _worker(backend)
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        await worker_b.set(7, "LOC-7", b"seven")
+        assert await worker_a.get(7) == b"seven"
+        await worker_b.invalidate(7)
+
+        async def _evicted() -> bool:
+            return await worker_a.get(7) is None
+
+        await _eventually(_evicted)
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+def test_default_backend_keeps_no_per_worker_copies(monkeypatch):
+    monkeypatch.delenv("API_MAPBOX_LOCATION_CACHE_BACKEND", raising=False)
+    default = Settings().location_cache_backend
+    assert isinstance(build_location_cache(default), NullLocationCache)
+    assert isinstance(build_location_cache("redis"), SharedLocationCache)
+
+
+@pytest.mark.asyncio
+async def test_guarded_set_skips_entries_invalidated_by_another_worker(redis_server):
+    worker_a = _worker(RedisCacheBackend(redis_server.url))
+    worker_b = _worker(RedisCacheBackend(redis_server.url))
+    try:
+        token = await worker_a.read_token()
+        # B commits a write for id 1 while A is still reading the old row.
+        await worker_b.invalidate(1)
+        await worker_a.set(1, "LOC-1", b"old", token)
+        assert await worker_a.get(1) is None
+        assert await worker_b.get(1) is None
+        assert worker_a.stats()["shared_stale_writes"] == 1
+
+        # Other ids, and reads that started after the invalidation, are cached.
+        token = await worker_a.read_token()
+        await worker_a.set(1, "LOC-1", b"new", token)
+        await worker_a.set(2, "LOC-2", b"two", token)
+        assert await worker_b.get(1) == b"new"
+        assert await worker_b.get(2) == b"two"
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_guarded_set_skips_the_shared_tier_when_the_backend_is_down(redis_server):
+    url = redis_server.url
+    await redis_server.stop()
+    cache = _worker(RedisCacheBackend(url, timeout=0.2))
+
+    token = await cache.read_token()
+    assert token[1] is None
+    errors = cache.stats()["backend_errors"]
+    await cache.set(1, "LOC-1", b"payload", token)
+    assert cache.stats()["backend_errors"] == errors
+    assert await cache.get(1) == b"payload"
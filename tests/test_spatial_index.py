@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.domain.models.location import LocationType
+from app.domain.repositories.location_index import IndexedPoint, PointQuery
+from app.infrastructure.geo.geohash import haversine_m
+from app.infrastructure.geo.grid_index import GridSpatialIndex
+from app.infrastructure.geo.spatial_index import get_spatial_index
+
+
+def _points(count: int, seed: int = 7) -> list[IndexedPoint]:
+    rng = random.Random(seed)
+    points = []
+    for location_id in range(1, count + 1):
+        # Mostly clustered around Mexico with a few far-away outliers.
+        if location_id % 50:
+            lat, lng = rng.uniform(14.5, 32.7), rng.uniform(-117.1, -86.7)
+        else:
+            lat, lng = rng.uniform(-89.0, 89.0), rng.uniform(-180.0, 179.9)
+        tipo = LocationType.ORIGEN if location_id % 3 else LocationType.DESTINO
+        points.append(IndexedPoint(location_id, lat, lng, tipo, location_id % 7 != 0))
+    return points
+
+
+def _brute_force(points, lat, lng, k, radius_m=None, tipo=None):
+    ranked = sorted(
+        (haversine_m(lat, lng, point.lat, point.lng), point.location_id)
+        for point in points
+        if tipo is None or point.tipo == tipo
+    )
+    return [
+        (location_id, distance)
+        for distance, location_id in ranked[:k]
+        if radius_m is None or distance <= radius_m
+    ]
+
+
+def test_nearest_matches_brute_force():
+    points = _points(2_000)
+    index = GridSpatialIndex(0.5)
+    index.replace_all(points)
+    rng = random.Random(3)
+
+    for _ in range(200):
+        lat, lng = rng.uniform(-85.0, 85.0), rng.uniform(-180.0, 179.9)
+        expected = _brute_force(points, lat, lng, 5)
+        found = index.nearest(lat, lng, k=5)
+        assert [location_id for location_id, _ in found] == [location_id for location_id, _ in expected]
+        assert found[0][1] == pytest.approx(expected[0][1], rel=1e-9)
+
+    origin = (19.43, -99.13)
+    filtered = index.nearest(*origin, k=3, radius_m=150_000, tipo=LocationType.DESTINO)
+    expected = _brute_force(points, *origin, 3, 150_000, LocationType.DESTINO)
+    assert [location_id for location_id, _ in filtered] == [location_id for location_id, _ in expected]
+
+
+def test_incremental_updates_and_batch_queries():
+    index = GridSpatialIndex(0.05)
+    index.upsert(IndexedPoint(1, 19.43, -99.13, LocationType.ORIGEN, True))
+    assert index.nearest(19.43, -99.13) == []  # writes before the first load are ignored
+
+    index.replace_all(
+        [
+            IndexedPoint(1, 19.4326, -99.1332, LocationType.ORIGEN, True),
+            IndexedPoint(2, 20.6597, -103.3496, LocationType.DESTINO, True),
+        ]
+    )
+    index.upsert(IndexedPoint(3, 25.6866, -100.3161, LocationType.AMBOS, True))
+    index.upsert(IndexedPoint(1, 21.1619, -86.8515, LocationType.ORIGEN, True))  # moved
+    index.remove(2)
+
+    results = index.nearest_many(
+        [
+            PointQuery(25.69, -100.31),
+            PointQuery(19.43, -99.13, radius_m=10_000),
+            PointQuery(21.16, -86.85, tipo=LocationType.AMBOS),
+            PointQuery(20.66, -103.35),
+        ]
+    )
+    assert [result[0] if result else None for result in results] == [3, None, 3, 3]
+    assert index.get(1).lat == pytest.approx(21.1619)
+    assert index.stats()["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_nearby_endpoint_uses_index_and_follows_writes(client):
+    created = await client.post(
+        "/locations",
+        json={"nombre_oficial": "Indexada", "codigo": "IDX-1", "address": {"lat": 19.4326, "lng": -99.1332}},
+    )
+    location_id = created.json()["id"]
+    index = get_spatial_index()
+    await index.reload()
+    assert index.ready and index.stats()["size"] == 1
+
+    params = {"lat": 19.4330, "lng": -99.1330, "radius_m": 1_000}
+    items = (await client.get("/locations/nearby", params=params)).json()["items"]
+    assert [item["location"]["codigo"] for item in items] == ["IDX-1"]
+
+    await client.put(f"/locations/{location_id}/address", json={"lat": 20.6597, "lng": -103.3496})
+    assert (await client.get("/locations/nearby", params=params)).json()["items"] == []
+    assert index.get(location_id).lng == pytest.approx(-103.3496)
+
+    await client.delete(f"/locations/{location_id}")
+    assert index.get(location_id) is None
+
+
+@pytest.mark.asyncio
+async def test_nearby_endpoint_rechecks_filters_of_stale_index_entries(client):
+    created = await client.post(
+        "/locations",
+        json={
+            "nombre_oficial": "Desactivada",
+            "codigo": "IDX-2",
+            "tipo": "Origen",
+            "address": {"lat": 19.4326, "lng": -99.1332},
+        },
+    )
+    location_id = created.json()["id"]
+    index = get_spatial_index()
+    await index.reload()
+    stale = index.get(location_id)
+
+    await client.put(f"/locations/{location_id}", json={"activo": False, "tipo": "Destino"})
+    # Another worker handled the write: this process still indexes the old tipo/activo.
+    index.upsert(stale)
+
+    params = {"lat": 19.4330, "lng": -99.1330, "radius_m": 1_000}
+    assert (await client.get("/locations/nearby", params={**params, "activo": True})).json()[
+        "items"
+    ] == []
+    assert (await client.get("/locations/nearby", params={**params, "tipo": "Origen"})).json()[
+        "items"
+    ] == []
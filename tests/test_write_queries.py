@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.config import get_settings
+
+# Every write also rebuilds the location_search row: DELETE + INSERT ... SELECT.
+READ_MODEL_REFRESH = 2
+
+PAYLOAD = {
+    "nombre_oficial": "Central Consultas",
+    "codigo": "QRY-1",
+    "address": {"calle": "Reforma", "ciudad_text": "CDMX"},
+    "aliases": [{"alias": "Consultas"}],
+    "clients": [{"cliente_source": "erp", "cliente_external_id": "1", "rol": "Operador"}],
+}
+
+
+@pytest.fixture(params=[False, True], ids=["aggregates", "read_model"])
+def read_model(request, monkeypatch) -> bool:
+    monkeypatch.setattr(get_settings(), "location_read_model_enabled", request.param)
+    return request.param
+
+
+@pytest.mark.asyncio
+async def test_create_builds_response_without_reloading(client, assert_max_queries, read_model):
+    # lookup by codigo + one INSERT per table
+    with assert_max_queries(5 + READ_MODEL_REFRESH * read_model):
+        response = await client.post("/locations", json=PAYLOAD)
+    body = response.json()
+    assert response.status_code == 201
+    assert body["address"]["calle"] == "Reforma"
+    assert body["address"]["created_at"] is not None
+    assert [alias["alias"] for alias in body["aliases"]] == ["Consultas"]
+    assert body["aliases"][0]["id"] is not None
+    assert body["clients"][0]["created_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_updates_build_response_without_reloading(client, assert_max_queries, read_model):
+    location_id = (await client.post("/locations", json=PAYLOAD)).json()["id"]
+
+    # aggregate load (base + 3 selectin) + UPDATE ... RETURNING
+    with assert_max_queries(5 + READ_MODEL_REFRESH * read_model):
+        response = await client.put(
+            f"/locations/{location_id}", json={"nombre_oficial": "Renombrada"}
+        )
+    assert response.json()["nombre_oficial"] == "Renombrada"
+    assert response.json()["aliases"][0]["alias"] == "Consultas"
+
+    # aggregate load + UPDATE direcciones + version bump on localidades
+    with assert_max_queries(6 + READ_MODEL_REFRESH * read_model):
+        response = await client.put(
+            f"/locations/{location_id}/address", json={"calle": "Insurgentes", "cp": "03100"}
+        )
+    assert response.json()["address"]["calle"] == "Insurgentes"
+    assert response.json()["address"]["cp"] == "03100"
+
+    # location + address load, UPDATE localidades/direcciones, then per child table one
+    # DELETE, one INSERT and the reload (skipped for the emptied clients)
+    with assert_max_queries(8 + READ_MODEL_REFRESH * read_model):
+        response = await client.post(
+            "/locations",
+            json={**PAYLOAD, "aliases": [{"alias": "Otra"}], "clients": []},
+        )
+    body = response.json()
+    assert [alias["alias"] for alias in body["aliases"]] == ["Otra"]
+    assert body["clients"] == []
+    detail = (await client.get(f"/locations/{location_id}")).json()
+    assert detail["aliases"] == body["aliases"]
+
+
+@pytest.mark.asyncio
+async def test_upsert_diffs_large_client_sets_in_sql(client, assert_max_queries, read_model):
+    def links(values: range) -> list[dict]:
+        return [
+            {"cliente_source": "erp", "cliente_external_id": str(value), "rol": "Operador"}
+            for value in values
+        ]
+
+    created = (
+        await client.post("/locations", json={**PAYLOAD, "clients": links(range(0, 1000))})
+    ).json()
+    kept = {item["cliente_external_id"]: item["created_at"] for item in created["clients"]}
+
+    # 100 links dropped and 100 added still cost one DELETE and one INSERT
+    with assert_max_queries(9 + READ_MODEL_REFRESH * read_model):
+        response = await client.post(
+            "/locations", json={**PAYLOAD, "clients": links(range(100, 1100))}
+        )
+    clients = response.json()["clients"]
+    assert sorted(int(item["cliente_external_id"]) for item in clients) == list(range(100, 1100))
+    assert all(
+        item["created_at"] == kept[item["cliente_external_id"]]
+        for item in clients
+        if int(item["cliente_external_id"]) < 1000
+    )
+    detail = (await client.get(f"/locations/{created['id']}")).json()
+    assert len(detail["clients"]) == 1000